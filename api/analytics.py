@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+
+from models import ApiResponse, AnalyticsResponse, KST, get_korean_time
+from services.analytics_service import GRANULARITIES, analytics_service
+from services.gpu_service import gpu_service
+
+# 한 번에 조회할 수 있는 최대 구간 수 (시간 단위 약 3개월, 일 단위 약 10년)
+MAX_BUCKETS = 2200
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"],
+)
+
+@router.get("/", response_model=AnalyticsResponse,
+            summary="GPU 사용률/대기 시간 통계",
+            description="시간/일 단위로 미리 집계한 GPU 사용 시간(capacity별, 사용자별), 사용률, "
+                        "대기/실행 시간 백분위수를 기간 합계와 구간별로 반환한다.")
+async def get_analytics(
+    start: Optional[datetime] = Query(None, description="시작 시각 (ISO 8601, 기본: 7일 전)"),
+    end: Optional[datetime] = Query(None, description="끝 시각 (ISO 8601, 기본: 현재)"),
+    granularity: str = Query("day", description="구간 단위 (hour, day)"),
+):
+    end = end or get_korean_time()
+    start = start or end - timedelta(days=7)
+    # 시간대가 없는 값은 KST로 간주
+    start = start if start.tzinfo else start.replace(tzinfo=KST)
+    end = end if end.tzinfo else end.replace(tzinfo=KST)
+
+    message = None
+    if granularity not in GRANULARITIES:
+        message = f"granularity는 {', '.join(GRANULARITIES)} 중 하나여야 합니다."
+    elif start >= end:
+        message = "start는 end보다 앞이어야 합니다."
+    elif (end - start) / GRANULARITIES[granularity] > MAX_BUCKETS:
+        message = f"조회 기간이 너무 깁니다. (최대 {MAX_BUCKETS}개 구간)"
+    if message:
+        raise HTTPException(
+            status_code=400,
+            detail=ApiResponse(code=400, message=message, data=None).model_dump()
+        )
+
+    try:
+        capacity_totals = await run_in_threadpool(gpu_service.get_capacity_totals)
+        summary = await run_in_threadpool(analytics_service.get_analytics, start, end, granularity, capacity_totals)
+        return AnalyticsResponse(code=200, message="GPU 사용 통계를 불러왔습니다.", data=summary)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ApiResponse(
+                code=500,
+                message=f"GPU 사용 통계 조회 실패: {str(e)}",
+                data=None
+            ).model_dump()
+        )
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Header, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from services.event_broadcaster import event_broadcaster
+
+router = APIRouter(
+    prefix="/events",
+    tags=["Events"],
+)
+
+@router.get("/",
+            summary="GPU/작업 상태 변경 구독",
+            description="SSE(text/event-stream)로 처음에 snapshot 이벤트(GPU 상태와 진행 중인 작업)를 보내고, "
+                        "이후 job 이벤트(작업 상태 변경)와 gpu 이벤트(바뀐 GPU 상태 필드)를 전달한다. "
+                        "재연결 시 Last-Event-ID를 보내면 놓친 이벤트만 이어서 받는다.")
+async def subscribe_events(last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    seq = event_broadcaster.parse_event_id(last_event_id)
+    return StreamingResponse(event_broadcaster.subscribe(seq), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.websocket("/ws")
+async def subscribe_events_ws(websocket: WebSocket,
+                              last_event_id: Optional[str] = Query(None, description="마지막으로 받은 이벤트 ID")):
+    """/events와 같은 이벤트를 {"id", "event", "data"} JSON 메시지로 전달하는 WebSocket 버전"""
+    await websocket.accept()
+    seq = event_broadcaster.parse_event_id(last_event_id)
+    try:
+        async for message in event_broadcaster.subscribe(seq, websocket=True):
+            await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import Optional
 import io, os
 
 from services.file_service import FileService 
 from models import DirectoryContent
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024   # 다운로드 스트리밍 단위 (메모리 사용량 상한)
+MAX_LIST_LIMIT = 10000
+
 router = APIRouter(
     prefix="/user/{user_id}/file",  
     tags=["files"],       
@@ -20,14 +23,44 @@ def get_file_service(user_id: str) -> FileService:
 async def list_contents(
     user_id: str,
     path: Optional[str] = "",
+    offset: int = Query(0, ge=0, description="건너뛸 항목 수"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIST_LIMIT, description="가져올 최대 항목 수"),
+    sort: str = Query("name", description="정렬 기준 (name, size, modified)"),
+    order: str = Query("asc", description="정렬 순서 (asc, desc)"),
     file_service: FileService = Depends(get_file_service) 
 ):
     
     try:
-        return await file_service.list_directory_contents(path)
+        return await file_service.list_directory_contents(path, offset=offset, limit=limit, sort=sort, order=order)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IOError as e:
+        raise HTTPException(status_code=500, detail=f"Server error: {e}")
+
+@router.get("/download", description="파일 다운로드 (Range/If-Range 지원, 이어받기 및 병렬 구간 다운로드 가능)")
+async def download_file(
+    user_id: str,
+    path: str,
+    file_service: FileService = Depends(get_file_service)
+):
+    try:
+        full_path, stat_result = await file_service.get_download_file(path)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except IOError as e:
         raise HTTPException(status_code=500, detail=f"Server error: {e}")
+
+    # FileResponse: 고정 크기 청크 스트리밍, Range/If-Range(ETag, Last-Modified) 처리,
+    # 서버가 http.response.pathsend 확장을 지원하면 sendfile로 전송
+    response = FileResponse(
+        full_path,
+        filename=os.path.basename(full_path),
+        stat_result=stat_result,
+        content_disposition_type="attachment"
+    )
+    response.chunk_size = DOWNLOAD_CHUNK_SIZE
+    return response
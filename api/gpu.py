@@ -1,18 +1,35 @@
-from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 from typing import List, Optional
 
-from models import ApiResponse, GpuStatus, GpuStatusResponse, Gpu
+from models import ApiResponse, GpuHistoryResponse, GpuStatus, GpuStatusResponse, Gpu, KST, get_korean_time
+from services.gpu_sampler import SAMPLE_TIERS, gpu_sampler
 from services.gpu_service import gpu_service
+from services.version_service import data_version, etag_matches, make_etag
 
 router = APIRouter(
     prefix="/resource/gpu",  
     tags=["GPU"],    
 )
 
-@router.get("/", response_model=GpuStatusResponse)
-async def get_gpus():
+@router.get("/", response_model=GpuStatusResponse,
+            description="GPU 상태를 반환한다. 응답에는 ETag가 붙고, If-None-Match가 같으면 304를 반환한다. "
+                        "다른 서버 프로세스의 변경은 최대 DATA_VERSION_TTL_SECONDS(기본 1초) 늦게 반영되고, "
+                        "DB에 직접 쓴 변경은 사용 가능한 GPU 수나 대기/실행 중인 작업 수가 바뀔 때만 반영된다.")
+async def get_gpus(response: Response, if_none_match: Optional[str] = Header(None, alias="If-None-Match")):
+    # 데이터 버전이 같으면 GPU 상태를 계산하지 않고 304 반환
     try:
-        gpu_status_data = gpu_service.get_gpu_status()
+        etag = make_etag(await data_version.current_async(), "gpu")
+    except Exception as e:
+        etag = None
+        print(f"데이터 버전 조회 실패: {e}")
+    if etag and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if etag:
+        response.headers["ETag"] = etag
+
+    try:
+        gpu_status_data = await gpu_service.get_gpu_status_async()
         
         return GpuStatusResponse(
             code=200,
@@ -28,4 +45,43 @@ async def get_gpus():
                 message=f"GPU 상태 조회 실패: {str(e)}",
                 data=None
             ).model_dump()
-        )
\ No newline at end of file
+        )
+
+@router.get("/history", response_model=GpuHistoryResponse,
+            summary="GPU 상태 시계열",
+            description="capacity별 사용 중/사용 가능 GPU 수와 대기열 길이의 구간별 평균/최소/최대. "
+                        "resolution을 지정하지 않으면 기간에 맞는 해상도(10s, 1m, 1h)를 사용한다.")
+async def get_gpu_history(
+    start: Optional[datetime] = Query(None, description="시작 시각 (ISO 8601, 기본: 1시간 전)"),
+    end: Optional[datetime] = Query(None, description="끝 시각 (ISO 8601, 기본: 현재)"),
+    resolution: Optional[str] = Query(None, description="해상도 (10s, 1m, 1h)")
+):
+    end = end or get_korean_time()
+    start = start or end - timedelta(hours=1)
+    # 시간대가 없는 값은 KST로 간주
+    start = start if start.tzinfo else start.replace(tzinfo=KST)
+    end = end if end.tzinfo else end.replace(tzinfo=KST)
+
+    resolutions = [tier["name"] for tier in SAMPLE_TIERS]
+    if (resolution is not None and resolution not in resolutions) or start >= end:
+        raise HTTPException(
+            status_code=400,
+            detail=ApiResponse(
+                code=400,
+                message=f"잘못된 조회 조건입니다. (resolution: {', '.join(resolutions)}, start < end)",
+                data=None
+            ).model_dump()
+        )
+
+    try:
+        history = await gpu_sampler.get_history_async(start, end, resolution)
+        return GpuHistoryResponse(code=200, message="GPU 상태 시계열 조회 성공", data=history)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ApiResponse(
+                code=500,
+                message=f"GPU 상태 시계열 조회 실패: {str(e)}",
+                data=None
+            ).model_dump()
+        )
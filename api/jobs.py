@@ -1,9 +1,21 @@
-from fastapi import APIRouter, HTTPException, Body, Query
+from fastapi import APIRouter, HTTPException, Body, Header, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import List, Optional, Union
 from pydantic import BaseModel
+from datetime import datetime
+import os
 
-from models import ApiResponse, Job, JobListResponse, JobCreate, JobResponse, JobLogResponse
-from services.job_service import job_service
+from models import KST, ApiResponse, Job, JobListResponse, JobCreate, JobResponse, JobLogResponse, JobLogSearchResponse
+from services.job_service import job_service, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.log_index_service import log_index_service, LOG_TIME_FORMAT
+from services.log_service import log_service, resolve_log_path, MAX_READ_LENGTH
+from services.version_service import data_version, etag_matches, make_etag
+
+LOG_READ_LENGTH = 64 * 1024   # /log 구간 조회 기본 길이
+MAX_TAIL_LINES = 10000
+LOG_SEARCH_LIMIT = 200        # /log/search 기본 줄 수
+MAX_LOG_SEARCH_LIMIT = 5000
 
 class JobStatusUpdate(BaseModel):
     status: str
@@ -16,20 +28,65 @@ router = APIRouter(
 
 @router.get("/", 
             summary="ID로 Job 조회",
-            description="특정 Job ID에 해당하는 Job의 상세 정보를 가져온다. job_id가 없으면 전체 목록을 반환한다.")
+            description="특정 Job ID에 해당하는 Job의 상세 정보를 가져온다. job_id가 없으면 전체 목록을 반환한다. "
+                        "로그를 제외한 응답에는 ETag가 붙고, If-None-Match가 같으면 304를 반환한다. "
+                        "API를 거친 변경은 같은 서버 프로세스에서 즉시, 다른 프로세스에서는 최대 "
+                        "DATA_VERSION_TTL_SECONDS(기본 1초) 뒤에 ETag에 반영된다. API를 거치지 않고 DB에 직접 쓴 변경은 "
+                        "대기/실행 중인 작업 수나 사용 가능한 GPU 수가 바뀔 때만 반영되므로, 상태를 바꾸지 않는 "
+                        "직접 수정(예: jobName 변경)은 다른 변경이 있을 때까지 304로 남을 수 있다.")
 async def get_job_by_id(
     user_id: str,
+    response: Response,
     job_id: Optional[int] = Query(None, description="조회할 Job ID"),
-    log: bool = Query(False, description="로그 조회 여부")
+    log: bool = Query(False, description="로그 조회 여부"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="목록 조회 시 페이지 크기"),
+    after: Optional[str] = Query(None, description="이전 응답의 next_cursor (다음 페이지 조회)"),
+    fields: Optional[str] = Query(None, description="목록 조회 시 가져올 필드 (쉼표로 구분, 예: status,jobName)"),
+    total: bool = Query(False, description="전체 Job 개수 포함 여부"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match")
 ) -> Union[JobListResponse, JobResponse, JobLogResponse]:
+    # 로그를 제외한 조회는 데이터 버전이 같으면 DB 조회 없이 304 반환
+    etag = None
+    if not log:
+        try:
+            version = await data_version.current_async()
+            if job_id is None:
+                etag = make_etag(version, "jobs", user_id, limit, after, fields, total)
+            else:
+                etag = make_etag(version, "job", user_id, job_id)
+        except Exception as e:
+            print(f"데이터 버전 조회 실패: {e}")
+        if etag and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        if etag:
+            response.headers["ETag"] = etag
+
     # job_id가 없으면 전체 목록 반환
     if job_id is None:
         try:
-            jobs = job_service.get_all_jobs()
-            return JobListResponse(
-                code=200,
-                message="Job list를 불러왔습니다.",
-                data=jobs
+            field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+            jobs, next_cursor, total_count = await job_service.get_all_jobs_async(
+                limit=limit, after=after, fields=field_list, include_total=total
+            )
+            # 목록은 JobListResponse와 같은 형태의 dict를 orjson으로 바로 직렬화 (모델 검증을 반복하지 않음)
+            return ORJSONResponse(
+                {
+                    "code": 200,
+                    "message": "Job list를 불러왔습니다.",
+                    "data": jobs,
+                    "next_cursor": next_cursor,
+                    "total": total_count
+                },
+                headers={"ETag": etag} if etag else None
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=ApiResponse(
+                    code=400,
+                    message=f"잘못된 목록 조회 요청입니다.: {str(e)}",
+                    data=None
+                ).model_dump()
             )
         except Exception as e:
             raise HTTPException(
@@ -43,7 +100,7 @@ async def get_job_by_id(
     
     # Job 정보 조회
     try:
-        job = job_service.get_job_by_id(job_id)
+        job = await job_service.get_job_by_id_async(job_id)
         if not job:
             raise HTTPException(
                 status_code=404,
@@ -57,7 +114,7 @@ async def get_job_by_id(
         # log=true이면 로그 정보도 함께 조회
         if log:
             try:
-                log_data = job_service.get_job_log(job_id)
+                log_data = await run_in_threadpool(job_service.get_job_log, job_id)
                 if log_data and log_data.get("code") == 200:
                     return JobResponse(
                         code=200,
@@ -104,12 +161,148 @@ async def get_job_by_id(
             ).model_dump()
         )
 
+@router.get("/log", response_model=JobLogResponse,
+            summary="Job 로그 구간 조회",
+            description="로그 파일을 바이트 구간(offset/length) 또는 마지막 N줄(tail)로 조회한다. "
+                        "follow=true이면 이후 추가되는 줄을 SSE(text/event-stream)로 계속 전달한다.")
+async def get_job_log(
+    user_id: str,
+    job_id: int = Query(..., description="조회할 Job ID"),
+    offset: Optional[int] = Query(None, ge=0, description="읽기 시작할 바이트 위치"),
+    length: int = Query(LOG_READ_LENGTH, ge=1, le=MAX_READ_LENGTH, description="읽을 최대 바이트 수"),
+    tail: Optional[int] = Query(None, ge=1, le=MAX_TAIL_LINES, description="파일 끝에서부터 읽을 줄 수"),
+    follow: bool = Query(False, description="새로 추가되는 로그를 SSE로 계속 받기"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    job = await job_service.get_job_by_id_async(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail=ApiResponse(
+                code=404,
+                message=f"Job ID {job_id}을(를) 찾을 수 없습니다.",
+                data=None
+            ).model_dump()
+        )
+    
+    log_file_path = resolve_log_path(job.model_dump(by_alias=True))
+    
+    try:
+        if follow:
+            # 재연결 시 브라우저가 보내는 Last-Event-ID(마지막으로 받은 offset)부터 이어서 전달
+            if last_event_id and last_event_id.isdigit():
+                start = int(last_event_id)
+            elif offset is not None:
+                start = offset
+            elif tail:
+                _, start, _ = await run_in_threadpool(log_service.tail, log_file_path, tail)
+            else:
+                start = (await run_in_threadpool(os.stat, log_file_path)).st_size
+            
+            async def is_finished() -> bool:
+                current = await job_service.get_job_by_id_async(job_id)
+                return current is None or current.status in ("completed", "failed")
+            
+            async def event_stream():
+                async for next_offset, line in log_service.follow(log_file_path, start, is_finished):
+                    yield f"id: {next_offset}\ndata: {line}\n\n"
+                yield "event: end\ndata: \n\n"
+            
+            return StreamingResponse(event_stream(), media_type="text/event-stream",
+                                     headers={"Cache-Control": "no-cache"})
+        
+        if tail and offset is None:
+            log_bytes, start, file_size = await run_in_threadpool(log_service.tail, log_file_path, tail)
+        else:
+            start = offset or 0
+            log_bytes, file_size = await run_in_threadpool(log_service.read_range, log_file_path, start, length)
+        
+        return JobLogResponse(
+            code=200,
+            message=f"Job ID {job_id}의 로그를 성공적으로 불러왔습니다.",
+            log_content=log_bytes.decode('utf-8', errors='replace'),
+            file_name=log_file_path,
+            offset=start,
+            next_offset=start + len(log_bytes),
+            file_size=file_size
+        )
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=404,
+            detail=ApiResponse(
+                code=404,
+                message=f"로그 파일을 찾을 수 없습니다: {log_file_path}",
+                data=None
+            ).model_dump()
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ApiResponse(
+                code=500,
+                message=f"로그 파일 읽기에 실패했습니다: {str(e)}",
+                data=None
+            ).model_dump()
+        )
+
+@router.get("/log/search", response_model=JobLogSearchResponse,
+            summary="Job 로그 검색",
+            description="로그 줄을 레벨([ERROR] 등)과 시각 범위로 검색한다. 색인된 압축 세그먼트 중 조건에 맞는 "
+                        "세그먼트만 읽으며, 결과가 limit보다 많으면 next_after를 after로 전달해 이어서 검색한다.")
+async def search_job_log(
+    user_id: str,
+    job_id: int = Query(..., description="검색할 Job ID"),
+    level: Optional[str] = Query(None, pattern="^[A-Za-z]+$", description="로그 레벨 (예: ERROR)"),
+    start: Optional[datetime] = Query(None, description="시작 시각 (ISO 8601, 포함)"),
+    end: Optional[datetime] = Query(None, description="끝 시각 (ISO 8601, 포함)"),
+    after: int = Query(0, ge=0, description="검색을 시작할 바이트 위치 (이전 응답의 next_after)"),
+    limit: int = Query(LOG_SEARCH_LIMIT, ge=1, le=MAX_LOG_SEARCH_LIMIT, description="최대 줄 수")
+):
+    job = await job_service.get_job_by_id_async(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail=ApiResponse(
+                code=404,
+                message=f"Job ID {job_id}을(를) 찾을 수 없습니다.",
+                data=None
+            ).model_dump()
+        )
+
+    try:
+        # 로그 시각은 KST로 기록되므로 시간대가 있는 값은 KST로 바꿔 비교
+        start_ts, end_ts = (
+            (moment.astimezone(KST) if moment.tzinfo else moment).strftime(LOG_TIME_FORMAT) if moment else None
+            for moment in (start, end)
+        )
+        lines, next_after = await run_in_threadpool(
+            log_index_service.search, job.model_dump(by_alias=True), level, start_ts, end_ts, after, limit
+        )
+        return JobLogSearchResponse(
+            code=200,
+            message=f"Job ID {job_id}의 로그에서 {len(lines)}줄을 찾았습니다.",
+            lines=lines,
+            next_after=next_after
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ApiResponse(
+                code=500,
+                message=f"로그 검색에 실패했습니다: {str(e)}",
+                data=None
+            ).model_dump()
+        )
+
 @router.post("/", response_model=JobResponse, 
             summary="새로운 Job 생성",
             description="새로운 Job을 생성하고 사용 가능한 GPU를 자동으로 배정")
-async def create_job(job_data: JobCreate = Body(...)):
+async def create_job(
+    user_id: str,
+    job_data: JobCreate = Body(...)
+):
     try:
-        validation_message = job_service.inspect_job(job_data)
+        validation_message = await run_in_threadpool(job_service.inspect_job, job_data)
 
         if validation_message:
             raise HTTPException(
@@ -121,7 +314,8 @@ async def create_job(job_data: JobCreate = Body(...)):
                 ).model_dump()
             )
         
-        new_job = job_service.create_job(job_data)
+        # 배정/대기열 처리는 동기 스케줄러 경로이므로 스레드풀에서 실행
+        new_job = await run_in_threadpool(job_service.create_job, job_data, user_id)
         
         if not new_job:
             raise HTTPException(
@@ -134,7 +328,8 @@ async def create_job(job_data: JobCreate = Body(...)):
             )
 
         if new_job.gpuId:
-            message = f"Job이 성공적으로 생성되었습니다. (GPU {new_job.gpuId} 배정됨)"
+            gpu_ids = ", ".join(str(gpu_id) for gpu_id in (new_job.gpuIds or [new_job.gpuId]))
+            message = f"Job이 성공적으로 생성되었습니다. (GPU {gpu_ids} 배정됨)"
         else:
             message = f"Job이 대기열에 추가되었습니다."
 
@@ -164,7 +359,7 @@ async def update_job(
     job_data: JobCreate = Body(...)
 ):
     try:
-        validation_message = job_service.inspect_job(job_data)
+        validation_message = await run_in_threadpool(job_service.inspect_job, job_data)
 
         if validation_message:
             raise HTTPException(
@@ -176,7 +371,7 @@ async def update_job(
                 ).model_dump()
             )
         
-        updated_job = job_service.update_job(job_id, job_data)
+        updated_job = await run_in_threadpool(job_service.update_job, job_id, job_data)
         
         if not updated_job:
             raise HTTPException(
@@ -213,7 +408,7 @@ async def delete_job(
     job_id: int = Query(..., description="삭제할 Job ID")
 ):
     try:
-        if not job_service.delete_job(job_id):
+        if not await run_in_threadpool(job_service.delete_job, job_id):
             raise HTTPException(
                 status_code=404,
                 detail=ApiResponse(
@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from services.gpu_service import gpu_service
+from services.metrics import render_gauge, render_metrics
+
+router = APIRouter(
+    tags=["Metrics"],
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus 텍스트 형식 메트릭. 대기열 길이와 GPU 점유율은 GPU 상태 스냅샷(TTL 캐시)에서 읽는다."""
+    gpu_status = await gpu_service.get_gpu_status_async()
+    gpus = {
+        24: (gpu_status.gpu24gbActive, gpu_status.gpu24gbAvailable, gpu_status.totalGpu24gb),
+        8: (gpu_status.gpu8gbActive, gpu_status.gpu8gbAvailable, gpu_status.totalGpu8gb),
+    }
+    extra_lines = render_gauge("gpu_dashboard_jobs_in_queue", "대기 중인(pending) 작업 수",
+                               [({}, gpu_status.jobsInQueue)])
+    extra_lines += render_gauge("gpu_dashboard_gpus", "capacity/상태별 GPU 수", [
+        ({"capacity": str(capacity), "state": state}, count)
+        for capacity, (active, available, _) in gpus.items()
+        for state, count in (("active", active), ("available", available))
+    ])
+    extra_lines += render_gauge("gpu_dashboard_gpu_occupancy_ratio", "capacity별 사용 중인 GPU 비율", [
+        ({"capacity": str(capacity)}, active / total if total else 0.0)
+        for capacity, (active, _, total) in gpus.items()
+    ])
+    return PlainTextResponse(render_metrics(extra_lines), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,34 @@
+"""backfill 정책 시뮬레이션.
+
+multi-GPU 작업이 섞인 워크로드에서 fifo 정책(plan_placements, 기아 방지 포함)과
+EASY backfill 정책(plan_backfill)을 비교한다. backfill의 기본 성질(예약 시각 전에 끝나는 작업만
+먼저 실행, 예약된 작업은 늦어지지 않음)은 tests/test_scheduler_policy.py가 고정된 시나리오로 확인한다.
+워크로드와 시뮬레이션은 services/scheduler_simulation.py에 있다.
+
+    python -m benchmarks.backfill_sim [--jobs 2000] [--seed 7]
+"""
+import argparse
+
+from services.scheduler_policy import plan_backfill
+from services.scheduler_simulation import fifo_plan, make_workload, simulate
+
+def main():
+    parser = argparse.ArgumentParser(description="backfill 정책 시뮬레이션")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    jobs = make_workload(args.jobs, args.seed)
+    results = {
+        "fifo (skip + starvation)": simulate(jobs, fifo_plan)[0],
+        "backfill (EASY)": simulate(jobs, plan_backfill)[0],
+    }
+
+    print(f"{'policy':<26}{'makespan(h)':>12}{'mean wait(m)':>14}{'p95 wait(m)':>13}"
+          f"{'gang wait(m)':>14}{'util':>8}")
+    for name, result in results.items():
+        print(f"{name:<26}{result['makespan_h']:>12.1f}{result['mean_wait_min']:>14.1f}"
+              f"{result['p95_wait_min']:>13.1f}{result['gang_mean_wait_min']:>14.1f}{result['utilization']:>8.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""GPU 확보(claim) 처리량과 중복 배정 측정.
+
+로컬 MongoDB(MONGO_URI)의 빈 데이터베이스에서 여러 스레드가 동시에 빈 GPU를 골라 확보하고 바로 반환하는
+과정을 반복하며, 초당 확보 수와 이미 다른 스레드가 가진 GPU를 확보한 횟수(중복 배정)를 잰다.
+비교를 위해 이전 방식(find_one으로 빈 GPU를 찾은 뒤 조건 없이 update_one)도 같은 조건에서 측정한다.
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.claim_bench [--threads 16] [--seconds 5]
+
+--database로 지정한 데이터베이스(기본 gpu_dashboard_claim_bench)는 측정 전후에 삭제된다.
+"""
+import argparse
+import os
+import random
+import threading
+import time
+
+def claim_legacy(gpus_collection, job_id: int):
+    """이전 방식: 빈 GPU 조회와 배정이 별도 요청이라 그 사이 다른 요청이 같은 GPU를 가져갈 수 있음"""
+    for capacity in (24, 8):
+        gpu = gpus_collection.find_one({"capacity": capacity, "isAvailable": True})
+        if gpu:
+            gpus_collection.update_one({"_id": gpu["_id"]}, {"$set": {"isAvailable": False}})
+            return gpu["_id"]
+    return None
+
+def release_legacy(gpus_collection, gpu_id: int, job_id: int):
+    gpus_collection.update_one({"_id": gpu_id}, {"$set": {"isAvailable": True}})
+
+def claim_current(gpus_collection, job_id: int):
+    from services.gpu_allocator import gpu_allocator
+    free = [gpu["_id"] for gpu in gpus_collection.find({"isAvailable": True}, {"_id": 1})]
+    if not free:
+        return None
+    gpu_id = random.choice(free)
+    return gpu_id if gpu_allocator.claim({gpu_id: job_id}) else None
+
+def release_current(gpus_collection, gpu_id: int, job_id: int):
+    from services.gpu_allocator import gpu_allocator
+    gpu_allocator.release({gpu_id: job_id})
+
+HOLD_SECONDS = 0.001   # 확보한 GPU를 반환하기 전까지 보유하는 시간
+
+MODES = {"legacy": (claim_legacy, release_legacy), "current": (claim_current, release_current)}
+
+def measure(mode: str, threads: int, seconds: float) -> dict:
+    from database import db
+    from database_init import create_initial_gpus
+
+    db.get_collection('gpus').drop()
+    create_initial_gpus()
+    gpus_collection = db.get_collection('gpus')
+    claim, release = MODES[mode]
+    holders = {}
+    lock = threading.Lock()
+    counts = {"claims": 0, "duplicates": 0}
+    deadline = time.perf_counter() + seconds
+
+    def worker(index: int):
+        job_id = index * 1_000_000
+        while time.perf_counter() < deadline:
+            job_id += 1
+            gpu_id = claim(gpus_collection, job_id)
+            if gpu_id is None:
+                continue
+            with lock:
+                counts["claims"] += 1
+                if gpu_id in holders:
+                    counts["duplicates"] += 1   # 다른 스레드가 아직 보유 중인 GPU를 확보함
+                holders[gpu_id] = job_id
+            time.sleep(HOLD_SECONDS)
+            with lock:
+                if holders.get(gpu_id) == job_id:
+                    del holders[gpu_id]
+            release(gpus_collection, gpu_id, job_id)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {"claims_per_sec": counts["claims"] / elapsed, "duplicates": counts["duplicates"]}
+
+def main():
+    parser = argparse.ArgumentParser(description="GPU 확보 처리량과 중복 배정 측정")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--database", default="gpu_dashboard_claim_bench")
+    args = parser.parse_args()
+
+    if not os.getenv("MONGO_URI"):
+        raise SystemExit("MONGO_URI를 지정하세요. (예: mongodb://localhost:27017)")
+    os.environ["MONGO_DATABASE"] = args.database
+    from database import db
+
+    print(f"{'mode':<10}{'claims/s':>12}{'duplicates':>12}   ({args.threads} threads, {args.seconds}s)")
+    for mode in ("legacy", "current"):
+        result = measure(mode, args.threads, args.seconds)
+        print(f"{mode:<10}{result['claims_per_sec']:>12.1f}{result['duplicates']:>12}")
+    db.client.drop_database(args.database)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""메트릭 기록 비용 micro-benchmark.
+
+Counter.inc, Histogram.observe, MongoDB 명령 listener(succeeded 한 번), MetricsMiddleware
+(아무 일도 하지 않는 ASGI 앱을 감쌌을 때 늘어나는 시간)의 호출 1회당 비용을 잰다. DB는 사용하지 않는다.
+
+    python -m benchmarks.metrics_overhead [--count 200000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from services.metrics import Counter, Histogram, MetricsMiddleware, mongo_command_metrics
+
+def best_per_call(function, count: int, repeat: int) -> float:
+    """count번 호출을 repeat번 반복해 가장 빠른 회차의 호출당 시간(µs)"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(count)
+        best = min(best, time.perf_counter() - started)
+    return best / count * 1_000_000
+
+def bench_counter(count: int):
+    counter = Counter("bench_total", "bench", ("method", "route", "status"))
+    inc = counter.inc
+    for _ in range(count):
+        inc("GET", "/user/{user_id}/jobs/", "200")
+
+def bench_histogram(count: int):
+    histogram = Histogram("bench_seconds", "bench", ("method", "route"))
+    observe = histogram.observe
+    for i in range(count):
+        observe((i % 1000) / 10000, "GET", "/user/{user_id}/jobs/")
+
+MONGO_EVENT = SimpleNamespace(command_name="find", duration_micros=850)
+
+def bench_mongo_listener(count: int):
+    succeeded = mongo_command_metrics.succeeded
+    for _ in range(count):
+        succeeded(MONGO_EVENT)
+
+async def empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+async def noop_send(message):
+    pass
+
+async def noop_receive():
+    return {"type": "http.request"}
+
+def bench_asgi(app):
+    def run(count: int):
+        scope = {"type": "http", "method": "GET", "path": "/", "route": SimpleNamespace(path="/bench")}
+
+        async def drive():
+            for _ in range(count):
+                await app(scope, noop_receive, noop_send)
+
+        asyncio.run(drive())
+    return run
+
+def main():
+    parser = argparse.ArgumentParser(description="메트릭 기록 비용 micro-benchmark")
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [
+        ("Counter.inc (라벨 3개)", best_per_call(bench_counter, args.count, args.repeat)),
+        ("Histogram.observe (라벨 2개)", best_per_call(bench_histogram, args.count, args.repeat)),
+        ("Mongo listener succeeded", best_per_call(bench_mongo_listener, args.count, args.repeat)),
+    ]
+    bare = best_per_call(bench_asgi(empty_app), args.count, args.repeat)
+    wrapped = best_per_call(bench_asgi(MetricsMiddleware(empty_app)), args.count, args.repeat)
+    results.append(("MetricsMiddleware (요청당 추가 시간)", wrapped - bare))
+
+    print(f"calls: {args.count}, best of {args.repeat}")
+    for name, micros in results:
+        print(f"{name:<40}{micros:>8.2f} µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""GPU 배정 정책 시뮬레이션.
+
+기존 정책(24GB 우선, 8GB는 작업이 들어갈 때만)과 best-fit 정책을 같은 혼합 워크로드로
+비교한다. DB 없이 services.scheduler_policy의 함수를 그대로 사용한다.
+
+    python -m benchmarks.placement_sim [--jobs 2000] [--seed 42] [--interval 5] [--large-share 0.15]
+    python -m benchmarks.placement_sim --sweep
+
+--sweep은 도착 간격(부하)과 큰 작업 비율을 바꿔 가며 두 정책을 비교한다. 처리량(jobs/h)은 어느 조건에서도
+1% 안에서 같고(부하가 낮으면 도착률이, 높으면 24GB GPU 수가 처리량을 정함), best-fit의 효과는 대기 시간,
+특히 큰 작업의 대기 시간 감소로 나타난다.
+"""
+import argparse
+import heapq
+import random
+import statistics
+from typing import Callable, Dict, List, Tuple
+
+from services.scheduler_policy import group_free_gpus, plan_placements, required_memory
+from services.scheduler_simulation import GPUS   # database_init.create_initial_gpus와 같은 구성
+
+def legacy_plan(pending_jobs: List[dict], free_gpus: List[dict]) -> List[Tuple[dict, List[int]]]:
+    """기존 정책: 항상 24GB부터, 24GB가 없으면 (작업이 들어가는 경우에만) 8GB"""
+    free_by_capacity = group_free_gpus(free_gpus)
+    placements = []
+    for job in pending_jobs:
+        for capacity in (24, 8):
+            if free_by_capacity.get(capacity) and capacity >= required_memory(job):
+                placements.append((job, [free_by_capacity[capacity].pop(0)]))
+                break
+    return placements
+
+# --sweep 조건: (평균 도착 간격(분), 큰 작업 비율)
+SWEEP = [(interval, share) for interval in (6.0, 5.0, 4.0, 3.0) for share in (0.15, 0.3)]
+
+def make_workload(job_count: int, seed: int, interval: float = 5.0, large_share: float = 0.15) -> List[dict]:
+    """작은 작업(8GB 이하)과 큰 작업(16~24GB, large_share 비율)이 섞인 워크로드.
+
+    기본값(평균 5분 간격 도착, 큰 작업 15%)에서 GPU 사용률은 약 70%
+    """
+    rng = random.Random(seed)
+    jobs = []
+    now = 0.0
+    for job_id in range(1, job_count + 1):
+        now += rng.expovariate(1 / interval)
+        if rng.random() < large_share:
+            memory, runtime = rng.choice([16, 20, 24]), rng.uniform(60, 180)
+        else:
+            memory, runtime = rng.choice([None, 4, 8]), rng.uniform(20, 90)
+        jobs.append({"_id": job_id, "gpuMemory": memory, "arrival": now, "runtime": runtime})
+    return jobs
+
+def simulate(jobs: List[dict], plan: Callable[[List[dict], List[dict]], List[Tuple[dict, List[int]]]]) -> Dict[str, float]:
+    arrivals = sorted(jobs, key=lambda job: job["arrival"])
+    free = {gpu["_id"]: gpu for gpu in GPUS}
+    pending: List[dict] = []
+    completions: List[Tuple[float, int]] = []   # (종료 시각, GPU ID)
+    waits: List[float] = []
+    large_waits: List[float] = []
+    busy_time = 0.0
+    now = 0.0
+    next_arrival = 0
+
+    while next_arrival < len(arrivals) or pending or completions:
+        # 다음 이벤트(도착 또는 종료) 시각으로 이동
+        candidates = []
+        if next_arrival < len(arrivals):
+            candidates.append(arrivals[next_arrival]["arrival"])
+        if completions:
+            candidates.append(completions[0][0])
+        now = min(candidates)
+
+        while completions and completions[0][0] <= now:
+            _, gpu_id = heapq.heappop(completions)
+            free[gpu_id] = next(gpu for gpu in GPUS if gpu["_id"] == gpu_id)
+        while next_arrival < len(arrivals) and arrivals[next_arrival]["arrival"] <= now:
+            pending.append(arrivals[next_arrival])
+            next_arrival += 1
+
+        for job, (gpu_id,) in plan(pending, list(free.values())):
+            del free[gpu_id]
+            pending.remove(job)
+            waits.append(now - job["arrival"])
+            if required_memory(job) > 8:
+                large_waits.append(now - job["arrival"])
+            busy_time += job["runtime"]
+            heapq.heappush(completions, (now + job["runtime"], gpu_id))
+
+    makespan = now
+    return {
+        "makespan_h": makespan / 60,
+        "throughput_jobs_per_h": len(jobs) / (makespan / 60),
+        "mean_wait_min": statistics.mean(waits),
+        "p95_wait_min": statistics.quantiles(waits, n=20)[-1],
+        "large_job_mean_wait_min": statistics.mean(large_waits) if large_waits else 0.0,
+        "utilization": busy_time / (makespan * len(GPUS)),
+    }
+
+def sweep(job_count: int, seed: int):
+    print(f"{'interval(m)':>11}{'large':>7}{'legacy jobs/h':>15}{'best-fit jobs/h':>17}"
+          f"{'legacy wait(m)':>16}{'best-fit wait(m)':>18}{'legacy large':>14}{'best-fit large':>16}")
+    for interval, share in SWEEP:
+        jobs = make_workload(job_count, seed, interval, share)
+        legacy, best_fit = simulate(jobs, legacy_plan), simulate(jobs, plan_placements)
+        print(f"{interval:>11.1f}{share:>7.0%}{legacy['throughput_jobs_per_h']:>15.2f}"
+              f"{best_fit['throughput_jobs_per_h']:>17.2f}{legacy['mean_wait_min']:>16.1f}"
+              f"{best_fit['mean_wait_min']:>18.1f}{legacy['large_job_mean_wait_min']:>14.1f}"
+              f"{best_fit['large_job_mean_wait_min']:>16.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="GPU 배정 정책 시뮬레이션")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--interval", type=float, default=5.0, help="평균 도착 간격(분)")
+    parser.add_argument("--large-share", type=float, default=0.15, help="큰 작업(16~24GB) 비율")
+    parser.add_argument("--sweep", action="store_true", help="부하와 큰 작업 비율을 바꿔 가며 비교")
+    args = parser.parse_args()
+
+    if args.sweep:
+        sweep(args.jobs, args.seed)
+        return
+    jobs = make_workload(args.jobs, args.seed, args.interval, args.large_share)
+    results = {
+        "legacy (24GB first)": simulate(jobs, legacy_plan),
+        "best-fit": simulate(jobs, plan_placements),
+    }
+
+    print(f"{'policy':<22}{'makespan(h)':>12}{'jobs/h':>10}{'mean wait(m)':>14}{'p95 wait(m)':>13}"
+          f"{'large wait(m)':>15}{'util':>8}")
+    for name, result in results.items():
+        print(f"{name:<22}{result['makespan_h']:>12.1f}{result['throughput_jobs_per_h']:>10.2f}"
+              f"{result['mean_wait_min']:>14.1f}{result['p95_wait_min']:>13.1f}"
+              f"{result['large_job_mean_wait_min']:>15.1f}{result['utilization']:>8.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""서비스 쿼리 실행 계획 검사.
+
+별도 데이터베이스에 GPU와 작업 데이터를 채운 뒤 JobService/GpuService(와 이들이 사용하는
+GpuAllocator, UsageService, DataVersion, EventBroadcaster)를 실제로 호출하고, 그동안 Mongo로
+나간 조회/갱신 명령을 CommandListener로 모두 수집해 explain을 실행한다.
+실행 계획에 COLLSCAN이나 메모리 정렬(SORT, 인덱스를 쓰지 못한 $sort)이 있으면 실패(exit 1)한다.
+같은 검사를 tests/test_query_plans.py가 pytest로 실행한다 (MONGO_URI가 있을 때).
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.query_plans [--jobs 20000] [--keep]
+
+--database로 지정한 데이터베이스(기본 gpu_dashboard_query_plans)는 시작할 때 삭제된다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from bson import SON
+from pymongo import monitoring
+
+# 인덱스가 필요한 명령 (insert 등은 검사하지 않음)
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# explain에 넘기지 않는 세션/드라이버 필드
+DRIVER_FIELDS = {"lsid", "$db", "$clusterTime", "txnNumber", "$readPreference", "readConcern",
+                 "writeConcern", "apiVersion", "apiStrict", "apiDeprecationErrors"}
+FORBIDDEN_STAGES = {"COLLSCAN", "SORT", "$sort"}
+
+class CommandRecorder(monitoring.CommandListener):
+    """서비스가 보낸 명령을 (호출한 서비스 함수, 명령)으로 기록"""
+
+    def __init__(self, database_name: str):
+        self.database_name = database_name
+        self.enabled = False
+        self.commands = []
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if not self.enabled or event.database_name != self.database_name:
+            return
+        if event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        command = SON((key, value) for key, value in event.command.items() if key not in DRIVER_FIELDS)
+        with self._lock:
+            self.commands.append((caller(), command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def caller() -> str:
+    """명령을 보낸 서비스 코드 위치 (services/*.py의 가장 안쪽 함수)"""
+    for frame in reversed(traceback.extract_stack()):
+        path = frame.filename.replace(os.sep, "/")
+        if "/services/" in path or path.endswith("database_init.py"):
+            return f"{os.path.basename(path)}:{frame.name}"
+    return "?"
+
+def shape(value):
+    """값을 지운 명령 형태 (같은 형태의 쿼리는 한 번만 explain)"""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [shape(item) for item in value[:1]]
+    return "?"
+
+def split_statements(command: SON):
+    """update/delete는 문장별로 explain (explain은 문장 하나만 받음)"""
+    name = next(iter(command))
+    if name in ("update", "delete"):
+        statements_key = "updates" if name == "update" else "deletes"
+        for statement in command[statements_key]:
+            yield SON([(name, command[name]), (statements_key, [statement])])
+    else:
+        yield command
+
+def plan_stages(explain: dict) -> list:
+    """채택된 실행 계획의 stage 이름 목록 (rejectedPlans와 원래 명령은 제외)"""
+    stages = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in ("rejectedPlans", "command", "originalCommand"):
+                    continue
+                if key == "stage" and isinstance(value, str):
+                    stages.append(value)
+                elif key == "$sort":   # 인덱스로 처리되지 않고 파이프라인에 남은 정렬
+                    stages.append("$sort")
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explain)
+    return stages
+
+def explain_commands(database, commands) -> list:
+    """기록한 명령을 쿼리 형태별로 한 번씩 explain.
+
+    반환값: [{"source", "name", "collection", "stages", "bad": 금지된 stage 목록, "shape"}]
+    """
+    results = []
+    seen = set()
+    for source, command in commands:
+        for statement in split_statements(command):
+            name = next(iter(statement))
+            key = (source, name, statement[name], json.dumps(shape(statement), sort_keys=True, default=str))
+            if key in seen:
+                continue
+            seen.add(key)
+            stages = plan_stages(database.command("explain", statement, verbosity="queryPlanner"))
+            results.append({"source": source, "name": name, "collection": statement[name], "stages": stages,
+                            "bad": sorted(FORBIDDEN_STAGES.intersection(stages)), "shape": shape(statement)})
+    return results
+
+def seed(job_count: int):
+    """create_indexes/create_initial_gpus로 실제와 같은 인덱스와 GPU를 만들고 작업을 채운다."""
+    from database import db
+    from database_init import create_indexes, create_initial_gpus, init_job_id_counter
+
+    create_indexes()
+    create_initial_gpus()
+
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1, 9)
+    jobs = []
+    for job_id in range(1, job_count + 1):
+        requested_at = start + timedelta(minutes=job_id)
+        jobs.append({
+            "_id": job_id, "status": "completed", "log": None, "jobName": f"job-{job_id}",
+            "projectPath": "/p", "venvPath": "/v", "mainFile": "main.py", "user": f"user{rng.randrange(30)}",
+            "gpuMemory": rng.choice([None, 8, 24]), "gpuCount": 1, "sameCapacity": False,
+            "estimatedRuntime": rng.choice([None, 30, 120]), "gpuId": None,
+            "requested_at": requested_at.isoformat(),
+            "started_at": (requested_at + timedelta(minutes=1)).isoformat(),
+            "completed_at": (requested_at + timedelta(minutes=60)).isoformat(),
+        })
+    # 마지막 작업들은 실행 중(GPU 보유)과 대기 중으로 둔다
+    gpu_ids = list(range(1, 19))
+    for job, gpu_id in zip(jobs[-218:-200], gpu_ids):
+        job.update({"status": "running", "gpuId": gpu_id, "gpuIds": [gpu_id], "completed_at": None})
+    for job in jobs[-200:]:
+        job.update({"status": "pending", "gpuId": None, "started_at": None, "completed_at": None})
+
+    db.get_collection('jobs').insert_many(jobs)
+    for job in jobs[-218:-200]:
+        db.get_collection('gpus').update_one({"_id": job["gpuId"]}, {"$set": {"isAvailable": False, "jobId": job["_id"]}})
+    init_job_id_counter()
+
+def exercise():
+    """서비스의 조회/갱신 경로를 한 번씩 실행"""
+    import services.job_service as job_module
+    from database import db
+    from models import JobCreate
+    from services.analytics_service import analytics_service
+    from services.archive_service import archive_service
+    from services.event_broadcaster import event_broadcaster
+    from services.gpu_service import gpu_service
+    from services.job_service import job_service
+    from services.log_index_service import SEGMENT_MAX_LINES, log_index_service
+    from services.usage_service import usage_service
+    from services.version_service import data_version
+
+    def new_job(**kwargs) -> JobCreate:
+        return JobCreate(jobName="plan", projectPath="/p", venvPath="/v", mainFile="main.py", user="user1", **kwargs)
+
+    gpu_service.invalidate()
+    gpu_service.get_gpu_status()
+    data_version.current()
+
+    jobs, next_cursor, _ = job_service.get_all_jobs(limit=50, include_total=True)
+    job_service.get_all_jobs(limit=50, after=next_cursor)
+    job_service.get_all_jobs(limit=50, fields=["status", "jobName"])
+    job_service.get_job_by_id(jobs[0].id)
+    job_service.inspect_job(new_job(gpuMemory=24, gpuCount=2))
+
+    # 정책마다 실행 중인 작업 몇 개를 끝내서 스케줄링이 실제로 배정하도록 함
+    running = lambda: [job["_id"] for job in db.get_collection('jobs').find({"status": "running"}, {"_id": 1})]
+    for policy in job_module.SCHEDULER_POLICIES:
+        job_module.SCHEDULER_POLICY = policy
+        for job_id in running()[:3]:
+            job_service.update_job_status(job_id, "completed")
+        created = job_service.create_job(new_job(estimatedRuntime=60), "user1")
+        job_service.update_job(created.id, new_job(estimatedRuntime=90))
+
+    # reconciler 경로: 상태만 바뀌고 GPU는 아직 보유한 작업
+    for job_id in running()[:2]:
+        db.get_collection('jobs').update_one({"_id": job_id}, {"$set": {"status": "failed"}})
+    job_service.release_completed_jobs()
+
+    job_service.delete_job(running()[0])
+    job_service.delete_job(created.id)
+    usage_service.get_usage(["user1", "user2"], job_module.get_korean_time())
+
+    # 오래된 종료 작업 일부를 보관 컬렉션으로 옮기고, 보관된 작업 조회/삭제
+    archive_service.archive_batch((datetime(2025, 1, 1, 9) + timedelta(days=2)).isoformat())
+    job_service.get_job_by_id(1)
+    job_service.get_job_log(1)
+    job_service.delete_job(2)
+    now = job_module.get_korean_time()
+    analytics_service.get_analytics(now - timedelta(days=7), now, "hour", gpu_service.get_capacity_totals())
+
+    # 로그 색인/검색: 세그먼트 여러 개가 생기도록 로그를 만들고 레벨, 시각 범위로 검색
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_path = os.path.join(log_dir, "plan.log")
+        with open(log_path, "w") as file:
+            for index in range(3 * SEGMENT_MAX_LINES):
+                level = "ERROR" if index % 100 == 0 else "INFO"
+                file.write(f"{(datetime(2025, 1, 1, 9) + timedelta(seconds=index)):%Y-%m-%d %H:%M:%S} [{level}] {index}\n")
+        log_job = {"_id": 3, "logPath": log_path, "status": "completed"}
+        log_index_service.search(log_job, "ERROR", limit=10)
+        log_index_service.search(log_job, None, "2025-01-01 11:00:00", "2025-01-01 11:00:10")
+        log_index_service.ingest_active_jobs()
+        log_index_service.delete_job(3)
+
+    async def exercise_async():
+        gpu_service.invalidate()
+        await gpu_service.get_gpu_status_async()
+        await data_version.current_async()
+        page, cursor, _ = await job_service.get_all_jobs_async(limit=50, include_total=True)
+        await job_service.get_all_jobs_async(limit=50, after=cursor)
+        await job_service.get_job_by_id_async(page[0]["_id"])
+        await event_broadcaster.snapshot()
+        await db.close_async()
+
+    asyncio.run(exercise_async())
+
+def main():
+    parser = argparse.ArgumentParser(description="서비스 쿼리 실행 계획 검사")
+    parser.add_argument("--database", default="gpu_dashboard_query_plans")
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--keep", action="store_true", help="검사 후 데이터베이스를 삭제하지 않음")
+    args = parser.parse_args()
+
+    # database.py가 import될 때 이 설정으로 연결하도록 먼저 지정
+    os.environ["MONGO_DATABASE"] = args.database
+    recorder = CommandRecorder(args.database)
+    monitoring.register(recorder)
+
+    from database import db
+    db.client.drop_database(args.database)
+    try:
+        seed(args.jobs)
+        recorder.enabled = True
+        exercise()
+        recorder.enabled = False
+
+        results = explain_commands(db.db, recorder.commands)
+        failures = 0
+        for result in results:
+            failures += bool(result["bad"])
+            print(f"{'FAIL' if result['bad'] else 'ok':<5}{result['source']:<45}{result['name']} "
+                  f"{result['collection']:<10} {' > '.join(result['stages'])}")
+            if result["bad"]:
+                print(f"     {json.dumps(result['shape'], ensure_ascii=False, default=str)}")
+
+        print(f"\n{len(results)}개 쿼리 형태 검사, 실패 {failures}개")
+        sys.exit(1 if failures else 0)
+    finally:
+        if not args.keep:
+            db.client.drop_database(args.database)
+
+if __name__ == "__main__":
+    main()
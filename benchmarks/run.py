@@ -0,0 +1,353 @@
+"""API 성능 benchmark.
+
+별도 데이터베이스에 실제 규모의 데이터(GPU 18개, 작업 --jobs개, 로그 파일, 깊은 디렉토리 트리)를 채운 뒤
+FastAPI 앱을 httpx ASGITransport로 직접 호출한다 (네트워크/uvicorn 제외). 시나리오마다 --requests개의 요청을
+--concurrency개의 동시 작업자로 보내고 처리량과 p50/p95/p99 latency를 JSON으로 저장한다.
+--baseline을 지정하면 이전 결과와 비교해 p95가 늘거나 처리량이 줄어든 시나리오가 --tolerance를 넘으면 실패(exit 1)한다.
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.run [--jobs 10000] [--concurrency 16]
+        [--requests 2000] [--pollers 200] [--scenarios list_jobs,get_gpus] [--output benchmark_results.json]
+        [--baseline benchmarks/baseline.json] [--tolerance 0.2] [--archive]
+
+--archive를 지정하면 시드한 종료 작업을 모두 jobs_archive로 옮긴 뒤 측정한다 (보관 이동 전후 비교용).
+
+poll 시나리오는 대시보드 polling(GPU 상태, 작업 목록, 작업 상세)을 --pollers개(기본 200)의 동시 작업자로 보낸다.
+poll_blocking은 같은 조회를 이전 방식(async 라우트 안에서 동기 pymongo 호출)으로 처리하는 benchmark 전용
+라우트로 보내므로, 두 결과의 p99를 비교하면 이벤트 루프를 막지 않는 효과를 볼 수 있다.
+
+--database로 지정한 데이터베이스(기본 gpu_dashboard_bench)는 시작할 때 삭제된다.
+디렉토리 트리와 로그 파일은 임시 디렉토리에 만들고 끝나면 삭제한다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+BENCH_USER = "bench"
+SEED_BATCH_SIZE = 10000
+LOG_FILE_COUNT = 200        # 로그 파일을 만드는 작업 수 (log=true 시나리오는 이 작업들만 조회)
+LOG_LINES = 5000
+POLLERS = 200               # poll 시나리오의 동시 작업자 수
+POLL_SCENARIOS = ("poll", "poll_blocking")
+
+def seed_jobs(job_count: int, log_dir: str, rng: random.Random) -> list:
+    """완료된 작업으로 채우고 마지막 일부는 실행/대기 중으로 둔다. 반환값: 로그 파일이 있는 작업 ID 목록"""
+    from database import db
+    from database_init import create_indexes, create_initial_gpus, init_job_id_counter
+
+    create_indexes()
+    create_initial_gpus()
+    jobs_collection = db.get_collection('jobs')
+    gpus_collection = db.get_collection('gpus')
+
+    log_job_ids = set(rng.sample(range(1, job_count + 1), min(LOG_FILE_COUNT, job_count)))
+    running_ids = range(job_count - 217, job_count - 199)   # 대기 작업 200개 바로 앞의 18개가 GPU를 모두 사용
+    start = datetime(2025, 1, 1, 9)
+    batch = []
+    for job_id in range(1, job_count + 1):
+        requested_at = start + timedelta(seconds=30 * job_id)
+        job = {
+            "_id": job_id, "status": "completed", "log": None, "jobName": f"train-{job_id}",
+            "projectPath": f"/Users/{BENCH_USER}/project{job_id % 50}", "venvPath": f"/Users/{BENCH_USER}/.venv",
+            "mainFile": "main.py", "user": f"user{rng.randrange(30)}", "gpuMemory": rng.choice([None, 8, 24]),
+            "gpuCount": 1, "sameCapacity": False, "estimatedRuntime": rng.choice([None, 30, 120]), "gpuId": None,
+            "requested_at": requested_at.isoformat(),
+            "started_at": (requested_at + timedelta(minutes=1)).isoformat(),
+            "completed_at": (requested_at + timedelta(minutes=60)).isoformat(),
+        }
+        if job_id in log_job_ids:
+            job["logPath"] = os.path.join(log_dir, f"{job_id}.log")
+        if job_id > job_count - 200:
+            job.update({"status": "pending", "started_at": None, "completed_at": None})
+        elif job_id in running_ids:
+            gpu_id = job_id - running_ids.start + 1
+            job.update({"status": "running", "gpuId": gpu_id, "gpuIds": [gpu_id], "completed_at": None})
+        batch.append(job)
+        if len(batch) >= SEED_BATCH_SIZE:
+            jobs_collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        jobs_collection.insert_many(batch, ordered=False)
+
+    for job_id in running_ids:
+        gpus_collection.update_one({"_id": job_id - running_ids.start + 1},
+                                   {"$set": {"isAvailable": False, "jobId": job_id}})
+    init_job_id_counter()
+
+    line = "step {} loss 0.1234 lr 0.0001 " + "x" * 60 + "\n"
+    for job_id in log_job_ids:
+        with open(os.path.join(log_dir, f"{job_id}.log"), "w") as log_file:
+            log_file.writelines(line.format(step) for step in range(LOG_LINES))
+    return sorted(log_job_ids)
+
+def seed_tree(root: str, depth: int, width: int, files_per_dir: int) -> list:
+    """width^depth 구조의 디렉토리 트리. 반환값: 사용자 홈 기준 디렉토리 경로 목록"""
+    directories = [""]
+    frontier = [""]
+    for _ in range(depth):
+        next_frontier = []
+        for parent in frontier:
+            for index in range(width):
+                path = os.path.join(parent, f"dir{index}")
+                next_frontier.append(path)
+        frontier = next_frontier
+        directories.extend(frontier)
+    for path in directories:
+        full_path = os.path.join(root, path)
+        os.makedirs(full_path, exist_ok=True)
+        for index in range(files_per_dir):
+            with open(os.path.join(full_path, f"file{index}.txt"), "wb") as file:
+                file.write(b"x" * (index * 100))
+    return directories
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+async def run_scenario(client: httpx.AsyncClient, make_request, request_count: int, concurrency: int) -> dict:
+    """make_request(rng) -> (method, url, kwargs). 동시 작업자 concurrency개가 요청을 나눠 보낸다."""
+    latencies = []
+    errors = 0
+    remaining = iter(range(request_count))
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        rng = random.Random(worker_id)
+        for _ in remaining:
+            method, url, kwargs = make_request(rng)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+def blocking_router():
+    """이전 방식의 polling 라우트: async 라우트 안에서 동기 서비스를 호출해 조회하는 동안 이벤트 루프가 멈춤"""
+    from fastapi import APIRouter
+    from services.gpu_service import gpu_service
+    from services.job_service import job_service
+
+    router = APIRouter(prefix="/bench/blocking")
+
+    @router.get("/gpu")
+    async def blocking_gpu():
+        return gpu_service.get_gpu_status()
+
+    @router.get("/jobs")
+    async def blocking_jobs(limit: int = 100):
+        jobs, next_cursor, _ = job_service.get_all_jobs(limit=limit)
+        return {"data": jobs, "next_cursor": next_cursor}
+
+    @router.get("/job")
+    async def blocking_job(job_id: int):
+        return job_service.get_job_by_id(job_id)
+
+    return router
+
+def build_scenarios(job_count: int, log_job_ids: list, directories: list) -> dict:
+    jobs_url = f"/user/{BENCH_USER}/jobs/"
+
+    def create_job(rng):
+        # 작업 소유자는 경로의 user_id로 정해지므로 여러 사용자의 경로로 나눠 생성
+        body = {"jobName": "bench", "projectPath": f"/Users/{BENCH_USER}/project", "venvPath": "/v",
+                "mainFile": "main.py", "gpuMemory": rng.choice([None, 8, 24]),
+                "estimatedRuntime": rng.choice([None, 30, 120])}
+        return "POST", f"/user/user{rng.randrange(30)}/jobs/", {"json": body}
+
+    def poll(rng):
+        kind = rng.random()
+        if kind < 0.4:
+            return "GET", "/resource/gpu/", {}
+        if kind < 0.8:
+            return "GET", jobs_url, {"params": {"limit": 100}}
+        return "GET", jobs_url, {"params": {"job_id": rng.randint(1, job_count)}}
+
+    def poll_blocking(rng):
+        kind = rng.random()
+        if kind < 0.4:
+            return "GET", "/bench/blocking/gpu", {}
+        if kind < 0.8:
+            return "GET", "/bench/blocking/jobs", {"params": {"limit": 100}}
+        return "GET", "/bench/blocking/job", {"params": {"job_id": rng.randint(1, job_count)}}
+
+    return {
+        "create_job": create_job,
+        "list_jobs": lambda rng: ("GET", jobs_url, {"params": {"limit": 100}}),
+        "get_job": lambda rng: ("GET", jobs_url, {"params": {"job_id": rng.randint(1, job_count)}}),
+        "get_job_log": lambda rng: ("GET", jobs_url, {"params": {"job_id": rng.choice(log_job_ids), "log": "true"}}),
+        "get_gpus": lambda rng: ("GET", "/resource/gpu/", {}),
+        "list_files": lambda rng: ("GET", f"/user/{BENCH_USER}/file/list",
+                                   {"params": {"path": rng.choice(directories), "limit": 100}}),
+        "poll": poll,
+        "poll_blocking": poll_blocking,
+    }
+
+async def run_benchmarks(args, log_job_ids: list, directories: list, tree_root: str) -> dict:
+    import main
+    from api.file import get_file_service
+    from services.archive_service import archive_service
+    from services.file_service import FileService
+    from services.startup import startup_state
+
+    # 파일 API는 /Users/{user_id}를 기준으로 하므로 benchmark 동안만 임시 트리로 바꿈
+    main.app.dependency_overrides[get_file_service] = lambda user_id: FileService(base_remote_path=tree_root)
+    main.app.include_router(blocking_router())
+    # 시드한 오래된 종료 작업이 측정 도중 보관 컬렉션으로 옮겨지지 않도록 백그라운드 보관 이동을 끔
+    # (보관 이동 후의 조회 성능은 --archive로 미리 옮긴 뒤 측정)
+    archive_service.after_days = 0
+    await main.app.router.startup()
+    while not startup_state.ready:
+        await asyncio.sleep(0.01)
+
+    scenarios = build_scenarios(args.jobs, log_job_ids, directories)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in selected:
+                make_request = scenarios[name]
+                concurrency = args.pollers if name in POLL_SCENARIOS else args.concurrency
+                # 캐시/연결 준비를 위한 warm-up (결과에서 제외)
+                await run_scenario(client, make_request, min(50, args.requests), concurrency)
+                results[name] = await run_scenario(client, make_request, args.requests, concurrency)
+                print_row(name, results[name])
+    finally:
+        await main.app.router.shutdown()
+        main.app.dependency_overrides.clear()
+    return results
+
+def print_row(name: str, result: dict, note: str = ""):
+    print(f"{name:<14}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+          f"{result['p99_ms']:>10.2f}{result['errors']:>8}  {note}")
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """기준 결과보다 p95가 (1 + tolerance)배를 넘거나 처리량이 (1 - tolerance)배 미만인 시나리오"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} rps")
+    return regressions
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def main():
+    parser = argparse.ArgumentParser(description="API 성능 benchmark")
+    parser.add_argument("--database", default="gpu_dashboard_bench")
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="시나리오별 요청 수")
+    parser.add_argument("--pollers", type=int, default=POLLERS, help="poll 시나리오의 동시 작업자 수")
+    parser.add_argument("--scenarios", help="실행할 시나리오 (쉼표로 구분, 기본: 전체)")
+    parser.add_argument("--tree-depth", type=int, default=4)
+    parser.add_argument("--tree-width", type=int, default=4)
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--archive", action="store_true", help="종료된 작업을 보관 컬렉션으로 옮긴 뒤 측정")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용하는 성능 저하 비율")
+    args = parser.parse_args()
+    if args.jobs < 1000:
+        parser.error("--jobs는 1000 이상이어야 합니다.")
+
+    if not os.getenv("MONGO_URI"):
+        raise SystemExit("MONGO_URI를 지정하세요. (예: mongodb://localhost:27017)")
+    # database.py가 import될 때 이 설정으로 연결하도록 먼저 지정
+    os.environ["MONGO_DATABASE"] = args.database
+
+    from database import db
+    db.client.drop_database(args.database)
+    work_dir = tempfile.mkdtemp(prefix="gpu_dashboard_bench_")
+    try:
+        log_dir = os.path.join(work_dir, "logs")
+        tree_root = os.path.join(work_dir, "home")
+        os.makedirs(log_dir)
+
+        started = time.perf_counter()
+        rng = random.Random(args.seed)
+        log_job_ids = seed_jobs(args.jobs, log_dir, rng)
+        directories = seed_tree(tree_root, args.tree_depth, args.tree_width, args.files_per_dir)
+        if args.archive:
+            from models import get_korean_time
+            from services.archive_service import archive_service
+            while archive_service.archive_batch(get_korean_time().isoformat()):
+                pass
+        print(f"seed: jobs {args.jobs}, directories {len(directories)}, {time.perf_counter() - started:.1f}s")
+
+        print(f"{'scenario':<14}{'rps':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'errors':>8}")
+        results = asyncio.run(run_benchmarks(args, log_job_ids, directories, tree_root))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        db.client.drop_database(args.database)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "jobs": args.jobs,
+            "concurrency": args.concurrency,
+            "pollers": args.pollers,
+            "requests": args.requests,
+            "directories": len(directories),
+            "archived": args.archive,
+        },
+        "scenarios": results,
+    }
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"결과 저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("meta", {}).get("jobs") != args.jobs:
+            print(f"⚠️ 기준 결과의 작업 수({baseline.get('meta', {}).get('jobs')})가 다릅니다.")
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"기준 결과({args.baseline}) 대비 성능 저하 없음 (허용 {args.tolerance:.0%})")
+
+if __name__ == "__main__":
+    main()
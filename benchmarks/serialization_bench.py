@@ -0,0 +1,70 @@
+"""작업 목록 응답 직렬화 micro-benchmark.
+
+Job 10,000개를 기존 경로(JobSummary 생성 -> JobListResponse -> FastAPI response_model 검증 후
+json 직렬화)와 현재 경로(job_summary_document dict -> orjson)로 직렬화해 걸린 시간을 비교한다.
+DB는 사용하지 않는다.
+
+    python -m benchmarks.serialization_bench [--jobs 10000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+from typing import Union
+
+import orjson
+from pydantic import TypeAdapter
+
+from models import JobListResponse, JobLogResponse, JobResponse, JobSummary
+from services.job_service import job_summary_document
+
+def make_jobs(count: int) -> list:
+    return [
+        {"_id": job_id, "status": "completed", "jobName": f"train-{job_id}", "projectPath": f"/Users/u/p{job_id}",
+         "venvPath": "/Users/u/.venv", "mainFile": "main.py", "user": f"user{job_id % 20}", "gpuMemory": 8,
+         "gpuCount": 1, "sameCapacity": False, "requested_at": "2025-01-01T09:00:00+09:00",
+         "started_at": "2025-01-01T09:00:05+09:00", "completed_at": "2025-01-01T10:00:00+09:00"}
+        for job_id in range(1, count + 1)
+    ]
+
+# api/jobs.py의 목록 라우트 반환 타입 (FastAPI가 response_model로 사용)
+RESPONSE_ADAPTER = TypeAdapter(Union[JobListResponse, JobResponse, JobLogResponse])
+
+def legacy_path(jobs_data: list) -> bytes:
+    response = JobListResponse(code=200, message="Job list를 불러왔습니다.",
+                               data=[JobSummary(**job_data) for job_data in jobs_data])
+    # FastAPI: response_model로 다시 검증한 뒤 JSON 호환 값으로 변환, JSONResponse는 json.dumps 사용
+    validated = RESPONSE_ADAPTER.validate_python(response)
+    content = RESPONSE_ADAPTER.dump_python(validated, mode="json", by_alias=True)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def fast_path(jobs_data: list) -> bytes:
+    return orjson.dumps({"code": 200, "message": "Job list를 불러왔습니다.",
+                         "data": [job_summary_document(job_data) for job_data in jobs_data],
+                         "next_cursor": None, "total": None})
+
+def measure(function, jobs_data: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(jobs_data)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="작업 목록 직렬화 micro-benchmark")
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    jobs_data = make_jobs(args.jobs)
+    if orjson.loads(legacy_path(jobs_data)) != orjson.loads(fast_path(jobs_data)):
+        raise SystemExit("두 경로의 응답 내용이 다릅니다.")
+
+    legacy_ms = measure(legacy_path, jobs_data, args.repeat)
+    fast_ms = measure(fast_path, jobs_data, args.repeat)
+    print(f"jobs: {args.jobs}, best of {args.repeat}")
+    print(f"{'legacy (pydantic + response_model + json)':<44}{legacy_ms:>10.1f} ms")
+    print(f"{'fast (dict + orjson)':<44}{fast_ms:>10.1f} ms   x{legacy_ms / fast_ms:.1f}")
+
+if __name__ == "__main__":
+    main()
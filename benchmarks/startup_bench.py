@@ -0,0 +1,122 @@
+"""서버 시작 시간 측정.
+
+로컬 MongoDB(MONGO_URI)의 빈 데이터베이스를 대상으로, 새 프로세스에서 main을 import하고
+startup 이벤트를 실행해 요청을 받을 수 있을 때까지(accept)와 DB 초기화가 끝날 때까지(ready)의
+시간을 잰다. 비교를 위해 이전 방식(import 시 ping, startup에서 GPU를 하나씩 insert하고 모든 컬렉션의
+문서 수를 센 뒤에야 요청을 받음)도 같은 조건에서 측정한다.
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.startup_bench [--repeat 5]
+
+--database로 지정한 데이터베이스(기본 gpu_dashboard_startup_bench)는 매 측정 전에 삭제된다.
+MONGO_URI 서버에 접속할 수 없으면 current는 READY_TIMEOUT_SECONDS 동안 ready를 기다린 뒤 ready 없이
+accept까지만 기록하고, 시작 전에 ping하는 legacy는 실패로 표시한다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+READY_TIMEOUT_SECONDS = 30   # 이 시간 안에 DB 초기화가 끝나지 않으면 ready를 기록하지 않음
+
+def run_current() -> dict:
+    started = time.perf_counter()
+    import main
+    from services.startup import startup_state
+    imported = time.perf_counter()
+
+    async def boot():
+        await main.app.router.startup()
+        accepting = time.perf_counter()
+        ready = None
+        while time.perf_counter() - accepting < READY_TIMEOUT_SECONDS:
+            if startup_state.ready:
+                ready = time.perf_counter()
+                break
+            await asyncio.sleep(0.001)
+        await main.app.router.shutdown()
+        return accepting, ready
+
+    accepting, ready = asyncio.run(boot())
+    return {"import_ms": (imported - started) * 1000, "accept_ms": (accepting - started) * 1000,
+            "ready_ms": (ready - started) * 1000 if ready else None}
+
+def run_legacy() -> dict:
+    """이전 startup 순서를 그대로 실행 (모두 끝나야 요청을 받을 수 있었음)"""
+    started = time.perf_counter()
+    import main  # 같은 모듈을 import한 상태에서 비교
+    from database import db
+    from database_init import create_indexes, init_job_id_counter
+    db.ping()   # 이전에는 database.py import 시 ping
+    imported = time.perf_counter()
+
+    for collection_name in ['gpus', 'jobs', 'counters']:
+        db.get_collection(collection_name)
+    create_indexes()
+    gpus_collection = db.get_collection('gpus')
+    if gpus_collection.count_documents({}) == 0:
+        for gpu_id in range(1, 19):
+            gpus_collection.insert_one({"_id": gpu_id, "capacity": 24 if gpu_id <= 6 else 8, "isAvailable": True})
+    init_job_id_counter()
+    for collection_name in db.db.list_collection_names():
+        db.get_collection(collection_name).count_documents({})
+    ready = time.perf_counter()
+    return {"import_ms": (imported - started) * 1000, "accept_ms": (ready - started) * 1000,
+            "ready_ms": (ready - started) * 1000}
+
+def drop_database(database: str):
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+    try:
+        with MongoClient(os.environ["MONGO_URI"], serverSelectionTimeoutMS=2000) as client:
+            client.drop_database(database)
+    except PyMongoError as e:
+        print(f"데이터베이스 삭제 실패 (서버에 접속할 수 없음): {e}", file=sys.stderr)
+
+def measure(mode: str, database: str) -> Optional[dict]:
+    """새 프로세스에서 한 번 측정. 시작에 실패하면(legacy는 서버에 접속할 수 없을 때) None"""
+    drop_database(database)
+    env = {**os.environ, "MONGO_DATABASE": database}
+    completed = subprocess.run([sys.executable, "-m", "benchmarks.startup_bench", "--child", mode],
+                               env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return None
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def median(results: List[dict], key: str) -> str:
+    values = [result[key] for result in results if result[key] is not None]
+    return f"{statistics.median(values):.1f}" if values else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 시작 시간 측정")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", default="gpu_dashboard_startup_bench")
+    parser.add_argument("--child", choices=["current", "legacy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_current() if args.child == "current" else run_legacy()
+        print(json.dumps(result))
+        return
+
+    if not os.getenv("MONGO_URI"):
+        raise SystemExit("MONGO_URI를 지정하세요. (예: mongodb://localhost:27017)")
+
+    print(f"{'mode':<10}{'import(ms)':>12}{'accept(ms)':>12}{'ready(ms)':>12}   (median of {args.repeat})")
+    for mode in ("legacy", "current"):
+        results = [result for result in (measure(mode, args.database) for _ in range(args.repeat)) if result]
+        if not results:
+            print(f"{mode:<10}{'시작 실패':>12}")
+            continue
+        failed = f"   ({args.repeat - len(results)}회 시작 실패)" if len(results) < args.repeat else ""
+        print(f"{mode:<10}{median(results, 'import_ms'):>12}{median(results, 'accept_ms'):>12}"
+              f"{median(results, 'ready_ms'):>12}{failed}")
+
+    drop_database(args.database)
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,107 @@
 import os
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+import threading
+from pymongo import AsyncMongoClient, MongoClient
 from dotenv import load_dotenv
 
+from services.metrics import mongo_command_metrics
+
 load_dotenv()
 
+CLIENT_OPTIONS = {
+    "serverSelectionTimeoutMS": 5000,
+    "connectTimeoutMS": 5000,
+    "socketTimeoutMS": 5000,
+    "event_listeners": [mongo_command_metrics],   # 명령 종류별 수/처리 시간 (/metrics)
+}
+
 class Database:
+    """MongoDB 연결. import 시에는 접속하지 않고, 처음 컬렉션을 사용할 때 클라이언트를 만든다.
+
+    MongoClient는 생성 시 서버에 접속하지 않으므로(백그라운드에서 연결) 서버 시작을 막지 않으며,
+    서버에 접속할 수 없으면 첫 번째 쿼리에서 오류가 발생한다.
+    """
+
     def __init__(self):
-        self.client = None
-        self.db = None
-        self._connect()
+        self._client = None
+        self._db = None
+        self.async_client = None   # async 라우트용 클라이언트 (이벤트 루프 안에서 처음 사용할 때 생성)
+        self.async_db = None
+        self._mongo_uri = None
+        self._database_name = None
+        self._lock = threading.Lock()
     
-    def _connect(self):
-        try:
-            mongo_uri = os.getenv('MONGO_URI')
-            
-            if not mongo_uri:
-                host = os.getenv('MONGO_HOST')
-                port = os.getenv('MONGO_PORT')
-                username = os.getenv('MONGO_USERNAME')
-                password = os.getenv('MONGO_PASSWORD')
-                database = os.getenv('MONGO_DATABASE')
-                auth_source = os.getenv('MONGO_AUTH_SOURCE')
-                
-                mongo_uri = f"mongodb://{username}:{password}@{host}:{port}/{database}?authSource={auth_source}"
-            
-            self.client = MongoClient(
-                mongo_uri,
-                serverSelectionTimeoutMS=5000, 
-                connectTimeoutMS=5000,
-                socketTimeoutMS=5000
-            )
-            
-            self.client.admin.command('ping')
-            print("✅ MongoDB 연결 성공")
-            
-            database_name = os.getenv('MONGO_DATABASE', 'gpu_dashboard')
-            self.db = self.client[database_name]
+    def _resolve_uri(self) -> str:
+        mongo_uri = os.getenv('MONGO_URI')
+        
+        if not mongo_uri:
+            host = os.getenv('MONGO_HOST')
+            port = os.getenv('MONGO_PORT')
+            username = os.getenv('MONGO_USERNAME')
+            password = os.getenv('MONGO_PASSWORD')
+            database = os.getenv('MONGO_DATABASE')
+            auth_source = os.getenv('MONGO_AUTH_SOURCE')
             
-        except ConnectionFailure as e:
-            print(f"❌ MongoDB 연결 실패: {e}")
-            raise
-        except ServerSelectionTimeoutError as e:
-            print(f"❌ MongoDB 서버 선택 타임아웃: {e}")
-            raise
-        except Exception as e:
-            print(f"❌ MongoDB 연결 중 오류 발생: {e}")
-            raise
+            mongo_uri = f"mongodb://{username}:{password}@{host}:{port}/{database}?authSource={auth_source}"
+        return mongo_uri
+    
+    def _connect(self):
+        with self._lock:
+            if self._client is not None:
+                return
+            try:
+                self._mongo_uri = self._resolve_uri()
+                self._database_name = os.getenv('MONGO_DATABASE', 'gpu_dashboard')
+                client = MongoClient(self._mongo_uri, **CLIENT_OPTIONS)
+                self._db = client[self._database_name]
+                self._client = client
+                print("✅ MongoDB 클라이언트 생성")
+            except Exception as e:
+                print(f"❌ MongoDB 클라이언트 생성 중 오류 발생: {e}")
+                raise
+    
+    @property
+    def client(self):
+        if self._client is None:
+            self._connect()
+        return self._client
+    
+    @property
+    def db(self):
+        if self._db is None:
+            self._connect()
+        return self._db
+    
+    def ping(self):
+        """서버 접속 확인. 접속할 수 없으면 ConnectionFailure/ServerSelectionTimeoutError 발생"""
+        self.client.admin.command('ping')
     
     def get_collection(self, collection_name):
-        if self.db is None:
-            raise Exception("데이터베이스가 연결되지 않았습니다.")
         return self.db[collection_name]
     
+    def get_async_collection(self, collection_name):
+        """async 라우트에서 사용할 컬렉션. 이벤트 루프를 막지 않는다."""
+        if self._mongo_uri is None:
+            self._connect()
+        if self.async_client is None:
+            self.async_client = AsyncMongoClient(self._mongo_uri, **CLIENT_OPTIONS)
+            self.async_db = self.async_client[self._database_name]
+        return self.async_db[collection_name]
+    
+    async def ping_async(self):
+        self.get_async_collection('gpus')   # 클라이언트가 없으면 생성
+        await self.async_client.admin.command('ping')
+    
     def close(self):
-        if self.client is not None:
-            self.client.close()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            self._db = None
             print("✅ MongoDB 연결 종료")
+    
+    async def close_async(self):
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
+            self.async_db = None
 
 db = Database() 
\ No newline at end of file
@@ -1,15 +1,17 @@
 import sys
 import os
 from datetime import datetime
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ReturnDocument, UpdateOne
 from database import db
+from services.indexes import INDEXES
 
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 def create_collections():
     print("📁 MongoDB 컬렉션 확인 중...")
-    collections = ['gpus', 'jobs'] 
+    collections = ['gpus', 'jobs', 'jobs_archive', 'job_rollups', 'counters', 'user_usage',
+                   'gpu_samples_10s', 'gpu_samples_1m', 'gpu_samples_1h', 'log_segments', 'log_ingest_state']
 
     for collection_name in collections:
         try:
@@ -21,90 +23,108 @@ def create_collections():
 def create_indexes():
     print("MongoDB 인덱스 생성 중...")
     
-    try:        
-        jobs_collection = db.get_collection('jobs')
-        jobs_collection.create_index([("requested_at", DESCENDING)])
-        jobs_collection.create_index("status")
-        # print("jobs 컬렉션 인덱스 생성 완료")
-    except Exception as e:
-        print(f"jobs 컬렉션 인덱스 생성 실패: {e}")
-    
-    try:
-        gpus_collection = db.get_collection('gpus')
-        gpus_collection.create_index("isAvailable")
-        # print("gpus 컬렉션 인덱스 생성 완료")
-    except Exception as e:
-        print(f"gpus 컬렉션 인덱스 생성 실패: {e}")
+    # 인덱스 목록은 services/indexes.py에서 쿼리와 함께 관리
+    for collection_name, indexes in INDEXES.items():
+        try:
+            collection = db.get_collection(collection_name)
+            for index in indexes:
+                collection.create_index(index["keys"], **index.get("options", {}))
+            # print(f"{collection_name} 컬렉션 인덱스 생성 완료")
+        except Exception as e:
+            print(f"{collection_name} 컬렉션 인덱스 생성 실패: {e}")
+
+# 초기 GPU 구성: (GPU ID 범위, capacity GB)
+INITIAL_GPUS = [(range(1, 7), 24), (range(7, 19), 8)]
 
 def create_initial_gpus():
+    """초기 GPU 문서를 한 번의 bulk upsert로 만든다. 이미 있는 GPU는 변경하지 않으므로 여러 번 실행해도 안전"""
     try:
         gpus_collection = db.get_collection('gpus')
         
-        if gpus_collection.count_documents({}) > 0:
-            print("기존 GPU 데이터를 보존합니다.")
-            return
+        result = gpus_collection.bulk_write([
+            UpdateOne(
+                {"_id": gpu_id},
+                {"$setOnInsert": {"capacity": capacity, "isAvailable": True}},
+                upsert=True
+            )
+            for gpu_ids, capacity in INITIAL_GPUS for gpu_id in gpu_ids
+        ], ordered=False)
         
-        print("새로운 GPU 데이터를 생성합니다.")
-        for i in range(1, 7):
-            gpu_data = {
-                "_id": i,
-                "capacity": 24,
-                "isAvailable": True
-            }
-            gpus_collection.insert_one(gpu_data)
-                
-        for i in range(7, 19):
-            gpu_data = {
-                "_id": i,
-                "capacity": 8,
-                "isAvailable": True
-            }
-            gpus_collection.insert_one(gpu_data)    
+        if result.upserted_count:
+            print(f"새로운 GPU 데이터 {result.upserted_count}개를 생성했습니다.")
+        else:
+            print("기존 GPU 데이터를 보존합니다.")
         
     except Exception as e:
         print(f"GPU 데이터 생성 실패: {e}")
 
+# counters 컬렉션에서 job ID 시퀀스를 관리하는 문서의 _id
+JOB_ID_COUNTER = "jobs"
+
+def init_job_id_counter():
+    """job ID 카운터를 현재 jobs 컬렉션의 최대 _id 이상으로 맞춘다 (기존 배포 마이그레이션)
+
+    실패를 삼키면 카운터가 기존 ID보다 작은 채로 서버가 준비되어 중복 ID가 발급되므로,
+    예외를 그대로 올려 initialize_database가 False를 반환하고 다시 시도하게 한다.
+    """
+    jobs_collection = db.get_collection('jobs')
+    counters_collection = db.get_collection('counters')
+
+    max_job = jobs_collection.find_one({}, projection={"_id": 1}, sort=[("_id", -1)])
+    max_job_id = max_job["_id"] if max_job else 0
+
+    # $max는 카운터가 이미 더 크면 아무것도 바꾸지 않으므로 재시작해도 안전
+    counters_collection.update_one(
+        {"_id": JOB_ID_COUNTER},
+        {"$max": {"seq": max_job_id}},
+        upsert=True
+    )
+
 def get_next_job_id():
+    """counters 컬렉션의 시퀀스를 원자적으로 1 증가시켜 새 job ID를 반환"""
     try:
-        jobs_collection = db.get_collection('jobs')
-        
-        max_job_id = 0
-        if jobs_collection.count_documents({}) > 0:
-            max_job = jobs_collection.find_one(sort=[("_id", -1)])
-            if max_job:
-                max_job_id = max_job["_id"]
-        
-        next_id = max_job_id + 1
-        return next_id
-        
+        counters_collection = db.get_collection('counters')
+        counter = counters_collection.find_one_and_update(
+            {"_id": JOB_ID_COUNTER},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter["seq"]
+
     except Exception as e:
         print(f"Job ID 생성 실패: {e}")
         return None
 
-def initialize_database():
+def initialize_database() -> bool:
+    """서버 시작 시 필요한 컬렉션/인덱스/초기 데이터를 준비. 서버에 접속할 수 없으면 False"""
     print("=" * 60)
     print("🚀 데이터베이스 연결 및 확인")
     print("=" * 60)
     try:
+        db.ping()
         create_collections()
         create_indexes()
         create_initial_gpus()
+        init_job_id_counter()
+        return True
 
-        collections = db.db.list_collection_names()
-        print(f"\n확인된 컬렉션: {collections}")
-        
-        # 각 컬렉션의 문서 수 출력
-        for collection_name in collections:
-            try:
-                collection = db.get_collection(collection_name)
-                count = collection.count_documents({})
-                # print(f"  - {collection_name}: {count}개 문서")
-            except Exception as e:
-                print(f"  - {collection_name}: 조회 실패 ({e})")
-                
     except Exception as e:
         print(f"\n❌ 데이터베이스 연결 실패: {e}")
         return False
 
+def print_collection_stats():
+    """컬렉션별 문서 수 출력 (서버 시작에는 필요 없으므로 이 파일을 직접 실행할 때만 사용)"""
+    collections = db.db.list_collection_names()
+    print(f"\n확인된 컬렉션: {collections}")
+    
+    for collection_name in collections:
+        try:
+            count = db.get_collection(collection_name).estimated_document_count()
+            print(f"  - {collection_name}: {count}개 문서")
+        except Exception as e:
+            print(f"  - {collection_name}: 조회 실패 ({e})")
+
 if __name__ == "__main__":
-    initialize_database() 
\ No newline at end of file
+    if initialize_database():
+        print_collection_stats() 
\ No newline at end of file
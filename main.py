@@ -3,9 +3,15 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from dotenv import load_dotenv
-from api import jobs, gpu, file
+from api import jobs, gpu, file, events, metrics, analytics
 from database import db
-from database_init import initialize_database
+from services.reconciler import reconciler
+from services.archive_service import archive_service
+from services.gpu_sampler import gpu_sampler
+from services.log_index_service import log_index_service
+from services.event_broadcaster import event_broadcaster
+from services.metrics import MetricsMiddleware
+from services.startup import startup_state
 
 load_dotenv() 
 app = FastAPI(title="GPU Dashboard Server")
@@ -21,25 +27,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # 모든 HTTP 메서드 허용 
     allow_headers=["*"],  # 모든 헤더 허용
+    expose_headers=["ETag"],  # 대시보드가 조건부 GET(If-None-Match)에 사용
 )
+app.add_middleware(MetricsMiddleware)   # 라우트별 요청 수/응답 시간 (/metrics)
 
 app.include_router(jobs.router)
 app.include_router(gpu.router)
 app.include_router(file.router)
+app.include_router(events.router)
+app.include_router(metrics.router)
+app.include_router(analytics.router)
 
 @app.get("/")
 def read_root():
     return {"message": "GPU Dashboard Server", "status": "running"}
 
 @app.get("/health")
-def health_check():
+async def health_check():
+    # 백그라운드 초기화가 끝나기 전에는 DB 확인 없이 starting 반환
+    if not startup_state.ready:
+        return {
+            "status": "starting",
+            "message": "데이터베이스 초기화 중입니다.",
+            "startup": startup_state.status()
+        }
     try:
         # MongoDB 연결 상태 확인
-        db.client.admin.command('ping')
+        await db.ping_async()
         return {
             "status": "healthy",
             "database": "connected",
-            "message": "서버가 정상적으로 실행 중입니다."
+            "message": "서버가 정상적으로 실행 중입니다.",
+            "startup": startup_state.status(),
+            "reconciler": reconciler.status(),
+            "archive": archive_service.status(),
+            "gpu_sampler": gpu_sampler.status(),
+            "log_index": log_index_service.status(),
+            "events": event_broadcaster.status()
         }
     except Exception as e:
         return {
@@ -50,10 +74,19 @@ def health_check():
 
 @app.on_event("startup")
 async def startup_event():
-    initialize_database()
+    # DB 초기화는 백그라운드에서 진행하여 바로 요청을 받을 수 있도록 함 (끝나면 reconciler 시작)
+    startup_state.start()
+    event_broadcaster.start()   # 작업/GPU 상태 변경을 /events 구독자에게 전달
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await startup_state.stop()
+    await reconciler.stop()
+    await archive_service.stop()
+    await gpu_sampler.stop()
+    await log_index_service.stop()
+    event_broadcaster.stop()
+    await db.close_async()
     db.close()
 
 if __name__ == "__main__":
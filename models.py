@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime, timezone, timedelta
 
 KST = timezone(timedelta(hours=9))
@@ -34,17 +34,50 @@ class Job(MongoBaseModel):
     venvPath: str
     mainFile: str
     user: Optional[str] = None 
-    gpuId: Optional[int] = None  # 배정된 GPU ID
+    gpuMemory: Optional[int] = None  # 필요한 GPU 메모리(GB), 없으면 어떤 GPU든 가능
+    gpuCount: int = 1  # 필요한 GPU 개수 (모두 확보되어야 실행)
+    sameCapacity: bool = False  # True면 같은 capacity의 GPU로만 배정
+    estimatedRuntime: Optional[int] = None  # 예상 실행 시간(분), backfill 정책에서 사용
+    logPath: Optional[str] = None  # 작업 로그 파일 경로 (없으면 JOB_LOG_PATH_TEMPLATE 규칙 사용)
+    gpuId: Optional[int] = None  # 배정된 GPU ID (multi-GPU 작업은 첫 번째 GPU)
+    gpuIds: Optional[List[int]] = None  # 배정된 GPU ID 전체
     requested_at: str = Field(default_factory=lambda: get_korean_time().isoformat())  # 작업 요청 시간
     started_at: Optional[str] = None    # 작업 시작 시간
     completed_at: Optional[str] = None  # 작업 종료 시간
 
+class JobSummary(MongoBaseModel):  # 목록 조회용, fields 프로젝션에 따라 일부 필드만 채워진다
+    id: int = Field(default=0, alias="_id")
+    status: Optional[str] = None
+    log: Optional[str] = None
+    jobName: Optional[str] = None
+    projectPath: Optional[str] = None
+    venvPath: Optional[str] = None
+    mainFile: Optional[str] = None
+    user: Optional[str] = None
+    gpuMemory: Optional[int] = None
+    gpuCount: Optional[int] = None
+    sameCapacity: Optional[bool] = None
+    estimatedRuntime: Optional[int] = None
+    logPath: Optional[str] = None
+    gpuId: Optional[int] = None
+    gpuIds: Optional[List[int]] = None
+    requested_at: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+
+# 목록 조회 fields 파라미터로 지정 가능한 필드 (Mongo 문서 기준 이름)
+JOB_FIELDS = [field.alias or name for name, field in Job.model_fields.items()]
+
 class JobCreate(BaseModel):
     jobName: str
     projectPath: str
     venvPath: str
     mainFile: str
     user: Optional[str] = None
+    gpuMemory: Optional[int] = Field(default=None, ge=1, description="필요한 GPU 메모리(GB). 이를 만족하는 가장 작은 GPU에 배정")
+    gpuCount: int = Field(default=1, ge=1, description="필요한 GPU 개수. 모두 확보되었을 때만 실행")
+    sameCapacity: bool = Field(default=False, description="True면 같은 capacity의 GPU로만 배정")
+    estimatedRuntime: Optional[int] = Field(default=None, ge=1, description="예상 실행 시간(분). backfill 정책에서 사용")
 
 class JobResponse(ApiResponse):
     data: Optional[Job] = None
@@ -52,7 +85,9 @@ class JobResponse(ApiResponse):
     file_name: Optional[str] = None
 
 class JobListResponse(ApiResponse):
-    data: Optional[List[Job]] = None
+    data: Optional[List[JobSummary]] = None
+    next_cursor: Optional[str] = None   # 다음 페이지 조회 시 after 파라미터로 전달
+    total: Optional[int] = None         # total=true로 요청한 경우에만 채워짐
 
 class GpuStatus(BaseModel):
     gpu24gbActive: int  #사용 중인 GPU 개수
@@ -60,12 +95,46 @@ class GpuStatus(BaseModel):
     gpu24gbAvailable: int   #사용 가능한 24gb gpu 갯수 
     gpu8gbAvailable: int
     jobsInQueue: int 
-    totalGpu24gb: int = 6
-    totalGpu8gb: int = 12    
+    totalGpu24gb: int   # gpus 컬렉션 기준 전체 개수
+    totalGpu8gb: int    
 
 class GpuStatusResponse(ApiResponse):
     data: Optional[GpuStatus] = None
 
+class GpuHistory(BaseModel):  # 차트용 GPU 상태 시계열 (열 배열)
+    resolution: str         # 10s, 1m, 1h
+    interval_seconds: int
+    timestamps: List[str]   # 구간 시작 시각 (KST)
+    series: Dict[str, Dict[str, List[Optional[float]]]]   # {필드: {avg, min, max}}
+
+class GpuHistoryResponse(ApiResponse):
+    data: Optional[GpuHistory] = None
+
+class UsageRollup(BaseModel):  # 기간(또는 구간 하나)의 GPU 사용/대기 집계
+    start: str
+    gpuHours: Dict[str, float]      # capacity(GB)별 GPU 사용 시간
+    unknownGpuHours: float = 0.0    # capacity를 알 수 없는 GPU 시간 (이력 재계산분). 0보다 크면 사용률은 하한값
+    utilization: Dict[str, float]   # capacity별 사용률 (0~1, 현재 보유 GPU 수 기준, unknownGpuHours 제외)
+    userGpuHours: Dict[str, float]  # 사용자별 GPU 사용 시간
+    jobsStarted: int
+    jobsFinished: int
+    waitMeanSeconds: Optional[float] = None     # 요청 -> 시작 (이 기간에 시작한 작업)
+    waitP50Seconds: Optional[float] = None      # 백분위수는 histogram 구간으로 추정한 값
+    waitP95Seconds: Optional[float] = None
+    runtimeMeanSeconds: Optional[float] = None  # 시작 -> 종료 (이 기간에 종료한 작업)
+    runtimeP50Seconds: Optional[float] = None
+    runtimeP95Seconds: Optional[float] = None
+
+class AnalyticsSummary(BaseModel):
+    granularity: str
+    start: str
+    end: str
+    totals: UsageRollup
+    buckets: List[UsageRollup]
+
+class AnalyticsResponse(ApiResponse):
+    data: Optional[AnalyticsSummary] = None
+
 class FileItem(BaseModel):  #파일 또는 폴더의 기본 정보
     name: str
     is_directory: bool
@@ -76,7 +145,22 @@ class FileItem(BaseModel):  #파일 또는 폴더의 기본 정보
 class DirectoryContent(BaseModel):
     current_path: str
     items: List[FileItem]
+    total: Optional[int] = None   # 페이지네이션 전 전체 항목 수
 
 class JobLogResponse(ApiResponse):
     log_content: Optional[str] = None
-    file_name: Optional[str] = None    
\ No newline at end of file
+    file_name: Optional[str] = None
+    offset: Optional[int] = None        # log_content가 시작하는 바이트 위치
+    next_offset: Optional[int] = None   # 이어서 읽을 때 offset으로 전달
+    file_size: Optional[int] = None    
+
+class LogLine(BaseModel):
+    line: int                       # 0부터 시작하는 줄 번호
+    offset: int                     # 줄이 시작하는 바이트 위치
+    ts: Optional[str] = None        # "YYYY-MM-DD HH:MM:SS" (형식이 다른 줄은 앞 줄의 시각)
+    level: Optional[str] = None
+    text: str
+
+class JobLogSearchResponse(ApiResponse):
+    lines: List[LogLine] = []
+    next_after: Optional[int] = None   # 결과가 더 있으면 다음 검색의 after로 전달
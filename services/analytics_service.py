@@ -0,0 +1,281 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+from pymongo import UpdateOne
+
+from database import db
+from models import KST
+from services.archive_service import unpack_job
+from services.gpu_service import gpu_service
+
+# 집계 단위: {이름: 구간 길이}
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# 대기/실행 시간 histogram 구간 경계 (초). 마지막 구간은 마지막 경계 이상
+WAIT_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 14400, 28800, 86400)
+RUNTIME_BUCKETS = (300, 900, 1800, 3600, 7200, 14400, 28800, 86400, 172800)
+
+def parse_time(value: str) -> datetime:
+    """저장된 ISO 시각 (시간대가 없으면 KST로 간주)"""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=KST)
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    moment = moment.astimezone(KST).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == "day" else moment
+
+def bucket_end(moment: datetime, granularity: str) -> datetime:
+    """moment를 포함하는 구간의 끝 (moment가 구간 시작이면 그대로)"""
+    start = bucket_start(moment, granularity)
+    return start if start == moment else start + GRANULARITIES[granularity]
+
+def rollup_id(granularity: str, start: datetime) -> str:
+    """rollup 문서 _id. 같은 단위의 문서는 _id 순서가 시간 순서와 같아 _id 범위로 기간을 조회한다."""
+    return f"{granularity}|{start.isoformat()}"
+
+def field_key(value) -> str:
+    """사용자 이름 등을 문서 필드 이름으로 사용할 수 있도록 '.', '$'를 인코딩 (unquote로 복원)"""
+    return str(value).replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+def split_by_bucket(start: datetime, end: datetime, granularity: str) -> List[Tuple[datetime, float]]:
+    """[start, end) 구간을 집계 단위로 나눈다. 반환값: [(구간 시작, 구간 안에 포함된 시간(시간 단위))]"""
+    pieces = []
+    step = GRANULARITIES[granularity]
+    current = bucket_start(start, granularity)
+    while current < end:
+        overlap = min(end, current + step) - max(start, current)
+        if overlap.total_seconds() > 0:
+            pieces.append((current, overlap.total_seconds() / 3600))
+        current += step
+    return pieces
+
+def job_gpus(job: dict) -> list:
+    """작업이 사용한 GPU ID 목록. 반환 후 GPU 정보가 지워진 작업은 gpuCount만큼 None (inferred_capacity로 추정)"""
+    if job.get("gpuIds"):
+        return job["gpuIds"]
+    if job.get("gpuId"):
+        return [job["gpuId"]]
+    return [None] * (job.get("gpuCount") or 1)
+
+def inferred_capacity(job: dict, capacity_totals: Dict[int, int]) -> Optional[int]:
+    """GPU ID가 남지 않은 작업의 capacity. 요구 조건(gpuMemory, sameCapacity이면 gpuCount)을 만족하는
+    capacity가 하나뿐일 때만 알 수 있고, 아니면 None (best-fit이 더 큰 GPU에 배정했을 수도 있음)"""
+    memory = job.get("gpuMemory") or 0
+    fitting = [capacity for capacity, total in capacity_totals.items()
+               if capacity >= memory and (not job.get("sameCapacity") or total >= (job.get("gpuCount") or 1))]
+    return fitting[0] if len(fitting) == 1 else None
+
+def histogram_index(seconds: float, bounds: Tuple[int, ...]) -> int:
+    for index, bound in enumerate(bounds):
+        if seconds < bound:
+            return index
+    return len(bounds)
+
+def histogram_percentile(counts: List[int], bounds: Tuple[int, ...], fraction: float) -> Optional[float]:
+    """구간별 개수로 추정한 백분위수 (초). 구간 안에서는 선형 보간, 마지막 구간은 하한값"""
+    total = sum(counts)
+    if not total:
+        return None
+    target = fraction * total
+    cumulative = 0
+    for index, count in enumerate(counts):
+        if count and cumulative + count >= target:
+            lower = bounds[index - 1] if index > 0 else 0
+            if index >= len(bounds):
+                return float(lower)
+            return lower + (bounds[index] - lower) * (target - cumulative) / count
+        cumulative += count
+    return float(bounds[-1])
+
+class RollupBatch:
+    """rollup 문서별 $inc를 모아 한 번의 bulk_write로 반영"""
+
+    def __init__(self):
+        self.increments: Dict[str, Dict[str, float]] = {}
+        self.starts: Dict[str, Tuple[str, str]] = {}
+
+    def add(self, granularity: str, start: datetime, field: str, amount: float):
+        key = rollup_id(granularity, start)
+        self.starts[key] = (granularity, start.isoformat())
+        increments = self.increments.setdefault(key, {})
+        increments[field] = increments.get(field, 0) + amount
+
+    def add_all(self, moment: datetime, field: str, amount: float):
+        for granularity in GRANULARITIES:
+            self.add(granularity, bucket_start(moment, granularity), field, amount)
+
+    def flush(self):
+        if not self.increments:
+            return
+        db.get_collection('job_rollups').bulk_write([
+            UpdateOne(
+                {"_id": key},
+                {"$inc": increments,
+                 "$setOnInsert": {"granularity": self.starts[key][0], "start": self.starts[key][1]}},
+                upsert=True
+            )
+            for key, increments in self.increments.items()
+        ], ordered=False)
+
+class AnalyticsService:
+    """GPU 사용 시간과 대기/실행 시간의 시간/일 단위 집계(job_rollups).
+
+    작업이 시작되거나 GPU를 반환할 때 해당 구간 문서만 $inc로 갱신하므로,
+    기간 조회 비용은 작업 수가 아니라 구간 수에 비례한다.
+    문서 형태: {"_id": "hour|2025-01-01T09:00:00+09:00", "granularity", "start",
+               "gpuHours": {capacity: GPU 시간}, "userGpuHours": {user: GPU 시간},
+               "jobsStarted", "jobsFinished", "waitBuckets": {index: 개수}, "waitSeconds",
+               "runtimeBuckets": {index: 개수}, "runtimeSeconds"}
+    """
+
+    def record_started(self, placements: Iterable[Tuple[dict, List[int]]], started_at: datetime):
+        """GPU를 배정받아 시작한 작업들의 대기 시간 (요청 -> 시작)"""
+        batch = RollupBatch()
+        for job, _ in placements:
+            batch.add_all(started_at, "jobsStarted", 1)
+            if job.get("requested_at"):
+                wait_seconds = max((started_at - parse_time(job["requested_at"])).total_seconds(), 0.0)
+                batch.add_all(started_at, f"waitBuckets.{histogram_index(wait_seconds, WAIT_BUCKETS)}", 1)
+                batch.add_all(started_at, "waitSeconds", wait_seconds)
+        try:
+            batch.flush()
+        except Exception as e:
+            print(f"대기 시간 집계 실패: {e}")
+
+    def record_finished(self, jobs: Iterable[dict], ended_at: datetime):
+        """GPU를 반환한 작업들의 실행 시간과 GPU 사용 시간 (capacity별/사용자별, 실행 구간을 시간 단위로 나눠 반영)"""
+        jobs = [job for job in jobs if job.get("started_at")]
+        if not jobs:
+            return
+        try:
+            gpu_ids = list({gpu_id for job in jobs for gpu_id in job_gpus(job) if gpu_id is not None})
+            capacities = {gpu["_id"]: gpu.get("capacity")
+                          for gpu in db.get_collection('gpus').find({"_id": {"$in": gpu_ids}}, {"capacity": 1})}
+            capacity_totals = gpu_service.get_capacity_totals()
+
+            batch = RollupBatch()
+            for job in jobs:
+                started = parse_time(job["started_at"])
+                ended = parse_time(job["completed_at"]) if job.get("completed_at") else ended_at
+                ended = max(ended, started)
+                runtime_seconds = (ended - started).total_seconds()
+                batch.add_all(ended, "jobsFinished", 1)
+                batch.add_all(ended, f"runtimeBuckets.{histogram_index(runtime_seconds, RUNTIME_BUCKETS)}", 1)
+                batch.add_all(ended, "runtimeSeconds", runtime_seconds)
+
+                gpu_ids = job_gpus(job)
+                job_capacities = [capacities.get(gpu_id) if gpu_id is not None else inferred_capacity(job, capacity_totals)
+                                  for gpu_id in gpu_ids]
+                user = field_key(job.get("user") or "anonymous")
+                for granularity in GRANULARITIES:
+                    for start, hours in split_by_bucket(started, ended, granularity):
+                        for capacity in job_capacities:
+                            batch.add(granularity, start, f"gpuHours.{capacity or 'unknown'}", hours)
+                        batch.add(granularity, start, f"userGpuHours.{user}", hours * len(gpu_ids))
+            batch.flush()
+        except Exception as e:
+            print(f"GPU 사용 시간 집계 실패: {e}")
+
+    def get_rollups(self, granularity: str, start: datetime, end: datetime) -> List[dict]:
+        """[start, end) 기간과 겹치는 구간 문서 (_id 범위 조회)"""
+        first = rollup_id(granularity, bucket_start(start, granularity))
+        last = rollup_id(granularity, bucket_end(end, granularity))
+        return list(db.get_collection('job_rollups').find({"_id": {"$gte": first, "$lt": last}}).sort("_id", 1))
+
+    def summarize(self, rollups: List[dict], hours: float, capacity_totals: Dict[int, int]) -> dict:
+        """구간 문서들을 합쳐 GPU 사용 시간/사용률과 대기/실행 시간 백분위수 계산"""
+        gpu_hours: Dict[str, float] = {}
+        user_gpu_hours: Dict[str, float] = {}
+        wait_counts = [0] * (len(WAIT_BUCKETS) + 1)
+        runtime_counts = [0] * (len(RUNTIME_BUCKETS) + 1)
+        jobs_started = jobs_finished = 0
+        wait_seconds = runtime_seconds = 0.0
+        for rollup in rollups:
+            for capacity, value in rollup.get("gpuHours", {}).items():
+                gpu_hours[capacity] = gpu_hours.get(capacity, 0.0) + value
+            for user, value in rollup.get("userGpuHours", {}).items():
+                user_gpu_hours[unquote(user)] = user_gpu_hours.get(unquote(user), 0.0) + value
+            for index, count in rollup.get("waitBuckets", {}).items():
+                wait_counts[int(index)] += count
+            for index, count in rollup.get("runtimeBuckets", {}).items():
+                runtime_counts[int(index)] += count
+            jobs_started += rollup.get("jobsStarted", 0)
+            jobs_finished += rollup.get("jobsFinished", 0)
+            wait_seconds += rollup.get("waitSeconds", 0.0)
+            runtime_seconds += rollup.get("runtimeSeconds", 0.0)
+
+        # capacity를 알 수 없는 시간은 어느 capacity의 사용률에도 넣지 않고 unknownGpuHours로 따로 알림
+        utilization = {
+            str(capacity): min(gpu_hours.get(str(capacity), 0.0) / (total * hours), 1.0)
+            for capacity, total in capacity_totals.items() if total and hours > 0
+        }
+        return {
+            "gpuHours": {capacity: round(value, 4) for capacity, value in gpu_hours.items() if capacity != "unknown"},
+            "unknownGpuHours": round(gpu_hours.get("unknown", 0.0), 4),
+            "utilization": {capacity: round(value, 4) for capacity, value in utilization.items()},
+            "userGpuHours": {user: round(value, 4) for user, value in user_gpu_hours.items()},
+            "jobsStarted": jobs_started,
+            "jobsFinished": jobs_finished,
+            "waitMeanSeconds": wait_seconds / sum(wait_counts) if sum(wait_counts) else None,
+            "waitP50Seconds": histogram_percentile(wait_counts, WAIT_BUCKETS, 0.5),
+            "waitP95Seconds": histogram_percentile(wait_counts, WAIT_BUCKETS, 0.95),
+            "runtimeMeanSeconds": runtime_seconds / sum(runtime_counts) if sum(runtime_counts) else None,
+            "runtimeP50Seconds": histogram_percentile(runtime_counts, RUNTIME_BUCKETS, 0.5),
+            "runtimeP95Seconds": histogram_percentile(runtime_counts, RUNTIME_BUCKETS, 0.95),
+        }
+
+    def get_analytics(self, start: datetime, end: datetime, granularity: str,
+                      capacity_totals: Dict[int, int]) -> dict:
+        """기간 전체 합계와 구간별 값. 사용률은 현재 보유한 GPU 수(capacity_totals) 기준"""
+        step_hours = GRANULARITIES[granularity].total_seconds() / 3600
+        rollups = self.get_rollups(granularity, start, end)
+        buckets = [
+            {"start": rollup["start"], **self.summarize([rollup], step_hours, capacity_totals)}
+            for rollup in rollups
+        ]
+        first = bucket_start(start, granularity)
+        last = bucket_end(end, granularity)
+        total_hours = (last - first).total_seconds() / 3600
+        return {
+            "granularity": granularity,
+            "start": first.isoformat(),
+            "end": last.isoformat(),
+            "totals": {"start": first.isoformat(), **self.summarize(rollups, total_hours, capacity_totals)},
+            "buckets": buckets,
+        }
+
+    def rebuild(self):
+        """job_rollups를 지우고 jobs/jobs_archive의 시작된 작업으로 다시 계산 (집계 도입 전 이력 반영용)
+
+        GPU를 반환한 작업에는 GPU ID가 남지 않으므로 이력의 GPU 시간은 요구 조건으로 capacity를 정할 수 있을 때만
+        capacity별로 집계되고(inferred_capacity), 나머지는 "unknown"으로 집계되어 사용률에서 빠진다.
+        """
+        db.get_collection('job_rollups').delete_many({})
+        sources = [
+            db.get_collection('jobs').find({"started_at": {"$ne": None}}),
+            (unpack_job(archived) for archived in db.get_collection('jobs_archive').find()),
+        ]
+        for source in sources:
+            batch = []
+            for job in source:
+                if not job.get("started_at"):
+                    continue
+                batch.append(job)
+                if len(batch) >= 1000:
+                    self._rebuild_batch(batch)
+                    batch = []
+            self._rebuild_batch(batch)
+
+    def _rebuild_batch(self, jobs: List[dict]):
+        for job in jobs:
+            self.record_started([(job, [])], parse_time(job["started_at"]))
+        # 아직 GPU를 보유한 작업은 GPU를 반환할 때 기록됨
+        self.record_finished([job for job in jobs if job.get("completed_at") and not job.get("gpuId")],
+                             datetime.now(KST))
+
+analytics_service = AnalyticsService()
+
+if __name__ == "__main__":
+    analytics_service.rebuild()
+    print("✅ 작업 집계(job_rollups)를 다시 계산했습니다.")
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import time
+import zlib
+from datetime import timedelta
+from typing import Optional
+
+import bson
+from bson import Binary
+from pymongo import ReplaceOne
+
+from database import db
+from models import get_korean_time
+from services.version_service import data_version
+
+# 종료된 지 이 기간이 지난 작업을 jobs_archive로 옮긴다 (0 이하이면 보관 이동을 하지 않음)
+ARCHIVE_AFTER_DAYS = float(os.getenv('ARCHIVE_AFTER_DAYS', '30'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '1000'))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv('ARCHIVE_INTERVAL_SECONDS', '3600'))
+# true이면 작업 문서 전체를 zlib으로 압축해 저장 (조회용 필드 몇 개만 그대로 둠)
+ARCHIVE_COMPRESS = os.getenv('ARCHIVE_COMPRESS', 'false').lower() in ('1', 'true', 'yes')
+
+FINISHED_JOB_STATUSES = ["completed", "failed"]
+# 압축해도 그대로 남겨 두는 필드 (보관된 작업을 사용자/기간으로 찾을 수 있도록)
+ARCHIVE_PLAIN_FIELDS = ["user", "status", "requested_at", "completed_at"]
+
+def pack_job(job: dict, archived_at: str, compress: bool) -> dict:
+    """jobs 문서를 jobs_archive 문서로 변환"""
+    if not compress:
+        return {**job, "archived_at": archived_at}
+    packed = {field: job.get(field) for field in ARCHIVE_PLAIN_FIELDS}
+    packed.update({
+        "_id": job["_id"],
+        "archived_at": archived_at,
+        "compressed": True,
+        "data": Binary(zlib.compress(bson.encode(job))),
+    })
+    return packed
+
+def unpack_job(archived: dict) -> dict:
+    """jobs_archive 문서를 원래 jobs 문서 형태로 복원"""
+    if archived.get("compressed"):
+        return bson.decode(zlib.decompress(archived["data"]))
+    job = dict(archived)
+    job.pop("archived_at", None)
+    return job
+
+class ArchiveService:
+    """종료된 오래된 작업을 jobs에서 jobs_archive로 옮기는 백그라운드 작업.
+
+    jobs에는 대기/실행 중인 작업과 최근 작업만 남으므로 목록/대기열 조회 비용이 전체 이력과 무관해진다.
+    보관된 작업은 목록에는 나오지 않으며, ID 조회(get_job_by_id)와 삭제는 jobs에 없을 때 보관 컬렉션을 확인한다.
+    """
+
+    def __init__(self, after_days: float = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE,
+                 interval: float = ARCHIVE_INTERVAL_SECONDS, compress: bool = ARCHIVE_COMPRESS):
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.compress = compress
+        self.last_run_at: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_archived_count = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def archive_batch(self, cutoff: str) -> int:
+        """cutoff(ISO 시각) 이전에 종료되고 GPU를 반환한 작업을 최대 batch_size개 옮긴다. 반환값: 옮긴 작업 수"""
+        jobs_collection = db.get_collection('jobs')
+        archive_collection = db.get_collection('jobs_archive')
+        finished = {"status": {"$in": FINISHED_JOB_STATUSES}, "gpuId": None}
+
+        jobs = list(jobs_collection.find({**finished, "completed_at": {"$lt": cutoff}}).limit(self.batch_size))
+        if not jobs:
+            return 0
+        job_ids = [job["_id"] for job in jobs]
+
+        # 먼저 보관 컬렉션에 쓰고(upsert라 중간에 실패해도 다시 실행하면 됨) jobs에서 삭제
+        archived_at = get_korean_time().isoformat()
+        archive_collection.bulk_write([
+            ReplaceOne({"_id": job["_id"]}, pack_job(job, archived_at, self.compress), upsert=True)
+            for job in jobs
+        ], ordered=False)
+        # 보관본을 쓰는 사이 사용자가 삭제했거나 다시 실행된 작업은 제외하고 한 번에 삭제
+        present_ids = [job["_id"] for job in jobs_collection.find({"_id": {"$in": job_ids}, **finished}, {"_id": 1})]
+        deleted_count = 0
+        if present_ids:
+            deleted_count = jobs_collection.delete_many({"_id": {"$in": present_ids}, **finished}).deleted_count
+        deleted_ids = present_ids
+        if deleted_count < len(present_ids):
+            # 조회와 삭제 사이에 바뀐 작업이 있으면 jobs에 남은 작업을 제외
+            remaining = {job["_id"] for job in jobs_collection.find({"_id": {"$in": present_ids}}, {"_id": 1})}
+            deleted_ids = [job_id for job_id in present_ids if job_id not in remaining]
+            # 그래도 수가 맞지 않으면 그 사이 사용자가 삭제한 작업이 섞여 있어 구분할 수 없으므로 보관본을 남김
+            # (보관된 작업도 삭제 API로 지울 수 있음)
+
+        if len(deleted_ids) < len(job_ids):
+            # 그 사이 상태가 바뀌었거나(jobs에 남음) 사용자가 삭제한 작업은 보관본을 지움
+            deleted = set(deleted_ids)
+            archive_collection.delete_many({"_id": {"$in": [job_id for job_id in job_ids if job_id not in deleted]}})
+        if deleted_count:
+            data_version.bump()
+        return deleted_count
+
+    def get_job(self, job_id: int) -> Optional[dict]:
+        try:
+            archived = db.get_collection('jobs_archive').find_one({"_id": job_id})
+            return unpack_job(archived) if archived else None
+        except Exception as e:
+            print(f"보관된 작업 조회 실패: {e}")
+            return None
+
+    async def get_job_async(self, job_id: int) -> Optional[dict]:
+        try:
+            archived = await db.get_async_collection('jobs_archive').find_one({"_id": job_id})
+            return unpack_job(archived) if archived else None
+        except Exception as e:
+            print(f"보관된 작업 조회 실패: {e}")
+            return None
+
+    def delete_job(self, job_id: int) -> bool:
+        try:
+            return db.get_collection('jobs_archive').delete_one({"_id": job_id}).deleted_count > 0
+        except Exception as e:
+            print(f"보관된 작업 삭제 실패: {e}")
+            return False
+
+    def start(self):
+        if self._task is not None or self.after_days <= 0:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        started = time.perf_counter()
+        archived_count = 0
+        try:
+            cutoff = (get_korean_time() - timedelta(days=self.after_days)).isoformat()
+            # 배치마다 스레드를 돌려받아 다른 요청이 DB를 오래 기다리지 않도록 함
+            while True:
+                count = await asyncio.to_thread(self.archive_batch, cutoff)
+                archived_count += count
+                if count < self.batch_size:
+                    break
+            if archived_count:
+                print(f"종료된 작업 {archived_count}개를 보관 컬렉션으로 옮겼습니다.")
+        except Exception as e:
+            print(f"작업 보관 이동 실패: {e}")
+        finally:
+            self.last_archived_count = archived_count
+            self.last_run_at = get_korean_time().isoformat()
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def status(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "after_days": self.after_days,
+            "interval_seconds": self.interval,
+            "compress": self.compress,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_archived_count": self.last_archived_count,
+        }
+
+archive_service = ArchiveService()
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from itertools import islice
+from typing import AsyncIterator, Deque, List, Optional, Tuple, Union
+
+from database import db
+from services.gpu_service import gpu_service
+from services.job_service import job_service
+
+# 재접속한 클라이언트에게 다시 보내기 위해 보관하는 최근 이벤트 수
+EVENT_BUFFER_SIZE = int(os.getenv('EVENT_BUFFER_SIZE', '1000'))
+# 작업 이벤트가 몰릴 때 GPU 상태를 한 번만 다시 계산하기 위한 대기 시간 (초)
+GPU_STATUS_DEBOUNCE_SECONDS = 0.2
+# 연결 유지를 위해 이벤트가 없을 때 보내는 주석 주기 (초)
+HEARTBEAT_SECONDS = 15.0
+
+# 스냅샷에 포함하는 진행 중인 작업과 필드
+ACTIVE_JOB_STATUSES = ["pending", "running"]
+SNAPSHOT_JOB_PROJECTION = {"status": 1, "jobName": 1, "user": 1, "gpuId": 1, "gpuIds": 1,
+                           "requested_at": 1, "started_at": 1}
+
+# 작업 이벤트별로 알 수 있는 상태
+JOB_EVENT_STATUS = {"created": "pending", "assigned": "running", "deleted": "deleted"}
+# JobService 이벤트 인자를 API 응답과 같은 필드 이름으로 변환
+EVENT_FIELD_NAMES = {"gpu_ids": "gpuIds", "old_status": "oldStatus", "new_status": "newStatus"}
+
+def format_sse(event_id: str, event: str, message: str) -> bytes:
+    return f"id: {event_id}\nevent: {event}\ndata: {message}\n\n".encode('utf-8')
+
+def format_ws(event_id: str, event: str, message: str) -> str:
+    """WebSocket 메시지: {"id": ..., "event": ..., "data": ...}. message는 이미 JSON 문자열"""
+    return f'{{"id": "{event_id}", "event": "{event}", "data": {message}}}'
+
+class EventBroadcaster:
+    """JobService의 작업 이벤트와 GPU 상태 변화를 SSE 구독자에게 전달한다.
+
+    이벤트는 발생할 때 한 번만 직렬화하여 순번(seq)과 함께 링 버퍼에 저장하고,
+    구독자는 각자 마지막으로 받은 순번 이후의 이벤트를 버퍼에서 읽어 간다.
+    따라서 구독자 수가 늘어도 이벤트마다 직렬화나 DB 조회를 반복하지 않는다.
+    """
+
+    def __init__(self, buffer_size: int = EVENT_BUFFER_SIZE):
+        self._buffer: Deque[Tuple[int, bytes, str]] = deque(maxlen=buffer_size)   # (seq, SSE, WebSocket)
+        self._seq = 0
+        # 이벤트 ID는 "{epoch}-{seq}". 서버가 재시작되면 epoch가 바뀌어 이전 ID로는 이어 받지 않음
+        self.epoch = format(time.time_ns() // 1_000_000, 'x')
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._new_event: Optional[asyncio.Event] = None
+        self._gpu_refresh: Optional[asyncio.TimerHandle] = None
+        self._gpu_status: Optional[dict] = None
+        self.subscriber_count = 0
+
+    def start(self):
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._new_event = asyncio.Event()
+        job_service.add_listener(self._on_job_event)
+
+    def stop(self):
+        if self._gpu_refresh is not None:
+            self._gpu_refresh.cancel()
+            self._gpu_refresh = None
+        if self._new_event is not None:
+            self._new_event.set()   # 대기 중인 구독자를 깨워 종료하도록 함
+        self._loop = None
+
+    def parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """클라이언트의 Last-Event-ID에서 순번을 꺼낸다. 다른 서버 실행에서 받은 ID면 None"""
+        if not event_id:
+            return None
+        epoch, _, seq = event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _on_job_event(self, event: str, job_id: int, **data):
+        # JobService는 스레드풀에서 호출되므로 직렬화만 여기서 하고 저장은 이벤트 루프에서 수행
+        if self._loop is None:
+            return
+        payload = {"event": event, "jobId": job_id,
+                   **{EVENT_FIELD_NAMES.get(key, key): value for key, value in data.items()}}
+        status = data.get("new_status") or JOB_EVENT_STATUS.get(event)
+        if status:
+            payload["status"] = status
+        message = json.dumps(payload, ensure_ascii=False)
+        try:
+            self._loop.call_soon_threadsafe(self._publish_job_event, message)
+        except RuntimeError:   # 이벤트 루프가 이미 종료됨
+            pass
+
+    def _publish_job_event(self, message: str):
+        self._append("job", message)
+        if self._gpu_refresh is None:
+            self._gpu_refresh = self._loop.call_later(GPU_STATUS_DEBOUNCE_SECONDS, self._schedule_gpu_refresh)
+
+    def _append(self, event: str, message: str):
+        self._seq += 1
+        event_id = f"{self.epoch}-{self._seq}"
+        self._buffer.append((self._seq, format_sse(event_id, event, message), format_ws(event_id, event, message)))
+        # 기다리는 구독자를 모두 깨우고 다음 이벤트를 위한 Event로 교체
+        self._new_event.set()
+        self._new_event = asyncio.Event()
+
+    def _schedule_gpu_refresh(self):
+        self._loop.create_task(self._refresh_gpu_status())
+
+    async def _refresh_gpu_status(self):
+        """GPU 상태를 다시 계산해 바뀐 필드만 gpu 이벤트로 전달"""
+        self._gpu_refresh = None
+        try:
+            gpu_status = (await gpu_service.get_gpu_status_async()).model_dump()
+        except Exception as e:
+            print(f"GPU 상태 이벤트 생성 실패: {e}")
+            return
+        previous = self._gpu_status or {}
+        delta = {key: value for key, value in gpu_status.items() if previous.get(key) != value}
+        self._gpu_status = gpu_status
+        if delta and self._new_event is not None:
+            self._append("gpu", json.dumps(delta, ensure_ascii=False))
+
+    def events_after(self, seq: int) -> Optional[List[Tuple[int, bytes, str]]]:
+        """seq 이후의 이벤트 목록. 버퍼에서 이미 밀려난 이벤트가 있으면 None (스냅샷부터 다시 받아야 함)"""
+        if seq > self._seq:
+            return None
+        if seq == self._seq:
+            return []
+        if not self._buffer or self._buffer[0][0] > seq + 1:
+            return None
+        # 순번이 연속이므로 seq 다음 이벤트의 위치를 바로 계산
+        return list(islice(self._buffer, seq + 1 - self._buffer[0][0], None))
+
+    async def snapshot(self) -> Tuple[int, dict]:
+        """현재 GPU 상태와 진행 중인 작업 목록. 반환값: (스냅샷 기준 순번, 스냅샷)
+
+        순번을 먼저 기록하므로, 조회하는 동안 발생한 이벤트는 스냅샷 이후에 다시 전달된다.
+        """
+        seq = self._seq
+        jobs_collection = db.get_async_collection('jobs')
+        gpu_status = await gpu_service.get_gpu_status_async()
+        jobs = await jobs_collection.find(
+            {"status": {"$in": ACTIVE_JOB_STATUSES}}, SNAPSHOT_JOB_PROJECTION
+        ).sort([("requested_at", 1), ("_id", 1)]).to_list()
+        return seq, {"gpu": gpu_status.model_dump(), "jobs": jobs}
+
+    async def subscribe(self, seq: Optional[int] = None, websocket: bool = False) -> AsyncIterator[Union[bytes, str]]:
+        """seq 이후의 이벤트를 계속 전달한다. websocket이면 SSE 대신 JSON 문자열로 전달
+
+        seq가 없거나 버퍼에서 이미 밀려난 경우 snapshot 이벤트를 먼저 보내고 그 이후부터 전달한다.
+        """
+        encode = format_ws if websocket else format_sse
+        self.subscriber_count += 1
+        try:
+            while self._loop is not None:
+                new_event = self._new_event
+                events = self.events_after(seq) if seq is not None else None
+                if events is None:
+                    seq, snapshot = await self.snapshot()
+                    yield encode(f"{self.epoch}-{seq}", "snapshot", json.dumps(snapshot, ensure_ascii=False, default=str))
+                    continue
+                for seq, sse_message, ws_message in events:
+                    yield ws_message if websocket else sse_message
+                if events:
+                    continue
+                try:
+                    await asyncio.wait_for(new_event.wait(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield '{"event": "heartbeat"}' if websocket else b": heartbeat\n\n"
+        finally:
+            self.subscriber_count -= 1
+
+    def status(self) -> dict:
+        return {
+            "running": self._loop is not None,
+            "seq": self._seq,
+            "buffered": len(self._buffer),
+            "subscribers": self.subscriber_count,
+        }
+
+event_broadcaster = EventBroadcaster()
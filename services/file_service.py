@@ -1,8 +1,78 @@
+import asyncio
 import os
-from typing import List, Optional
+import stat
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
 from models import FileItem, DirectoryContent 
 
+LISTING_CACHE_SIZE = 64     # 목록을 캐시할 최대 디렉토리 수
+
+# 정렬 기준별 key (디렉토리를 항상 먼저 표시)
+SORT_KEYS = {
+    "name": lambda entry: entry[0].lower(),
+    "size": lambda entry: entry[2] or 0,
+    "modified": lambda entry: entry[3],
+}
+
+# 디렉토리 절대 경로 -> {"mtime": 디렉토리 mtime_ns, "entries": 스캔 결과, "sorted": 정렬 기준별 결과}
+# 항목 추가/삭제/이름 변경 시 디렉토리 mtime이 바뀌므로 mtime이 같으면 캐시를 그대로 사용
+_listing_cache: "OrderedDict[str, dict]" = OrderedDict()
+_listing_cache_lock = threading.Lock()
+
+def _scan_directory(full_path: str) -> List[tuple]:
+    entries = []
+    with os.scandir(full_path) as it:
+        for entry in it:
+            try:
+                entry_stat = entry.stat()   # 항목당 stat은 한 번만 호출
+            except OSError:                  # 깨진 심볼릭 링크 등
+                continue
+            is_dir = stat.S_ISDIR(entry_stat.st_mode)
+            entries.append((
+                entry.name,
+                is_dir,
+                None if is_dir else entry_stat.st_size,
+                entry_stat.st_mtime
+            ))
+    return entries
+
+def _get_sorted_entries(full_path: str, path: str, sort: str, order: str) -> List[tuple]:
+    try:
+        dir_mtime = os.stat(full_path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Directory not found: {path}")
+    if not os.path.isdir(full_path):
+        raise FileNotFoundError(f"Directory not found: {path}")
+
+    with _listing_cache_lock:
+        cached = _listing_cache.get(full_path)
+        if cached is not None and cached["mtime"] == dir_mtime:
+            _listing_cache.move_to_end(full_path)
+            sorted_entries = cached["sorted"].get((sort, order))
+            if sorted_entries is not None:
+                return sorted_entries
+
+    if cached is None or cached["mtime"] != dir_mtime:
+        try:
+            cached = {"mtime": dir_mtime, "entries": _scan_directory(full_path), "sorted": {}}
+        except Exception as e:
+            raise IOError(f"Failed to list directory contents: {e}")
+
+    sort_key = SORT_KEYS[sort]
+    dirs = sorted((entry for entry in cached["entries"] if entry[1]), key=sort_key, reverse=order == "desc")
+    files = sorted((entry for entry in cached["entries"] if not entry[1]), key=sort_key, reverse=order == "desc")
+    sorted_entries = dirs + files
+
+    with _listing_cache_lock:
+        cached["sorted"][(sort, order)] = sorted_entries
+        _listing_cache[full_path] = cached
+        _listing_cache.move_to_end(full_path)
+        while len(_listing_cache) > LISTING_CACHE_SIZE:
+            _listing_cache.popitem(last=False)
+    return sorted_entries
+
 class FileService:
     def __init__(self, base_remote_path: str):
         self.base_remote_path = base_remote_path
@@ -14,42 +84,42 @@ class FileService:
             raise ValueError("잘못된 경로 접근 시도: 기본 경로 외부의 디렉토리에 접근할 수 없습니다.")
         return abs_path
 
-    async def list_directory_contents(self, path: str = "") -> DirectoryContent:    # 디렉토리 내용 list
-        full_path = await self._get_absolute_path(path) 
+    async def list_directory_contents(self, path: str = "", offset: int = 0, limit: Optional[int] = None,
+                                      sort: str = "name", order: str = "asc") -> DirectoryContent:    # 디렉토리 내용 list
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Invalid sort key: {sort} (available: {', '.join(SORT_KEYS)})")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Invalid sort order: {order}")
 
-        if not os.path.isdir(full_path):
-            raise FileNotFoundError(f"Directory not found: {path}")
+        full_path = await self._get_absolute_path(path) 
 
-        items: List[FileItem] = []
-        try:
-            with os.scandir(full_path) as entries:
-                for entry in entries:
-                    is_dir = entry.is_dir()                    
-                    item_path = os.path.join(path, entry.name).replace('\\', '/') # Windows 호환성
-                    item_size = entry.stat().st_size if entry.is_file() else None
-                    item_modified = entry.stat().st_mtime
-                    items.append(FileItem(
-                        name=entry.name,
-                        is_directory=is_dir,
-                        path=item_path,
-                        size=item_size,
-                        last_modified=item_modified
-                    ))
-        except Exception as e:
-            raise IOError(f"Failed to list directory contents: {e}")
+        # scandir/stat은 블로킹 호출이므로 이벤트 루프 밖(스레드)에서 실행
+        entries = await asyncio.to_thread(_get_sorted_entries, full_path, path, sort, order)
 
-        items.sort(key=lambda x: (not x.is_directory, x.name.lower()))  # 디렉토리와 파일을 구분하여 정렬
+        page = entries[offset:offset + limit] if limit is not None else entries[offset:]
+        items = [
+            FileItem(
+                name=name,
+                is_directory=is_dir,
+                path=os.path.join(path, name).replace('\\', '/'), # Windows 호환성
+                size=size,
+                last_modified=modified
+            )
+            for name, is_dir, size, modified in page
+        ]
 
-        return DirectoryContent(current_path=path, items=items)
+        return DirectoryContent(current_path=path, items=items, total=len(entries))
 
-    async def download_file(self, path: str) -> bytes:  # 실제 파일을 바이트로 읽어 반환
+    async def get_download_file(self, path: str) -> Tuple[str, os.stat_result]:  # 다운로드할 파일의 절대 경로와 stat 반환 (내용은 라우터에서 스트리밍)
         full_path = await self._get_absolute_path(path)
 
-        if not os.path.isfile(full_path):
+        try:
+            stat_result = await asyncio.to_thread(os.stat, full_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {path}")
-        
-        try:            
-            with open(full_path, "rb") as f:
-                return f.read() 
         except Exception as e:
-            raise IOError(f"Failed to read file: {e}")
\ No newline at end of file
+            raise IOError(f"Failed to read file: {e}")
+
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise FileNotFoundError(f"File not found: {path}")
+        return full_path, stat_result
@@ -0,0 +1,69 @@
+from typing import Dict, List
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from database import db
+from models import get_korean_time
+from services.gpu_service import gpu_service
+
+class GpuAllocator:
+    """GPU 배정/해제를 isAvailable 조건부 갱신으로 처리한다.
+
+    조건과 갱신이 하나의 원자적 연산이므로 동시에 들어온 요청이 같은 GPU를
+    중복 배정받지 않으며, 여러 GPU도 한 번의 bulk 연산으로 처리한다.
+    배정된 GPU에는 보유 작업 ID(jobId)와 배정마다 새로 만드는 claimToken을 기록하고,
+    반환할 때 반환 시각(releasedAt)을 기록한다.
+    """
+
+    def claim(self, assignments: Dict[int, int]) -> List[int]:
+        """{GPU ID: 작업 ID} 배정을 시도하고 실제로 확보한 GPU ID 목록을 반환"""
+        if not assignments:
+            return []
+        gpus_collection = db.get_collection('gpus')
+        claim_token = ObjectId()
+
+        result = gpus_collection.bulk_write([
+            UpdateOne(
+                {"_id": gpu_id, "isAvailable": True},
+                {"$set": {"isAvailable": False, "jobId": job_id, "claimToken": claim_token}}
+            )
+            for gpu_id, job_id in assignments.items()
+        ], ordered=False)
+
+        if result.modified_count == len(assignments):
+            claimed = list(assignments)
+        else:
+            # 다른 요청이 먼저 가져간 GPU가 있으면 이번 배정의 claimToken이 기록된 GPU만 확보한 것
+            # (다른 서버 프로세스가 같은 작업을 같은 GPU에 배정했을 수 있으므로 jobId로는 구분할 수 없음)
+            claimed = [
+                gpu["_id"]
+                for gpu in gpus_collection.find({"_id": {"$in": list(assignments)}, "claimToken": claim_token}, {"_id": 1})
+            ]
+
+        if claimed:
+            gpu_service.invalidate()
+        return claimed
+
+    def release(self, assignments: Dict[int, int]) -> int:
+        """{GPU ID: 작업 ID} GPU들을 한 번에 반환하고, 실제로 반환된 개수를 돌려준다.
+
+        GPU가 아직 그 작업의 것일 때만 반환하므로, 같은 작업을 두 번 반환해도(여러 서버 프로세스의 reconciler 등)
+        그 사이 다른 작업에 배정된 GPU를 빼앗지 않는다. jobId가 없는 GPU(jobId 기록 전에 배정됨)는 그대로 반환한다.
+        """
+        if not assignments:
+            return 0
+        gpus_collection = db.get_collection('gpus')
+        released_at = get_korean_time().isoformat()
+
+        result = gpus_collection.bulk_write([
+            UpdateOne(
+                {"_id": gpu_id, "isAvailable": False, "jobId": {"$in": [job_id, None]}},
+                {"$set": {"isAvailable": True, "releasedAt": released_at}, "$unset": {"jobId": "", "claimToken": ""}}
+            )
+            for gpu_id, job_id in assignments.items()
+        ], ordered=False)
+        if result.modified_count:
+            gpu_service.invalidate()
+        return result.modified_count
+
+gpu_allocator = GpuAllocator()
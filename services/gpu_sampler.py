@@ -0,0 +1,153 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from database import db
+from models import KST, GpuStatus, get_korean_time
+from services.gpu_service import gpu_service
+
+GPU_SAMPLE_INTERVAL_SECONDS = float(os.getenv('GPU_SAMPLE_INTERVAL_SECONDS', '10'))
+
+# 해상도별 저장 구간과 보관 기간. 샘플마다 모든 해상도의 구간 문서를 갱신하고,
+# 오래된 문서는 TTL 인덱스(services/indexes.py)가 지우므로 저장 용량은 가동 시간과 무관하게 일정하다.
+# (10초 6시간 = 2,160개, 1분 7일 = 10,080개, 1시간 365일 = 8,760개)
+SAMPLE_TIERS = [
+    {"name": "10s", "collection": "gpu_samples_10s", "step": timedelta(seconds=10), "retention": timedelta(hours=6)},
+    {"name": "1m", "collection": "gpu_samples_1m", "step": timedelta(minutes=1), "retention": timedelta(days=7)},
+    {"name": "1h", "collection": "gpu_samples_1h", "step": timedelta(hours=1), "retention": timedelta(days=365)},
+]
+
+# 범위 조회 시 한 시리즈의 최대 점 개수 (이보다 많으면 더 거친 해상도 사용)
+MAX_SERIES_POINTS = 2000
+
+SAMPLE_FIELDS = ["active24", "active8", "available24", "available8", "queue"]
+
+def sample_values(gpu_status: GpuStatus) -> Dict[str, int]:
+    return {
+        "active24": gpu_status.gpu24gbActive,
+        "active8": gpu_status.gpu8gbActive,
+        "available24": gpu_status.gpu24gbAvailable,
+        "available8": gpu_status.gpu8gbAvailable,
+        "queue": gpu_status.jobsInQueue,
+    }
+
+def floor_time(moment: datetime, step: timedelta) -> datetime:
+    """UTC 기준으로 step 단위 내림 (TTL 인덱스를 위해 tz 없는 UTC datetime으로 저장)"""
+    moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    step_seconds = int(step.total_seconds())
+    epoch_seconds = int((moment - datetime(1970, 1, 1)).total_seconds())
+    return datetime(1970, 1, 1) + timedelta(seconds=epoch_seconds - epoch_seconds % step_seconds)
+
+def bucket_update(values: Dict[str, int]) -> dict:
+    """구간 문서에 샘플 하나를 합치는 update (평균은 sum/count로 계산)"""
+    return {
+        "$inc": {"count": 1, **{f"sum.{field}": value for field, value in values.items()}},
+        "$min": {f"min.{field}": value for field, value in values.items()},
+        "$max": {f"max.{field}": value for field, value in values.items()},
+    }
+
+def select_tier(start: datetime, end: datetime, now: datetime) -> dict:
+    """start가 보관 기간 안에 있고 점 개수가 MAX_SERIES_POINTS 이하인 가장 세밀한 해상도"""
+    for tier in SAMPLE_TIERS:
+        if start >= now - tier["retention"] and (end - start) / tier["step"] <= MAX_SERIES_POINTS:
+            return tier
+    return SAMPLE_TIERS[-1]
+
+def to_series(documents: List[dict]) -> dict:
+    """구간 문서 목록을 차트용 열 배열로 변환: {timestamps: [...], series: {field: {avg, min, max}}}"""
+    series = {field: {"avg": [], "min": [], "max": []} for field in SAMPLE_FIELDS}
+    timestamps = []
+    for document in documents:
+        timestamps.append(document["_id"].replace(tzinfo=timezone.utc).astimezone(KST).isoformat())
+        count = document.get("count") or 1
+        for field in SAMPLE_FIELDS:
+            series[field]["avg"].append(round(document.get("sum", {}).get(field, 0) / count, 3))
+            series[field]["min"].append(document.get("min", {}).get(field))
+            series[field]["max"].append(document.get("max", {}).get(field))
+    return {"timestamps": timestamps, "series": series}
+
+class GpuSampler:
+    """GPU 풀 상태(capacity별 사용 중/사용 가능 개수, 대기열 길이)를 주기적으로 기록하는 백그라운드 작업.
+
+    샘플은 10초/1분/1시간 구간 문서에 합계/최소/최대로 바로 합쳐 저장하므로(쓰기 시점 다운샘플링)
+    긴 기간을 조회해도 원본 샘플을 읽지 않는다.
+    """
+
+    def __init__(self, interval: float = GPU_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.last_sampled_at: Optional[str] = None
+        self.sample_count = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            await self.sample_once()
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0))
+
+    async def sample_once(self):
+        try:
+            now = get_korean_time()
+            values = sample_values(await gpu_service.get_gpu_status_async())
+            update = bucket_update(values)
+            buckets = {tier["name"]: floor_time(now, tier["step"]) for tier in SAMPLE_TIERS}
+            # ts: TTL 인덱스 기준 시각 (TTL 인덱스는 _id에 만들 수 없음)
+            await asyncio.gather(*(
+                db.get_async_collection(tier["collection"]).update_one(
+                    {"_id": buckets[tier["name"]]},
+                    {**update, "$setOnInsert": {"ts": buckets[tier["name"]]}},
+                    upsert=True
+                )
+                for tier in SAMPLE_TIERS
+            ))
+            self.sample_count += 1
+            self.last_sampled_at = now.isoformat()
+        except Exception as e:
+            print(f"GPU 상태 샘플 기록 실패: {e}")
+
+    async def get_history_async(self, start: datetime, end: datetime, resolution: Optional[str] = None) -> dict:
+        """[start, end) 기간의 시계열. resolution을 지정하지 않으면 기간에 맞는 해상도를 고른다."""
+        if resolution is None:
+            tier = select_tier(start, end, get_korean_time())
+        else:
+            tier = next(tier for tier in SAMPLE_TIERS if tier["name"] == resolution)
+        collection = db.get_async_collection(tier["collection"])
+        first = floor_time(start, tier["step"])
+        last = floor_time(end, tier["step"]) + tier["step"]
+        documents = await (
+            collection.find({"_id": {"$gte": first, "$lt": last}})
+            .sort("_id", 1)
+            .limit(MAX_SERIES_POINTS)
+        ).to_list()
+        return {
+            "resolution": tier["name"],
+            "interval_seconds": int(tier["step"].total_seconds()),
+            **to_series(documents),
+        }
+
+    def status(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "sample_count": self.sample_count,
+            "last_sampled_at": self.last_sampled_at,
+        }
+
+gpu_sampler = GpuSampler()
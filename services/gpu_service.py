@@ -1,45 +1,138 @@
-from typing import List, Optional
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, List, Optional
 from bson import ObjectId
 
 from database import db
 from models import Gpu, GpuStatus
 
+# 스냅샷 유효 시간 (배정/해제 시 즉시 무효화되며, TTL은 외부 변경에 대한 안전장치)
+GPU_STATUS_TTL_SECONDS = float(os.getenv('GPU_STATUS_TTL_SECONDS', '5'))
+
+# capacity별 전체/사용 가능 개수를 한 번의 aggregation으로 계산
+# ($sort를 먼저 두어 {capacity, isAvailable} 인덱스만 읽도록 함)
+GPU_COUNT_PIPELINE = [
+    {"$sort": {"capacity": 1}},
+    {"$group": {
+        "_id": "$capacity",
+        "total": {"$sum": 1},
+        "available": {"$sum": {"$cond": ["$isAvailable", 1, 0]}}
+    }}
+]
+
+def build_gpu_status(counts: List[dict], jobs_in_queue: int) -> GpuStatus:
+    by_capacity = {row["_id"]: row for row in counts}
+    gpu_24gb = by_capacity.get(24, {"total": 0, "available": 0})
+    gpu_8gb = by_capacity.get(8, {"total": 0, "available": 0})
+
+    return GpuStatus(
+        gpu24gbActive=gpu_24gb["total"] - gpu_24gb["available"],
+        gpu8gbActive=gpu_8gb["total"] - gpu_8gb["available"],
+        gpu24gbAvailable=gpu_24gb["available"],
+        gpu8gbAvailable=gpu_8gb["available"],
+        jobsInQueue=jobs_in_queue,   # 대기열 길이 (pending 상태인 작업 수)
+        totalGpu24gb=gpu_24gb["total"],
+        totalGpu8gb=gpu_8gb["total"],
+    )
+
 class GpuService:
+    def __init__(self, ttl: float = GPU_STATUS_TTL_SECONDS):
+        self.ttl = ttl
+        self._snapshot: Optional[GpuStatus] = None
+        self._snapshot_at = 0.0
+        self._snapshot_generation = -1
+        self._generation = 0    # invalidate()마다 증가, 조회 중 무효화된 결과를 저장하지 않기 위함
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+
+    def invalidate(self):
+        """GPU 배정/해제, 대기열 변경 시 호출하여 다음 조회에서 새로 계산하도록 한다."""
+        self._generation += 1
+
+    def _is_fresh(self, generation: int) -> bool:
+        return (self._snapshot is not None
+                and self._snapshot_generation == generation
+                and time.monotonic() - self._snapshot_at < self.ttl)
+
+    def _load_gpu_status(self) -> GpuStatus:
+        gpus_collection = db.get_collection('gpus')
+        jobs_collection = db.get_collection('jobs')
+
+        counts = list(gpus_collection.aggregate(GPU_COUNT_PIPELINE))
+        jobs_in_queue = jobs_collection.count_documents({"status": "pending"})
+        return build_gpu_status(counts, jobs_in_queue)
+
+    async def _load_gpu_status_async(self) -> GpuStatus:
+        gpus_collection = db.get_async_collection('gpus')
+        jobs_collection = db.get_async_collection('jobs')
+
+        counts = await (await gpus_collection.aggregate(GPU_COUNT_PIPELINE)).to_list()
+        jobs_in_queue = await jobs_collection.count_documents({"status": "pending"})
+        return build_gpu_status(counts, jobs_in_queue)
+
+    def get_capacity_totals(self) -> Dict[int, int]:
+        """capacity(GB)별 보유 GPU 수. 작업 요구사항 검증에 사용"""
+        gpu_status = self.get_gpu_status()
+        totals = {24: gpu_status.totalGpu24gb, 8: gpu_status.totalGpu8gb}
+        return {capacity: total for capacity, total in totals.items() if total}
+
+    def _store_snapshot(self, gpu_status: GpuStatus, generation: int):
+        self._snapshot = gpu_status
+        self._snapshot_generation = generation
+        self._snapshot_at = time.monotonic()
+
+    def _fallback_status(self) -> GpuStatus:
+        if self._snapshot is not None:
+            return self._snapshot
+        return GpuStatus(
+            gpu24gbActive=0,
+            gpu8gbActive=0,
+            gpu24gbAvailable=0,
+            gpu8gbAvailable=0,
+            jobsInQueue=0,
+            totalGpu24gb=0,
+            totalGpu8gb=0,
+        )
+
     def get_gpu_status(self) -> GpuStatus:
-        try:
-            gpus_collection = db.get_collection('gpus')
-            
-            # 24GB GPU 통계
-            active_24gb = gpus_collection.count_documents({"capacity": 24, "isAvailable": False})
-            available_24gb = gpus_collection.count_documents({"capacity": 24, "isAvailable": True})
-            
-            # 8GB GPU 통계
-            active_8gb = gpus_collection.count_documents({"capacity": 8, "isAvailable": False})
-            available_8gb = gpus_collection.count_documents({"capacity": 8, "isAvailable": True})
-            
-            # 대기열 길이 조회 (pending 상태인 작업 수)
-            jobs_collection = db.get_collection('jobs')
-            jobs_in_queue = jobs_collection.count_documents({"status": "pending"})
-            
-            gpu_status = {
-                "gpu24gbActive": active_24gb,
-                "gpu8gbActive": active_8gb,
-                "gpu24gbAvailable": available_24gb,
-                "gpu8gbAvailable": available_8gb,
-                "jobsInQueue": jobs_in_queue,
-            }
-            
-            return GpuStatus(**gpu_status)
-            
-        except Exception as e:
-            print(f"GPU 상태 조회 실패: {e}")
-            
-            return GpuStatus(
-                gpu24gbActive=0,
-                gpu8gbActive=0,
-                gpu24gbAvailable=6,
-                gpu8gbAvailable=12,
-                jobsInQueue=0,
-            )
-
-gpu_service = GpuService()
\ No newline at end of file
+        generation = self._generation
+        if self._is_fresh(generation):
+            return self._snapshot
+
+        with self._lock:
+            generation = self._generation
+            if self._is_fresh(generation):   # 대기하는 동안 다른 요청이 갱신했을 수 있음
+                return self._snapshot
+
+            try:
+                gpu_status = self._load_gpu_status()
+            except Exception as e:
+                print(f"GPU 상태 조회 실패: {e}")
+                return self._fallback_status()
+
+            self._store_snapshot(gpu_status, generation)
+            return gpu_status
+
+    async def get_gpu_status_async(self) -> GpuStatus:
+        """get_gpu_status의 async 버전. 스냅샷이 유효하면 DB에 접근하지 않는다."""
+        generation = self._generation
+        if self._is_fresh(generation):
+            return self._snapshot
+
+        async with self._async_lock:
+            generation = self._generation
+            if self._is_fresh(generation):
+                return self._snapshot
+
+            try:
+                gpu_status = await self._load_gpu_status_async()
+            except Exception as e:
+                print(f"GPU 상태 조회 실패: {e}")
+                return self._fallback_status()
+
+            self._store_snapshot(gpu_status, generation)
+            return gpu_status
+
+gpu_service = GpuService()
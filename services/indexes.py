@@ -0,0 +1,76 @@
+"""컬렉션별 인덱스 선언.
+
+database_init.create_indexes가 이 목록으로 인덱스를 만들고, benchmarks/query_plans.py가
+서비스가 실제로 보내는 쿼리의 실행 계획을 확인한다. 쿼리를 추가하거나 바꾸면
+여기에 그 쿼리를 처리할 인덱스가 있는지 함께 확인한다.
+"""
+from pymongo import ASCENDING, DESCENDING
+
+from services.gpu_sampler import SAMPLE_TIERS
+
+# {컬렉션: [{"keys": 인덱스 키, "options": create_index 옵션(선택), "queries": 이 인덱스를 사용하는 쿼리}]}
+# _id 조회(get_job_by_id, jobs_archive, counters, user_usage, GPU 배정/해제)와 job_rollups의 _id 범위 조회는
+# 기본 _id 인덱스를 사용한다. GPU 상태 시계열도 구간 시작 시각(_id) 범위로 조회한다.
+INDEXES = {
+    "jobs": [
+        {
+            "keys": [("requested_at", DESCENDING), ("_id", DESCENDING)],
+            "queries": "JobService.get_all_jobs: 전체 목록 (requested_at, _id) 내림차순 keyset 페이지네이션",
+        },
+        {
+            "keys": [("status", ASCENDING), ("requested_at", ASCENDING), ("_id", ASCENDING)],
+            "queries": "JobService.schedule_pending_jobs: {status: pending} (requested_at, _id) 오름차순, "
+                       "대기열 길이 count({status: pending}), DataVersion: count({status: {$in: [pending, running]}}), "
+                       "EventBroadcaster.snapshot: {status: {$in: [pending, running]}} 요청 순 정렬",
+        },
+        {
+            "keys": [("status", ASCENDING), ("user", ASCENDING), ("requested_at", ASCENDING), ("_id", ASCENDING)],
+            "queries": "JobService._plan_fair_share: distinct(user, {status: pending}), "
+                       "사용자별 {status: pending, user} (requested_at, _id) 오름차순 limit, "
+                       "{status: running, user: {$in}} 조회",
+        },
+        {
+            "keys": [("status", ASCENDING), ("gpuId", ASCENDING)],
+            "queries": "JobService.release_completed_jobs: {status: {$in: [completed, failed]}, gpuId: {$ne: null}}",
+        },
+        {
+            "keys": [("status", ASCENDING), ("completed_at", ASCENDING)],
+            "queries": "ArchiveService.archive_batch: {status: {$in: [completed, failed]}, completed_at: {$lt: cutoff}, "
+                       "gpuId: null}",
+        },
+    ],
+    "gpus": [
+        {
+            "keys": [("isAvailable", ASCENDING), ("capacity", ASCENDING)],
+            "queries": "JobService.schedule_pending_jobs / _load_busy_gpus: {isAvailable} 조회 (capacity 포함), "
+                       "DataVersion: count({isAvailable: true})",
+        },
+        {
+            "keys": [("capacity", ASCENDING), ("isAvailable", ASCENDING)],
+            "queries": "GpuService: capacity별 전체/사용 가능 개수 aggregate ($sort capacity 후 $group)",
+        },
+    ],
+    "log_segments": [
+        {
+            "keys": [("jobId", ASCENDING), ("seq", ASCENDING)],
+            "options": {"unique": True},
+            "queries": "LogIndexService.search: {jobId, endOffset, levels.<LEVEL>.count, lastTs, firstTs} seq 순 정렬, "
+                       "delete_job: {jobId} (unique: 여러 서버 프로세스가 같은 구간을 중복 색인하지 않도록)",
+        },
+    ],
+    "log_ingest_state": [
+        {
+            "keys": [("final", ASCENDING)],
+            "queries": "LogIndexService.ingest_active_jobs: 종료 후 마지막 부분을 아직 색인하지 않은 로그 {final: false}",
+        },
+    ],
+    # 해상도별 보관 기간이 지난 GPU 상태 구간 문서를 MongoDB가 자동 삭제
+    **{
+        tier["collection"]: [{
+            "keys": [("ts", ASCENDING)],
+            "options": {"expireAfterSeconds": int(tier["retention"].total_seconds())},
+            "queries": "TTL 삭제 전용 (GpuSampler.get_history_async는 _id 범위 조회)",
+        }]
+        for tier in SAMPLE_TIERS
+    },
+}
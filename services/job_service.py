@@ -1,39 +1,205 @@
-from typing import List, Dict, Optional
+import base64
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Dict, Optional, Tuple
 from datetime import datetime, timezone, timedelta
 
+from pymongo import UpdateOne
+
 from database import db
-from models import Job, JobCreate
+from models import Job, JobCreate, JobSummary, JOB_FIELDS
 from database_init import get_next_job_id
+from services.analytics_service import analytics_service
+from services.archive_service import archive_service
+from services.gpu_allocator import gpu_allocator
+from services.gpu_service import gpu_service
+from services.scheduler_policy import (plan_backfill, plan_fair_share, plan_placements, estimated_runtime,
+                                       DEFAULT_STARVATION_SECONDS)
+from services.log_index_service import log_index_service
+from services.log_service import log_service, resolve_log_path
+from services.metrics import GPU_IDLE, SCHEDULER_JOBS, SCHEDULER_LATENCY
+from services.usage_service import job_gpu_hours, usage_service
+from services.version_service import data_version
 
 KST = timezone(timedelta(hours=9))
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# 목록 조회 시 fields를 지정하지 않으면 제외하는 무거운 필드
+HEAVY_JOB_FIELDS = ["log"]
+
+JOB_LIST_SORT = [("requested_at", -1), ("_id", -1)]
+
+# 스케줄링 한 번에 검토하는 최대 대기 작업 수
+PENDING_SCAN_LIMIT = 200
+
+# 스케줄링에 필요한 대기 작업 필드
+PENDING_JOB_PROJECTION = {"requested_at": 1, "gpuMemory": 1, "gpuCount": 1, "sameCapacity": 1,
+                          "estimatedRuntime": 1}
+
+# 이 시간(초) 이상 기다린 작업이 쓸 수 있는 GPU는 뒤의 작업에 내주지 않음 (multi-GPU 작업 기아 방지)
+STARVATION_SECONDS = float(os.getenv('SCHEDULER_STARVATION_SECONDS', str(DEFAULT_STARVATION_SECONDS)))
+
+# 스케줄링 정책 (서버 시작 시 선택)
+#   fifo: 요청 순서대로 배정, 맞는 GPU가 없는 작업은 건너뜀 (기본값)
+#   backfill: 막힌 첫 작업의 시작 시각을 예약하고, 그 예약을 늦추지 않는 작업만 먼저 실행 (estimatedRuntime 사용)
+#   fairshare: 최근 GPU 사용량이 적은 사용자의 작업부터 번갈아 배정하고, 사용자별 GPU 수 제한 적용
+SCHEDULER_POLICIES = ("fifo", "backfill", "fairshare")
+SCHEDULER_POLICY = os.getenv('SCHEDULER_POLICY', 'fifo').lower()
+if SCHEDULER_POLICY not in SCHEDULER_POLICIES:
+    print(f"알 수 없는 SCHEDULER_POLICY '{SCHEDULER_POLICY}', fifo 정책을 사용합니다.")
+    SCHEDULER_POLICY = "fifo"
+
+def parse_gpu_limits(value: str) -> Dict[str, int]:
+    """"alice=8,bob=2" 형태의 사용자별 GPU 수 제한"""
+    limits = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        user, limit = item.split('=', 1)
+        try:
+            limits[user.strip()] = int(limit)
+        except ValueError:
+            print(f"잘못된 USER_GPU_LIMITS 항목 무시: {item}")
+    return limits
+
+# fairshare 정책에서 사용자 한 명이 동시에 사용할 수 있는 GPU 수 (0이면 제한 없음)와 사용자별 예외
+USER_GPU_LIMIT = int(os.getenv('USER_GPU_LIMIT', '0'))
+USER_GPU_LIMITS = parse_gpu_limits(os.getenv('USER_GPU_LIMITS', ''))
+
+# log=true로 Job을 조회할 때 함께 반환하는 로그 줄 수
+LOG_PREVIEW_LINES = 1000
+
 def get_korean_time():
     return datetime.now(KST)
 
+def job_gpu_ids(job: dict) -> List[int]:
+    """작업이 보유한 GPU ID 목록 (gpuIds가 없는 이전 문서는 gpuId 하나)"""
+    if job.get("gpuIds"):
+        return job["gpuIds"]
+    return [job["gpuId"]] if job.get("gpuId") else []
+
+def encode_job_cursor(requested_at: Optional[str], job_id: int) -> str:
+    raw = json.dumps([requested_at, job_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_job_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        requested_at, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError(f"잘못된 cursor 값입니다: {cursor}")
+    if not isinstance(job_id, int):
+        raise ValueError(f"잘못된 cursor 값입니다: {cursor}")
+    return requested_at, job_id
+
+def build_job_list_query(after: Optional[str], fields: Optional[List[str]]) -> Tuple[dict, dict]:
+    query = {}
+    if after:
+        requested_at, last_id = decode_job_cursor(after)
+        query = {"$or": [
+            {"requested_at": {"$lt": requested_at}},
+            {"requested_at": requested_at, "_id": {"$lt": last_id}}
+        ]}
+    return query, build_job_projection(fields)
+
+def build_job_page(jobs_data: List[dict], limit: int) -> Tuple[List[dict], Optional[str]]:
+    """limit + 1개로 조회한 결과를 페이지(Mongo 문서)와 다음 cursor로 변환"""
+    next_cursor = None
+    if len(jobs_data) > limit:
+        jobs_data = jobs_data[:limit]
+        last_job = jobs_data[-1]
+        next_cursor = encode_job_cursor(last_job.get("requested_at"), last_job["_id"])
+    return jobs_data, next_cursor
+
+def job_summary_document(job_data: dict) -> dict:
+    """Mongo 문서를 JobSummary를 거치지 않고 같은 JSON 형태(JOB_FIELDS 순서, 없는 필드는 None)로 변환"""
+    return {field: job_data.get(field) for field in JOB_FIELDS}
+
+def build_job_projection(fields: Optional[List[str]]) -> dict:
+    """fields가 없으면 무거운 필드만 제외, 있으면 지정한 필드만 Mongo에서 가져온다."""
+    if not fields:
+        return {field: 0 for field in HEAVY_JOB_FIELDS}
+    
+    unknown = [field for field in fields if field not in JOB_FIELDS]
+    if unknown:
+        raise ValueError(f"알 수 없는 필드: {', '.join(unknown)}")
+    
+    # cursor 생성을 위해 requested_at은 항상 포함 (_id는 Mongo가 기본 포함)
+    projection = {field: 1 for field in fields if field != "_id"}
+    projection["requested_at"] = 1
+    return projection
+
 class JobService:
-    def get_all_jobs(self) -> List[Job]:
+    def __init__(self):
+        self._listeners: List[Callable[..., None]] = []
+        self._schedule_lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[..., None]):
+        """작업 이벤트 리스너 등록. listener(event, job_id, **data) 형태로 호출된다."""
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, job_id: int, **data):
+        # 작업 상태 변화는 GPU 사용량/대기열 길이에 영향을 주므로 GPU 상태 스냅샷 무효화
+        gpu_service.invalidate()
+        for listener in self._listeners:
+            try:
+                listener(event, job_id, **data)
+            except Exception as e:
+                print(f"작업 이벤트 리스너 처리 실패 ({event}): {e}")
+
+    def get_all_jobs(self, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None,
+                     fields: Optional[List[str]] = None,
+                     include_total: bool = False) -> Tuple[List[JobSummary], Optional[str], Optional[int]]:
+        """(requested_at, _id) 내림차순 keyset 페이지네이션으로 작업 목록을 조회
+
+        반환값: (작업 목록, 다음 페이지 cursor, 전체 작업 수(include_total인 경우))
+        """
+        query, projection = build_job_list_query(after, fields)
+
         try:
             jobs_collection = db.get_collection('jobs')
-            jobs_data = jobs_collection.find().sort("requested_at", -1)
-            
-            self._check_and_release_completed_jobs()
-            jobs_data = jobs_collection.find().sort("requested_at", -1)
-            
-            jobs = []
-            for job_data in jobs_data:               
-                job_dict = dict(job_data)
-                jobs.append(Job(**job_dict))
-            return jobs
+            jobs_data = list(
+                jobs_collection.find(query, projection)
+                .sort(JOB_LIST_SORT)
+                .limit(limit + 1)   # 다음 페이지 존재 여부 확인용으로 1개 더 조회
+            )
+            total = jobs_collection.estimated_document_count() if include_total else None
+            jobs_data, next_cursor = build_job_page(jobs_data, limit)
+            return [JobSummary(**job_data) for job_data in jobs_data], next_cursor, total
         except Exception as e:
             print(f"작업 목록 조회 실패: {e}")
-            return []
+            return [], None, None
+
+    async def get_all_jobs_async(self, limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None,
+                                 fields: Optional[List[str]] = None,
+                                 include_total: bool = False) -> Tuple[List[dict], Optional[str], Optional[int]]:
+        """get_all_jobs의 async 버전 (async 라우트에서 이벤트 루프를 막지 않음)
+
+        목록 응답을 바로 직렬화할 수 있도록 JobSummary 대신 job_summary_document 형태의 dict를 반환한다.
+        """
+        query, projection = build_job_list_query(after, fields)
+
+        try:
+            jobs_collection = db.get_async_collection('jobs')
+            jobs_data = await (
+                jobs_collection.find(query, projection)
+                .sort(JOB_LIST_SORT)
+                .limit(limit + 1)
+            ).to_list()
+            total = await jobs_collection.estimated_document_count() if include_total else None
+            jobs_data, next_cursor = build_job_page(jobs_data, limit)
+            return [job_summary_document(job_data) for job_data in jobs_data], next_cursor, total
+        except Exception as e:
+            print(f"작업 목록 조회 실패: {e}")
+            return [], None, None
 
     def get_job_by_id(self, job_id: int) -> Optional[Job]:
         try:
-            self._check_and_release_completed_jobs()
-            
             jobs_collection = db.get_collection('jobs')
-            job_data = jobs_collection.find_one({"_id": job_id})
+            job_data = jobs_collection.find_one({"_id": job_id}) or archive_service.get_job(job_id)
             if job_data:
                 job_dict = dict(job_data)
                 return Job(**job_dict)
@@ -42,156 +208,242 @@ class JobService:
             print(f"작업 조회 실패: {e}")
             return None
 
-    def _assign_available_gpu(self) -> Optional[int]:
+    async def get_job_by_id_async(self, job_id: int) -> Optional[Job]:
         try:
-            gpus_collection = db.get_collection('gpus')
-            
-            available_24gb = gpus_collection.find_one({
-                "capacity": 24,
-                "isAvailable": True
-            })
-            
-            if available_24gb:
-                gpu_id = available_24gb["_id"]
-                
-                gpus_collection.update_one(
-                    {"_id": gpu_id},
-                    {"$set": {"isAvailable": False}}
-                )
-                # print(f"24GB GPU {gpu_id} 배정 완료")
-                return gpu_id
-            
-            available_8gb = gpus_collection.find_one({
-                "capacity": 8,
-                "isAvailable": True
-            })
-            
-            if available_8gb:
-                gpu_id = available_8gb["_id"]            
-                gpus_collection.update_one(
-                    {"_id": gpu_id},
-                    {"$set": {"isAvailable": False}}
-                )
-                # print(f"8GB GPU {gpu_id} 배정 완료")
-                return gpu_id
-            
-            #print("사용 가능한 GPU가 없습니다.\n 대기열에 추가하시겠습니까?")
+            jobs_collection = db.get_async_collection('jobs')
+            job_data = await jobs_collection.find_one({"_id": job_id}) or await archive_service.get_job_async(job_id)
+            if job_data:
+                return Job(**job_data)
             return None
-            
         except Exception as e:
-            print(f"GPU 배정 실패: {e}")
+            print(f"작업 조회 실패: {e}")
             return None
 
-    def _release_gpu_for_job(self, job_id: int) -> Optional[int]:
-        """특정 작업의 GPU를 해제하고 completed_at을 저장"""
-        try:
-            jobs_collection = db.get_collection('jobs')
-            gpus_collection = db.get_collection('gpus')
-            
-            job = jobs_collection.find_one({"_id": job_id})
-            if not job or not job.get("gpuId"):
-                return None
-            
-            gpu_id = job["gpuId"]
-            
-            # GPU가 존재하는지 확인
-            gpu = gpus_collection.find_one({"_id": gpu_id})
-            if not gpu:
-                print(f"GPU {gpu_id}를 찾을 수 없습니다.")
-                return None
-            
-            # GPU를 사용 가능 상태로 변경
-            result = gpus_collection.update_one(
-                {"_id": gpu_id},
-                {"$set": {"isAvailable": True}}
-            )
-            
-            if result.modified_count == 0:
-                print(f"GPU {gpu_id}의 isAvailable 업데이트 실패")
-            else:
-                print(f"GPU {gpu_id}의 isAvailable을 True로 설정했습니다.")
-            
-            update_data = {"$unset": {"gpuId": ""}}
-            if not job.get("completed_at"):
-                update_data["$set"] = {"completed_at": get_korean_time().isoformat()}
-            
-            jobs_collection.update_one(
-                {"_id": job_id},
-                update_data
+    def _release_jobs(self, jobs: List[dict]) -> List[int]:
+        """작업들이 보유한 GPU를 모두 한 번에 해제하고 completed_at을 저장. 반환값: 해제한 GPU ID 목록
+
+        같은 작업을 여러 곳(reconciler, update_job_status, 다른 서버 프로세스)에서 동시에 해제할 수 있으므로,
+        작업 문서의 GPU 정보를 지우는 데 성공한 호출만 그 작업의 해제로 보고 사용량/집계/이벤트를 기록한다.
+        """
+        jobs = [job for job in jobs if job_gpu_ids(job)]
+        if not jobs:
+            return []
+        release_started = time.perf_counter()
+        jobs_collection = db.get_collection('jobs')
+        job_ids = [job["_id"] for job in jobs]
+        gpu_ids = [gpu_id for job in jobs for gpu_id in job_gpu_ids(job)]
+        
+        # GPU를 사용 가능 상태로 변경 (작업 문서보다 먼저 바꿔야 중간에 실패해도 reconciler가 다시 해제함)
+        released_count = gpu_allocator.release({gpu_id: job["_id"] for job in jobs for gpu_id in job_gpu_ids(job)})
+        if released_count < len(gpu_ids):
+            print(f"GPU {gpu_ids} 중 {len(gpu_ids) - released_count}개는 이미 사용 가능 상태입니다.")
+        
+        now = get_korean_time()
+        jobs_collection.update_many(
+            {"_id": {"$in": job_ids}, "completed_at": None},
+            {"$set": {"completed_at": now.isoformat()}}
+        )
+        # 작업마다 GPU 정보를 조건부로 지워 이 호출이 해제한 작업만 골라냄
+        released_jobs = [
+            job for job in jobs
+            if jobs_collection.find_one_and_update(
+                {"_id": job["_id"], "gpuId": {"$ne": None}},
+                {"$unset": {"gpuId": "", "gpuIds": ""}},
+                {"_id": 1}
             )
-            
-            print(f"Job {job_id}의 GPU {gpu_id}를 해제했습니다.")
-            return gpu_id
-            
-        except Exception as e:
-            print(f"작업 GPU 해제 중 오류 발생: {e}")
-            return None
+        ]
+        if not released_jobs:
+            return []
+        
+        for job in released_jobs:
+            print(f"Job {job['_id']}의 GPU {job_gpu_ids(job)}를 해제했습니다.")
+            self._notify("released", job["_id"], gpu_ids=job_gpu_ids(job))
+        usage_service.record_jobs(released_jobs, now)
+        analytics_service.record_finished(released_jobs, now)
+        data_version.bump()
+        SCHEDULER_LATENCY.observe(time.perf_counter() - release_started, "release")
+        SCHEDULER_JOBS.inc("released", amount=len(released_jobs))
+        return [gpu_id for job in released_jobs for gpu_id in job_gpu_ids(job)]
 
-    def _check_and_release_completed_jobs(self):
+    def release_completed_jobs(self) -> List[int]:
+        """completed/failed 상태인데 GPU를 보유한 작업의 GPU를 회수 (백그라운드 reconciler가 호출)"""
+        released_gpus = []
         try:
             jobs_collection = db.get_collection('jobs')
             
             # completed나 failed 상태이면서 GPU가 배정된 작업들 찾기
-            completed_jobs = jobs_collection.find({
+            completed_jobs = list(jobs_collection.find({
                 "status": {"$in": ["completed", "failed"]},
                 "gpuId": {"$ne": None}
-            })
+            }, {"gpuId": 1, "gpuIds": 1, "user": 1, "started_at": 1, "completed_at": 1}))
             
-            released_gpus = []
-            
-            for job in completed_jobs:
-                job_id = job["_id"]
-                gpu_id = self._release_gpu_for_job(job_id)
-                if gpu_id:
-                    released_gpus.append(gpu_id)
-            
-            # GPU가 해제되었다면 대기 중인 작업에 자동 할당
-            if released_gpus:            
-                self._process_queued_jobs()
+            released_gpus = self._release_jobs(completed_jobs)
             
         except Exception as e:
             print(f"완료된 작업 GPU 해제 중 오류 발생: {e}")
+        
+        # 해제된 GPU와 외부에서 반환된 GPU를 대기 중인 작업에 배정
+        self.schedule_pending_jobs()
+        return released_gpus
 
-    def _process_queued_jobs(self):       
-        try:
-            # 대기 중인 작업 중에서 요청 시간이 가장 빠른 작업을 찾기
-            jobs_collection = db.get_collection('jobs')
-            oldest_pending_job = jobs_collection.find_one(
-                {"status": "pending"},
-                sort=[("requested_at", 1)]  # 요청 시간 오름차순 (가장 빠른 것부터)
-            )
-            
-            if not oldest_pending_job:
-                return
-            
-            next_job_id = oldest_pending_job["_id"]
-            assigned_gpu_id = self._assign_available_gpu()
-            if not assigned_gpu_id:
-                return
-            
-            # 작업에 GPU 배정하고 상태를 running으로 변경
-            result = jobs_collection.update_one(
-                {"_id": next_job_id},
-                {"$set": {
-                    "gpuId": assigned_gpu_id, 
-                    "status": "running",
-                    "started_at": get_korean_time().isoformat()  # 작업 시작 시간 기록
-                },
-                 "$unset": {"queueNumber": ""}}
-            )
-            
-            if result.modified_count > 0:
-                print(f"🚀 대기 작업 {next_job_id}에 GPU {assigned_gpu_id} 배정 완료")
-            
-        except Exception as e:
-            print(f"대기열 작업 처리 실패: {e}")
+    def _load_busy_gpus(self, now: datetime) -> List[dict]:
+        """사용 중인 GPU와 예상 종료 시각(endsAt). 보유 작업의 estimatedRuntime이 없으면 endsAt은 None"""
+        gpus_collection = db.get_collection('gpus')
+        jobs_collection = db.get_collection('jobs')
+
+        busy_gpus = list(gpus_collection.find({"isAvailable": False}, {"capacity": 1, "jobId": 1}))
+        job_ids = list({gpu["jobId"] for gpu in busy_gpus if gpu.get("jobId") is not None})
+        ends_at = {}
+        for job in jobs_collection.find({"_id": {"$in": job_ids}, "status": "running"},
+                                        {"started_at": 1, "estimatedRuntime": 1}):
+            runtime = estimated_runtime(job)
+            if runtime is not None and job.get("started_at"):
+                ends_at[job["_id"]] = datetime.fromisoformat(job["started_at"]) + runtime
+
+        for gpu in busy_gpus:
+            gpu["endsAt"] = ends_at.get(gpu.get("jobId"))
+        return busy_gpus
 
-    def create_job(self, job_data: JobCreate) -> Optional[Job]:
+    def _plan_fair_share(self, free_gpus: List[dict], now: datetime) -> List[Tuple[dict, List[int]]]:
+        """대기 작업이 있는 사용자의 사용량과 실행 중인 GPU 수만 조회해 fair-share 배정 계획을 만든다."""
+        jobs_collection = db.get_collection('jobs')
+
+        # 사용자마다 가장 오래 기다린 작업을 빈 GPU 수만큼만 가져옴 (한 사용자가 조회 범위를 독차지하지 않도록).
+        # 사용자별로 limit을 건 조회라 대기 작업이 많아도 읽는 양은 사용자 수 x 빈 GPU 수로 제한된다
+        pending_jobs = []
+        for user in jobs_collection.distinct("user", {"status": "pending"}):
+            pending_jobs.extend(jobs_collection.find({"status": "pending", "user": user},
+                                                     {**PENDING_JOB_PROJECTION, "user": 1})
+                                .sort([("requested_at", 1), ("_id", 1)])
+                                .limit(len(free_gpus)))
+        pending_jobs.sort(key=lambda job: (job.get("requested_at") or "", job["_id"]))
+        users = list({job.get("user") for job in pending_jobs})
+
+        # 실행 중인 작업의 GPU 수와 지금까지의 사용 시간도 사용량에 포함
+        usage = usage_service.get_usage(users, now)
+        running_gpus: Dict[str, int] = {}
+        for job in jobs_collection.find({"status": "running", "user": {"$in": users}},
+                                        {"user": 1, "gpuId": 1, "gpuIds": 1, "started_at": 1}):
+            user = job.get("user")
+            running_gpus[user] = running_gpus.get(user, 0) + len(job_gpu_ids(job))
+            usage[user] = usage.get(user, 0.0) + job_gpu_hours(job, now)
+
+        gpu_limits = {}
+        for user in users:
+            limit = USER_GPU_LIMITS.get(user, USER_GPU_LIMIT)
+            if limit > 0:
+                gpu_limits[user] = limit
+        return plan_fair_share(pending_jobs, free_gpus, usage, running_gpus, gpu_limits, now=now,
+                               starvation_seconds=STARVATION_SECONDS)
+
+    def schedule_pending_jobs(self) -> List[dict]:
+        """빈 GPU를 대기 중인 작업(요청 시간 순)으로 한 번에 채운다.
+
+        multi-GPU 작업은 필요한 GPU를 모두 확보한 경우에만 실행하며(all-or-nothing),
+        일부만 확보했다면 즉시 반환하므로 GPU를 쥔 채 기다리는 일이 없다.
+        반환값: 배정 결과 [{"jobId": 작업 ID, "gpuIds": GPU ID 목록}]
+        """
+        placed = []
+        with self._schedule_lock:   # 같은 프로세스 안의 스케줄링은 순서대로 실행
+            pass_started = time.perf_counter()
+            try:
+                gpus_collection = db.get_collection('gpus')
+                jobs_collection = db.get_collection('jobs')
+                
+                free_gpus = list(gpus_collection.find({"isAvailable": True}, {"capacity": 1, "releasedAt": 1}))
+                if not free_gpus:
+                    return placed
+                
+                now = get_korean_time()
+                if SCHEDULER_POLICY == "fairshare":
+                    placements = self._plan_fair_share(free_gpus, now)
+                else:
+                    # 맞는 GPU가 없는 작업은 건너뛰므로 빈 GPU 수보다 넉넉하게 조회
+                    pending_jobs = list(
+                        jobs_collection.find({"status": "pending"}, PENDING_JOB_PROJECTION)
+                        .sort([("requested_at", 1), ("_id", 1)])   # 요청 시간 오름차순 (가장 빠른 것부터)
+                        .limit(max(len(free_gpus), PENDING_SCAN_LIMIT))
+                    )
+                    if SCHEDULER_POLICY == "backfill":
+                        placements = plan_backfill(pending_jobs, free_gpus, self._load_busy_gpus(now), now)
+                    else:
+                        placements = plan_placements(pending_jobs, free_gpus, now=now,
+                                                     starvation_seconds=STARVATION_SECONDS)
+                if not placements:
+                    return placed
+                
+                # 모든 작업의 GPU를 한 번에 확보 (다른 서버 프로세스가 먼저 가져간 GPU는 제외)
+                assign_started = time.perf_counter()
+                claimed = set(gpu_allocator.claim({
+                    gpu_id: job["_id"] for job, gpu_ids in placements for gpu_id in gpu_ids
+                }))
+                complete = [(job, gpu_ids) for job, gpu_ids in placements if claimed.issuperset(gpu_ids)]
+                # 일부만 확보한 작업은 확보한 GPU를 바로 반환 (다음 스케줄링에서 다시 시도)
+                gpu_allocator.release({
+                    gpu_id: job["_id"] for job, gpu_ids in placements if not claimed.issuperset(gpu_ids)
+                    for gpu_id in gpu_ids if gpu_id in claimed
+                })
+                placements = complete
+                if not placements:
+                    return placed
+                
+                # 작업에 GPU 배정하고 상태를 running으로 변경 (한 번의 bulk 연산)
+                started_at = get_korean_time().isoformat()
+                result = jobs_collection.bulk_write([
+                    UpdateOne(
+                        {"_id": job["_id"], "status": "pending"},
+                        {"$set": {"gpuId": gpu_ids[0], "gpuIds": gpu_ids, "status": "running",
+                                  "started_at": started_at},
+                         "$unset": {"queueNumber": ""}}
+                    )
+                    for job, gpu_ids in placements
+                ], ordered=False)
+                
+                if result.modified_count < len(placements):
+                    # 그 사이 삭제되거나 상태가 바뀐 작업에 잡아 둔 GPU는 반환
+                    assigned = {
+                        job["_id"]: job.get("gpuIds")
+                        for job in jobs_collection.find(
+                            {"_id": {"$in": [job["_id"] for job, _ in placements]}}, {"gpuIds": 1}
+                        )
+                    }
+                    failed = [(job, gpu_ids) for job, gpu_ids in placements if assigned.get(job["_id"]) != gpu_ids]
+                    gpu_allocator.release({gpu_id: job["_id"] for job, gpu_ids in failed for gpu_id in gpu_ids})
+                    placements = [placement for placement in placements if placement not in failed]
+                
+                analytics_service.record_started(placements, datetime.fromisoformat(started_at))
+                self._record_idle_time(free_gpus, placements, datetime.fromisoformat(started_at))
+                for job, gpu_ids in placements:
+                    placed.append({"jobId": job["_id"], "gpuIds": gpu_ids})
+                    self._notify("assigned", job["_id"], gpu_ids=gpu_ids)
+                SCHEDULER_LATENCY.observe(time.perf_counter() - assign_started, "assign")
+                SCHEDULER_JOBS.inc("assigned", amount=len(placed))
+                
+                if placed:
+                    data_version.bump()
+                    print(f"🚀 대기 작업 {len(placed)}개에 GPU 배정 완료: {placed}")
+                
+            except Exception as e:
+                print(f"대기열 작업 처리 실패: {e}")
+            finally:
+                SCHEDULER_LATENCY.observe(time.perf_counter() - pass_started, "queue_pass")
+        return placed
+
+    def _record_idle_time(self, free_gpus: List[dict], placements: List[Tuple[dict, List[int]]], started_at: datetime):
+        """배정한 GPU가 반환된 뒤(releasedAt) 비어 있던 시간을 GPU_IDLE에 기록 (반환된 적 없는 GPU는 제외)"""
+        gpus = {gpu["_id"]: gpu for gpu in free_gpus}
+        for _, gpu_ids in placements:
+            for gpu_id in gpu_ids:
+                released_at = gpus.get(gpu_id, {}).get("releasedAt")
+                if released_at:
+                    idle = (started_at - datetime.fromisoformat(released_at)).total_seconds()
+                    GPU_IDLE.observe(max(idle, 0.0), str(gpus[gpu_id].get("capacity")))
+
+    def create_job(self, job_data: JobCreate, user: Optional[str] = None) -> Optional[Job]:
+        """user: 작업 소유자 (API 경로의 user_id). fair-share와 사용자별 제한은 이 값을 기준으로 한다"""
         try:
             jobs_collection = db.get_collection('jobs')
             
-            assigned_gpu_id = self._assign_available_gpu()
-                    
             job_id = get_next_job_id()
             if job_id is None:
                 # print("Job ID 생성 실패")
@@ -201,27 +453,22 @@ class JobService:
             new_job_dict["_id"] = job_id
             new_job_dict["status"] = "pending"
             new_job_dict["log"] = None
+            new_job_dict["gpuId"] = None
             new_job_dict["requested_at"] = get_korean_time().isoformat()  # 작업 요청 시간 기록
             
-            # user 필드가 없으면 기본값 설정
-            if not new_job_dict.get("user"):
-                new_job_dict["user"] = "anonymous"
+            # 경로의 사용자를 소유자로 기록 (본문의 user는 경로 없이 호출한 경우에만 사용)
+            new_job_dict["user"] = user or new_job_dict.get("user") or "anonymous"
             
-            if assigned_gpu_id:
-                # GPU가 있으면 바로 배정
-                new_job_dict["gpuId"] = assigned_gpu_id
-                new_job_dict["status"] = "running"
-                new_job_dict["started_at"] = get_korean_time().isoformat()  # 작업 시작 시간 기록
-            else:
-                # GPU가 없으면 대기열에 추가
-                new_job_dict["gpuId"] = None
-                
-                pending_count = jobs_collection.count_documents({"status": "pending"})
-                new_job_dict["queueNumber"] = pending_count + 1
+            pending_count = jobs_collection.count_documents({"status": "pending"})
+            new_job_dict["queueNumber"] = pending_count + 1
             
-            result = jobs_collection.insert_one(new_job_dict)
-            created_job = jobs_collection.find_one({"_id": job_id})
+            # 대기열에 추가한 뒤 스케줄링 (빈 GPU가 있으면 요청 시간 순서대로 바로 배정)
+            jobs_collection.insert_one(new_job_dict)
+            self._notify("created", job_id, user=new_job_dict["user"])
+            data_version.bump()
+            self.schedule_pending_jobs()
             
+            created_job = jobs_collection.find_one({"_id": job_id})
             if created_job:             
                 job_dict = dict(created_job)
                 return Job(**job_dict)
@@ -261,21 +508,21 @@ class JobService:
             )
             
             if result.modified_count > 0:
+                self._notify("status_changed", job_id, old_status=old_status, new_status=new_status)
+                data_version.bump()
+                
+                if (new_status in ["completed", "failed"] and 
+                    old_status not in ["completed", "failed"] and 
+                    old_job.get("gpuId")):
+                    self._release_jobs([old_job])
+                
+                # 상태 변경으로 GPU나 대기열이 바뀌었을 수 있으므로 대기 중인 작업 처리
+                self.schedule_pending_jobs()
+                
                 updated_job = jobs_collection.find_one({"_id": job_id})
                 if updated_job:
-    
-                    if (new_status in ["completed", "failed"] and 
-                        old_status not in ["completed", "failed"] and 
-                        old_job.get("gpuId")):
-                        released_gpu_id = self._release_gpu_for_job(job_id)
-                        if released_gpu_id:
-                            # GPU 해제 후 대기 중인 작업 처리
-                            self._process_queued_jobs()
-                            updated_job = jobs_collection.find_one({"_id": job_id})
-                    
-                    if updated_job:
-                        job_dict = dict(updated_job)
-                        return Job(**job_dict)
+                    job_dict = dict(updated_job)
+                    return Job(**job_dict)
             return None
             
         except Exception as e:
@@ -286,7 +533,8 @@ class JobService:
         try:
             jobs_collection = db.get_collection('jobs')
             
-            update_data = job_data.model_dump()
+            # 소유자는 생성할 때 정해지므로 수정 요청의 user로 바꾸지 않음
+            update_data = job_data.model_dump(exclude={"user"})
             
             result = jobs_collection.update_one(
                 {"_id": job_id},
@@ -294,6 +542,7 @@ class JobService:
             )
             
             if result.modified_count > 0:
+                data_version.bump()
                 updated_job = jobs_collection.find_one({"_id": job_id})
                 if updated_job:
                     job_dict = dict(updated_job)
@@ -308,25 +557,34 @@ class JobService:
         try:
             jobs_collection = db.get_collection('jobs')
             
-            job_data = jobs_collection.find_one({"_id": job_id})
-            if job_data and job_data.get("gpuId"):
-                gpu_id = job_data["gpuId"]
-                gpus_collection = db.get_collection('gpus')
-                
-                result = gpus_collection.update_one(
-                    {"_id": gpu_id},
-                    {"$set": {"isAvailable": True}}
-                )
-                
-                if result.modified_count > 0:
-                    print(f"삭제된 Job ID {job_id}의 GPU {gpu_id}를 해제했습니다.")
+            # 먼저 삭제해야 이어지는 스케줄링에서 삭제할 작업이 다시 배정되지 않음
+            job_data = jobs_collection.find_one_and_delete(
+                {"_id": job_id}, {"gpuId": 1, "gpuIds": 1, "user": 1, "started_at": 1, "completed_at": 1}
+            )
+            if not job_data:
+                # 보관된(종료 후 오래된) 작업은 GPU를 보유하지 않으므로 보관본만 삭제
+                if not archive_service.delete_job(job_id):
+                    return False
+                self._notify("deleted", job_id)
+                log_index_service.delete_job(job_id)
+                data_version.bump()
+                return True
+            self._notify("deleted", job_id)
+            log_index_service.delete_job(job_id)
+            
+            gpu_ids = job_gpu_ids(job_data)
+            if gpu_ids:
+                # 삭제한 문서에 GPU 정보가 남아 있었으면 다른 해제 경로가 기록하지 않았으므로 여기서 한 번 기록
+                if gpu_allocator.release({gpu_id: job_id for gpu_id in gpu_ids}):
+                    print(f"삭제된 Job ID {job_id}의 GPU {gpu_ids}를 해제했습니다.")
                 else:
-                    print(f"GPU {gpu_id}의 isAvailable 업데이트 실패")
-                
-                self._process_queued_jobs()
+                    print(f"GPU {gpu_ids}의 isAvailable 업데이트 실패")
+                usage_service.record_jobs([job_data], get_korean_time())
+                analytics_service.record_finished([job_data], get_korean_time())
+            data_version.bump()
             
-            result = jobs_collection.delete_one({"_id": job_id})
-            return result.deleted_count > 0
+            self.schedule_pending_jobs()
+            return True
         except Exception as e:
             print(f"작업 삭제 실패: {e}")
             return False
@@ -353,24 +611,36 @@ class JobService:
                 return f"{empty_fields[0]}와 {empty_fields[1]}는 비어 있을 수 없습니다."
             else:
                 return f"{', '.join(empty_fields[:-1])}와 {empty_fields[-1]}는 비어 있을 수 없습니다."
-        else:
-            return None
+
+        # 보유한 GPU로는 실행할 수 없는 작업은 대기열에서 영원히 기다리게 되므로 미리 거부
+        capacity_totals = gpu_service.get_capacity_totals()
+        if capacity_totals:
+            memory = job_candidate.gpuMemory or 0
+            fitting = [total for capacity, total in capacity_totals.items() if capacity >= memory]
+            if not fitting:
+                return f"요구 GPU 메모리({memory}GB)를 만족하는 GPU가 없습니다. (최대 {max(capacity_totals)}GB)"
+            
+            available = max(fitting) if job_candidate.sameCapacity else sum(fitting)
+            if job_candidate.gpuCount > available:
+                return f"요청한 GPU 개수({job_candidate.gpuCount}개)가 조건을 만족하는 GPU 수({available}개)보다 많습니다."
+
+        return None
 
     def get_job_log(self, job_id: int) -> Optional[dict]:
         try:
             jobs_collection = db.get_collection('jobs')
             
-            job = jobs_collection.find_one({"_id": job_id})
+            job = jobs_collection.find_one({"_id": job_id}) or archive_service.get_job(job_id)
             if not job:
                 print(f"❌ Job ID {job_id}을(를) 찾을 수 없습니다.")
                 return None
             
-            # 테스트용 로그 파일
-            log_file_path = "logs_test.txt"
+            log_file_path = resolve_log_path(job)
             
             try:
-                with open(log_file_path, 'r', encoding='utf-8') as file:
-                    log_content = file.read()
+                # 파일 전체가 아닌 마지막 LOG_PREVIEW_LINES 줄만 읽음 (전체는 /log 엔드포인트로 구간 조회)
+                log_bytes, _, _ = log_service.tail(log_file_path, LOG_PREVIEW_LINES)
+                log_content = log_bytes.decode('utf-8', errors='replace')
                 
                 return {
                     "code": 200,
@@ -0,0 +1,336 @@
+import asyncio
+import os
+import re
+import time
+import zlib
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+from bson import Binary
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from database import db
+from models import get_korean_time
+from services.log_service import resolve_log_path
+
+# 로그 줄 형식: "YYYY-MM-DD HH:MM:SS [LEVEL] message". 형식이 다른 줄(traceback 등)은 앞 줄의 시각/레벨을 따른다
+LOG_LINE_PATTERN = re.compile(rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \[([A-Za-z]+)\]")
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SEGMENT_MAX_LINES = 4096              # 세그먼트 하나의 최대 줄 수
+SEGMENT_MAX_BYTES = 1024 * 1024       # 세그먼트 하나의 최대 크기 (압축 전)
+SPARSE_INDEX_INTERVAL = 64            # 이 줄 수마다 (줄 번호, 세그먼트 안 위치, 시각, 레벨)을 기록
+INGEST_READ_SIZE = 8 * 1024 * 1024    # 색인할 때 한 번에 읽는 크기
+LOG_INGEST_INTERVAL_SECONDS = float(os.getenv('LOG_INGEST_INTERVAL_SECONDS', '30'))
+
+FINISHED_JOB_STATUSES = ["completed", "failed"]
+
+# 파싱한 줄 하나: (데이터 안 byte 위치, 줄 내용, 시각, 레벨)
+LogEntry = Tuple[int, bytes, Optional[str], Optional[str]]
+
+def parse_entries(data: bytes, ts: Optional[str], level: Optional[str]) -> List[LogEntry]:
+    """data를 줄 단위로 파싱. ts/level: data 앞 줄의 시각/레벨 (형식이 다른 줄이 이어받음)"""
+    lines = data.split(b"\n")
+    if data.endswith(b"\n") or not data:
+        lines.pop()
+    entries = []
+    position = 0
+    for line in lines:
+        match = LOG_LINE_PATTERN.match(line)
+        if match:
+            ts, level = match.group(1).decode(), match.group(2).decode().upper()
+        entries.append((position, line, ts, level))
+        position += len(line) + 1
+    return entries
+
+def build_segment(job_id: int, seq: int, start_offset: int, first_line: int,
+                  entries: List[LogEntry], raw: bytes) -> dict:
+    """줄 목록으로 log_segments 문서 생성. entries의 위치는 raw 기준"""
+    bitmaps = {}
+    counts = {}
+    sparse_index = []
+    for line_number, (position, _, ts, level) in enumerate(entries):
+        if level:
+            bitmap = bitmaps.setdefault(level, bytearray((len(entries) + 7) // 8))
+            bitmap[line_number >> 3] |= 1 << (line_number & 7)
+            counts[level] = counts.get(level, 0) + 1
+        if line_number % SPARSE_INDEX_INTERVAL == 0:
+            sparse_index.append([line_number, position, ts, level])
+    timestamps = [ts for _, _, ts, _ in entries if ts]
+    return {
+        "jobId": job_id,
+        "seq": seq,
+        "startOffset": start_offset,
+        "endOffset": start_offset + len(raw),
+        "firstLine": first_line,
+        "lineCount": len(entries),
+        "firstTs": timestamps[0] if timestamps else None,
+        "lastTs": timestamps[-1] if timestamps else None,
+        "levels": {level: {"count": counts[level], "bitmap": Binary(bytes(bitmap))} for level, bitmap in bitmaps.items()},
+        "index": sparse_index,
+        "data": Binary(zlib.compress(raw)),
+    }
+
+class LineMatcher:
+    """검색 조건 확인과 결과 페이지 (limit보다 하나 더 모아 다음 페이지가 있는지 확인)"""
+
+    def __init__(self, level: Optional[str], start: Optional[str], end: Optional[str], after: int, limit: int):
+        self.level = level
+        self.start = start
+        self.end = end
+        self.after = after
+        self.limit = limit
+        self.lines: List[dict] = []
+
+    def add(self, offset: int, line_number: int, text: bytes, ts: Optional[str], level: Optional[str]) -> bool:
+        """조건에 맞으면 결과에 추가. limit보다 많이 모았으면 True (검색 중단)"""
+        if offset < self.after or (self.level and level != self.level):
+            return False
+        if (self.start or self.end) and ts is None:
+            return False
+        if (self.start and ts < self.start) or (self.end and ts > self.end):
+            return False
+        self.lines.append({"line": line_number, "offset": offset, "ts": ts, "level": level,
+                           "text": text.decode('utf-8', errors='replace')})
+        return len(self.lines) > self.limit
+
+    def page(self) -> Tuple[List[dict], Optional[int]]:
+        if len(self.lines) <= self.limit:
+            return self.lines, None
+        return self.lines[:self.limit], self.lines[self.limit]["offset"]
+
+class LogIndexService:
+    """작업 로그를 레벨/시각으로 검색할 수 있도록 압축 세그먼트(log_segments)로 색인한다.
+
+    세그먼트 문서에는 압축한 원문과 함께 시각 범위(firstTs/lastTs), 레벨별 줄 bitmap,
+    SPARSE_INDEX_INTERVAL줄마다의 (줄 번호, 위치, 시각, 레벨)을 저장하므로 검색은 조건에 맞는 세그먼트만
+    압축을 풀고, 그 안에서도 시작 시각 이전 구간은 건너뛴다.
+    색인은 log_ingest_state에 기록한 위치부터 새로 추가된 부분만 읽는다. 세그먼트는 가득 찼을 때(또는
+    작업이 끝났을 때) 만들며, 아직 세그먼트가 되지 않은 파일 끝 부분은 검색할 때 파일에서 직접 읽는다.
+    상태 문서 형태: {"_id": job_id, "path", "inode", "offset", "seq", "line", "ts", "level", "final"}
+    """
+
+    def __init__(self, interval: float = LOG_INGEST_INTERVAL_SECONDS):
+        self.interval = interval
+        self.last_run_at: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_segment_count = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _load_state(self, job_id: int, path: str, inode: int, file_size: int) -> dict:
+        state = db.get_collection('log_ingest_state').find_one({"_id": job_id})
+        if state and state["path"] == path and state["inode"] == inode and state["offset"] <= file_size:
+            return state
+        if state:
+            # 로그 파일이 바뀌었거나 잘렸으면 처음부터 다시 색인
+            print(f"Job ID {job_id}의 로그 파일이 바뀌어 다시 색인합니다.")
+            self.delete_job(job_id)
+        return {"_id": job_id, "path": path, "inode": inode, "offset": 0, "seq": 0, "line": 0,
+                "ts": None, "level": None, "final": False, "new": True}
+
+    def ingest(self, job: dict, final: bool = False) -> int:
+        """로그에서 지난번 이후 추가된 부분을 세그먼트로 만든다. 반환값: 새로 만든 세그먼트 수
+
+        final이면(작업 종료) 세그먼트 크기에 못 미치는 마지막 부분도 세그먼트로 만든다.
+        """
+        job_id = job["_id"]
+        path = resolve_log_path(job)
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
+            return 0
+        file_size = file_stat.st_size
+        state = self._load_state(job_id, path, file_stat.st_ino, file_size)
+        if state["final"] and state["offset"] == file_size:
+            return 0
+
+        offset, seq, line, ts, level = state["offset"], state["seq"], state["line"], state["ts"], state["level"]
+        segments = []
+        with open(path, 'rb') as file:
+            while offset < file_size:
+                file.seek(offset)
+                data = file.read(min(INGEST_READ_SIZE, file_size - offset))
+                at_end = offset + len(data) >= file_size
+                if not (final and at_end):
+                    # 아직 쓰는 중일 수 있는 마지막 줄은 다음에 색인
+                    data = data[:data.rfind(b"\n") + 1]
+                    if not data:
+                        break
+
+                group = []
+                consumed = 0
+                for entry in parse_entries(data, ts, level):
+                    group.append(entry)
+                    group_end = min(entry[0] + len(entry[1]) + 1, len(data))
+                    if len(group) < SEGMENT_MAX_LINES and group_end - group[0][0] < SEGMENT_MAX_BYTES:
+                        continue
+                    segments.append(self._segment(job_id, seq, offset, line, group, data[group[0][0]:group_end]))
+                    seq, line, consumed = seq + 1, line + len(group), group_end
+                    ts, level = group[-1][2], group[-1][3]
+                    group = []
+                if group and final and at_end:
+                    segments.append(self._segment(job_id, seq, offset, line, group, data[group[0][0]:]))
+                    seq, line, consumed = seq + 1, line + len(group), len(data)
+                    ts, level = group[-1][2], group[-1][3]
+                offset += consumed
+                if consumed == 0 or at_end:
+                    break
+
+        new_state = {"path": path, "inode": file_stat.st_ino, "offset": offset, "seq": seq, "line": line,
+                     "ts": ts, "level": level, "final": final and offset == file_size}
+        if not segments and not state.get("new") and new_state["final"] == state["final"]:
+            return 0
+        if segments:
+            try:
+                db.get_collection('log_segments').insert_many(segments, ordered=False)
+            except BulkWriteError as e:
+                # 다른 서버 프로세스가 같은 구간을 먼저 색인함 (같은 위치에서 시작하므로 세그먼트 내용도 같음)
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+        try:
+            if state.get("new"):
+                db.get_collection('log_ingest_state').insert_one({"_id": job_id, **new_state})
+            else:
+                db.get_collection('log_ingest_state').update_one(
+                    {"_id": job_id, "offset": state["offset"], "seq": state["seq"]}, {"$set": new_state}
+                )
+        except DuplicateKeyError:
+            pass
+        return len(segments)
+
+    def _segment(self, job_id: int, seq: int, offset: int, line: int, group: List[LogEntry], raw: bytes) -> dict:
+        base = group[0][0]
+        entries = [(position - base, text, ts, level) for position, text, ts, level in group]
+        return build_segment(job_id, seq, offset + base, line, entries, raw)
+
+    def search(self, job: dict, level: Optional[str] = None, start: Optional[str] = None,
+               end: Optional[str] = None, after: int = 0, limit: int = 200) -> Tuple[List[dict], Optional[int]]:
+        """레벨/시각 조건에 맞는 줄 검색. start/end: LOG_TIME_FORMAT 문자열 (둘 다 포함), after: 이 위치부터 검색
+
+        반환값: (줄 목록 [{"line", "offset", "ts", "level", "text"}], 다음 페이지의 after (더 없으면 None))
+        """
+        job_id = job["_id"]
+        level = level.upper() if level else None
+        self.ingest(job, final=job.get("status") in FINISHED_JOB_STATUSES)
+
+        # 레벨/시각 범위가 맞지 않는 세그먼트는 읽지 않음
+        query = {"jobId": job_id, "endOffset": {"$gt": after}}
+        if level:
+            query[f"levels.{level}.count"] = {"$gt": 0}
+        if start:
+            query["lastTs"] = {"$gte": start}
+        if end:
+            query["firstTs"] = {"$lte": end}
+        matcher = LineMatcher(level, start, end, after, limit)
+        for segment in db.get_collection('log_segments').find(query).sort([("jobId", 1), ("seq", 1)]):
+            if self._search_segment(segment, matcher):
+                return matcher.page()
+
+        state = db.get_collection('log_ingest_state').find_one({"_id": job_id})
+        if state:
+            self._search_tail(state, matcher)
+        return matcher.page()
+
+    def _search_segment(self, segment: dict, matcher: LineMatcher) -> bool:
+        sparse_index = segment["index"]
+        first = 0
+        # 시각이 순서대로 기록된 세그먼트는 start 이전 구간을 건너뜀.
+        # start와 같은 시각의 줄은 그 이전 색인 지점부터 이어질 수 있으므로 start보다 앞선 마지막 지점에서 시작
+        keys = [entry[2] or "" for entry in sparse_index]
+        if matcher.start and keys == sorted(keys):
+            first = max(bisect_left(keys, matcher.start) - 1, 0)
+        relative_after = matcher.after - segment["startOffset"]
+        if relative_after > 0:
+            first = max(first, bisect_right([entry[1] for entry in sparse_index], relative_after) - 1)
+        line_number, position, ts, level = sparse_index[first]
+
+        bitmap = segment["levels"][matcher.level]["bitmap"] if matcher.level else None
+        raw = zlib.decompress(segment["data"])
+        base_offset = segment["startOffset"] + position
+        for index, (relative, text, line_ts, line_level) in enumerate(parse_entries(raw[position:], ts, level),
+                                                                     start=line_number):
+            if bitmap is not None and not bitmap[index >> 3] >> (index & 7) & 1:
+                continue
+            if matcher.add(base_offset + relative, segment["firstLine"] + index, text, line_ts, line_level):
+                return True
+        return False
+
+    def _search_tail(self, state: dict, matcher: LineMatcher):
+        """아직 세그먼트가 되지 않은 부분(state의 offset 이후)을 파일에서 직접 검색"""
+        try:
+            with open(state["path"], 'rb') as file:
+                file.seek(state["offset"])
+                data = file.read(SEGMENT_MAX_BYTES + INGEST_READ_SIZE)
+        except FileNotFoundError:
+            return
+        if not state["final"]:
+            data = data[:data.rfind(b"\n") + 1]
+        for index, (relative, text, line_ts, line_level) in enumerate(parse_entries(data, state["ts"], state["level"])):
+            if matcher.add(state["offset"] + relative, state["line"] + index, text, line_ts, line_level):
+                return
+
+    def delete_job(self, job_id: int):
+        try:
+            db.get_collection('log_segments').delete_many({"jobId": job_id})
+            db.get_collection('log_ingest_state').delete_one({"_id": job_id})
+        except Exception as e:
+            print(f"로그 색인 삭제 실패: {e}")
+
+    def ingest_active_jobs(self) -> int:
+        """실행 중인 작업의 로그와, 종료된 뒤 마지막 부분을 아직 색인하지 않은 작업의 로그를 색인"""
+        jobs_collection = db.get_collection('jobs')
+        projection = {"logPath": 1, "user": 1, "status": 1}
+        segment_count = 0
+        running_ids = set()
+        for job in jobs_collection.find({"status": "running"}, projection):
+            running_ids.add(job["_id"])
+            segment_count += self.ingest(job)
+        unfinished = [
+            state["_id"] for state in db.get_collection('log_ingest_state').find({"final": False}, {"_id": 1})
+            if state["_id"] not in running_ids
+        ]
+        if unfinished:
+            for job in jobs_collection.find({"_id": {"$in": unfinished}}, projection):
+                segment_count += self.ingest(job, final=job.get("status") in FINISHED_JOB_STATUSES)
+        return segment_count
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        started = time.perf_counter()
+        try:
+            self.last_segment_count = await asyncio.to_thread(self.ingest_active_jobs)
+        except Exception as e:
+            print(f"로그 색인 실패: {e}")
+        finally:
+            self.last_run_at = get_korean_time().isoformat()
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def status(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_segment_count": self.last_segment_count,
+        }
+
+log_index_service = LogIndexService()
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+# 작업 로그 파일 경로 규칙 (job 문서에 logPath가 없을 때 사용)
+JOB_LOG_PATH_TEMPLATE = os.getenv('JOB_LOG_PATH_TEMPLATE', 'logs/{job_id}.log')
+
+TAIL_BLOCK_SIZE = 64 * 1024          # tail 조회 시 파일 끝에서부터 거꾸로 읽는 단위
+MAX_READ_LENGTH = 4 * 1024 * 1024    # 한 번에 읽을 수 있는 최대 바이트 수
+FOLLOW_POLL_INTERVAL = 0.5           # follow 모드에서 파일 크기를 확인하는 주기 (초)
+FOLLOW_FINISH_CHECK_INTERVAL = 5.0   # follow 모드에서 작업 종료 여부를 확인하는 주기 (초)
+
+def resolve_log_path(job: dict) -> str:
+    """작업의 실제 로그 파일 경로. 러너가 기록한 logPath가 있으면 우선 사용한다."""
+    log_path = job.get("logPath")
+    if log_path:
+        return log_path
+    return JOB_LOG_PATH_TEMPLATE.format(job_id=job["_id"], user=job.get("user") or "anonymous")
+
+class LogService:
+    """로그 파일 전체를 메모리에 올리지 않고 필요한 구간만 읽는다."""
+
+    def read_range(self, path: str, offset: int, length: int) -> Tuple[bytes, int]:
+        """offset부터 최대 length 바이트를 읽는다. 반환값: (읽은 바이트, 파일 크기)"""
+        length = min(length, MAX_READ_LENGTH)
+        with open(path, 'rb') as file:
+            file_size = os.fstat(file.fileno()).st_size
+            if offset >= file_size:
+                return b"", file_size
+            file.seek(offset)
+            return file.read(length), file_size
+
+    def tail(self, path: str, lines: int) -> Tuple[bytes, int, int]:
+        """파일 끝에서부터 거꾸로 읽어 마지막 lines 줄을 찾는다.
+
+        반환값: (마지막 lines 줄, 시작 offset, 파일 크기)
+        """
+        with open(path, 'rb') as file:
+            file_size = os.fstat(file.fileno()).st_size
+            if lines <= 0 or file_size == 0:
+                return b"", file_size, file_size
+
+            position = file_size
+            newline_count = 0
+            start = 0
+            # 마지막 줄이 개행으로 끝나면 그 개행은 줄 구분자로 세지 않는다
+            file.seek(file_size - 1)
+            skip_trailing = file.read(1) == b"\n"
+
+            while position > 0:
+                read_size = min(TAIL_BLOCK_SIZE, position)
+                position -= read_size
+                file.seek(position)
+                block = file.read(read_size)
+
+                end = len(block) - 1 if skip_trailing and position + read_size == file_size else len(block)
+                index = block.rfind(b"\n", 0, end)
+                while index != -1:
+                    newline_count += 1
+                    if newline_count == lines:
+                        start = position + index + 1
+                        break
+                    index = block.rfind(b"\n", 0, index)
+                if newline_count == lines:
+                    break
+
+            length = file_size - start
+            if length > MAX_READ_LENGTH:   # 줄이 매우 긴 경우에도 응답 크기는 제한
+                start = file_size - MAX_READ_LENGTH
+                length = MAX_READ_LENGTH
+            file.seek(start)
+            return file.read(length), start, file_size
+
+    async def follow(self, path: str, offset: int,
+                     is_finished: Optional[Callable[[], Awaitable[bool]]] = None) -> AsyncIterator[Tuple[int, str]]:
+        """offset 이후에 추가되는 줄을 계속 전달한다. 반환값: (해당 줄 다음 위치의 offset, 줄 내용)
+
+        is_finished가 True를 반환하고 더 읽을 내용이 없으면 종료한다.
+        """
+        pending = b""
+        last_finish_check = 0.0
+        while True:
+            try:
+                file_size = await asyncio.to_thread(os.path.getsize, path)
+            except FileNotFoundError:
+                file_size = 0
+
+            if file_size < offset:   # 파일이 잘리거나 교체된 경우 처음부터 다시 읽음
+                offset, pending = 0, b""
+
+            if file_size > offset:
+                data, _ = await asyncio.to_thread(self.read_range, path, offset, file_size - offset)
+                line_offset = offset - len(pending)   # pending 버퍼가 시작하는 위치
+                offset += len(data)
+                pending += data
+                *complete_lines, pending = pending.split(b"\n")
+                for line in complete_lines:
+                    line_offset += len(line) + 1
+                    yield line_offset, line.decode('utf-8', errors='replace')
+                continue
+
+            now = time.monotonic()
+            if is_finished is not None and now - last_finish_check >= FOLLOW_FINISH_CHECK_INTERVAL:
+                last_finish_check = now
+                if await is_finished():
+                    if pending:
+                        yield offset, pending.decode('utf-8', errors='replace')
+                    return
+            await asyncio.sleep(FOLLOW_POLL_INTERVAL)
+
+log_service = LogService()
@@ -0,0 +1,153 @@
+"""Prometheus 텍스트 형식 메트릭.
+
+운영 중에도 계속 켜 둘 수 있도록 기록 비용을 작게 유지한다 (라벨 값 튜플을 key로 하는 dict와
+lock 하나, histogram은 bisect 한 번). 요청/명령 수는 따로 세지 않고 histogram의 _count를 사용한다.
+측정: benchmarks/metrics_overhead.py
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+from pymongo import monitoring
+
+# 초 단위 latency 구간 (0.5ms ~ 10s)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+IDLE_BUCKETS = (1, 5, 15, 30, 60, 300, 900, 1800, 3600, 4 * 3600, 12 * 3600, 24 * 3600)
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # 라벨별 [구간별 개수..., +Inf 개수, 합계]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(state)) for labels, state in self._values.items()]
+        for labels, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {state[-1]!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+def render_gauge(name: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]) -> List[str]:
+    """조회 시점에 계산하는 gauge. samples: [({라벨: 값}, 값)]"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_number(value)}")
+    return lines
+
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP 응답 헤더를 보낼 때까지 걸린 시간",
+                         ("method", "route", "status"))
+MONGO_LATENCY = Histogram("mongo_command_duration_seconds", "MongoDB 명령 처리 시간", ("command", "result"))
+SCHEDULER_LATENCY = Histogram("scheduler_action_duration_seconds", "스케줄러 동작 처리 시간 (assign, release, queue_pass)",
+                              ("action",))
+SCHEDULER_JOBS = Counter("scheduler_jobs_total", "스케줄러가 처리한 작업 수 (assigned, released)", ("action",))
+GPU_IDLE = Histogram("gpu_idle_seconds", "GPU가 반환된 뒤 다음 작업에 배정될 때까지 비어 있던 시간", ("capacity",),
+                     buckets=IDLE_BUCKETS)
+
+METRICS = [HTTP_LATENCY, MONGO_LATENCY, SCHEDULER_LATENCY, SCHEDULER_JOBS, GPU_IDLE]
+
+def render_metrics(extra_lines: List[str] = ()) -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """MongoDB 명령 종류별 수와 처리 시간 (MongoClient의 event_listeners로 등록)"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1_000_000, event.command_name, "ok")
+
+    def failed(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1_000_000, event.command_name, "failed")
+
+mongo_command_metrics = MongoCommandMetrics()
+
+def _record_request(scope, started: float, status: int):
+    route = scope.get("route")   # 라우팅 후 설정되는 경로 템플릿 (/user/{user_id}/jobs/ 등)
+    path = route.path if route is not None else "unmatched"
+    HTTP_LATENCY.observe(time.perf_counter() - started, scope["method"], path, str(status))
+
+class MetricsMiddleware:
+    """라우트(경로 템플릿)별 요청 수와 응답 시작까지의 시간. SSE 같은 스트리밍 응답도 헤더 전송 시점으로 잰다."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if status is None and message["type"] == "http.response.start":
+                status = message["status"]
+                _record_request(scope, started, status)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if status is None:   # 응답 전에 예외가 발생한 경우
+                _record_request(scope, started, 500)
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+from services.job_service import job_service, get_korean_time
+
+RECONCILE_INTERVAL_SECONDS = float(os.getenv('RECONCILE_INTERVAL_SECONDS', '10'))
+
+class JobReconciler:
+    """완료/실패한 작업의 GPU 회수를 조회 API 밖에서 주기적으로 수행하는 백그라운드 작업.
+
+    interval마다 실행되며, 작업 상태가 바뀌면 대기하지 않고 바로 깨어난다.
+    """
+
+    def __init__(self, interval: float = RECONCILE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.last_run_at: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_released_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake_event: Optional[asyncio.Event] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake_event = asyncio.Event()
+        job_service.add_listener(self._on_job_event)
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake(self):
+        # JobService는 스레드풀에서 호출될 수 있으므로 이벤트 루프에 넘겨서 set
+        if self._loop is None or self._wake_event is None:
+            return
+        self._loop.call_soon_threadsafe(self._wake_event.set)
+
+    def _on_job_event(self, event: str, job_id: int, **data):
+        if event == "status_changed":
+            self.wake()
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_event.clear()
+
+    async def run_once(self):
+        started = time.perf_counter()
+        try:
+            released_gpus = await asyncio.to_thread(job_service.release_completed_jobs)
+            self.last_released_count = len(released_gpus)
+        except Exception as e:
+            print(f"GPU 회수 작업 실패: {e}")
+        finally:
+            self.last_run_at = get_korean_time().isoformat()
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def status(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_released_count": self.last_released_count,
+        }
+
+reconciler = JobReconciler()
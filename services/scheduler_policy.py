@@ -0,0 +1,229 @@
+"""대기열 스케줄링 정책.
+
+DB에 접근하지 않는 순수 함수로 두어 JobService와 시뮬레이션에서 같은 코드를 사용한다.
+작업/GPU는 Mongo 문서와 같은 형태의 dict로 다룬다.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# 이 시간(초) 이상 기다린 작업이 배정되지 못하면, 뒤의 작업이 그 작업이 쓸 수 있는 GPU를
+# 가져가지 못하게 막아 GPU가 모이도록 한다 (multi-GPU 작업이 작은 작업에 밀려 굶지 않도록)
+DEFAULT_STARVATION_SECONDS = 1800
+
+def group_free_gpus(free_gpus: List[dict]) -> Dict[int, List[int]]:
+    """capacity별 사용 가능한 GPU ID 목록 (ID 오름차순)"""
+    free_by_capacity: Dict[int, List[int]] = {}
+    for gpu in sorted(free_gpus, key=lambda gpu: gpu["_id"]):
+        free_by_capacity.setdefault(gpu["capacity"], []).append(gpu["_id"])
+    return free_by_capacity
+
+def required_memory(job: dict) -> int:
+    """작업이 요구하는 GPU 메모리(GB). 지정하지 않으면 어떤 GPU든 가능"""
+    return job.get("gpuMemory") or 0
+
+def required_count(job: dict) -> int:
+    return job.get("gpuCount") or 1
+
+def select_gpus(job: dict, free_by_capacity: Dict[int, List[int]]) -> Optional[List[int]]:
+    """작업에 필요한 GPU를 전부 고를 수 있으면 GPU ID 목록, 아니면 None (일부만 고르지 않음)
+
+    작은 capacity부터 채우며(best-fit), sameCapacity인 작업은 한 capacity 안에서만 고른다.
+    """
+    memory = required_memory(job)
+    count = required_count(job)
+    fitting = sorted(capacity for capacity in free_by_capacity if capacity >= memory)
+
+    if job.get("sameCapacity"):
+        for capacity in fitting:
+            if len(free_by_capacity[capacity]) >= count:
+                return free_by_capacity[capacity][:count]
+        return None
+
+    selected: List[int] = []
+    for capacity in fitting:
+        selected.extend(free_by_capacity[capacity][:count - len(selected)])
+        if len(selected) == count:
+            return selected
+    return None
+
+def waited_seconds(job: dict, now: datetime) -> float:
+    requested_at = job.get("requested_at")
+    if not requested_at:
+        return 0.0
+    return (now - datetime.fromisoformat(requested_at)).total_seconds()
+
+def plan_placements(pending_jobs: List[dict], free_gpus: List[dict], now: Optional[datetime] = None,
+                    starvation_seconds: float = DEFAULT_STARVATION_SECONDS) -> List[Tuple[dict, List[int]]]:
+    """요청 시간 순으로 정렬된 대기 작업을 빈 GPU에 채운다. 반환값: [(작업, GPU ID 목록)]
+
+    각 작업은 요구 메모리를 만족하는 가장 작은 GPU에 배정하며(best-fit),
+    지금 맞는 GPU가 없는 작업은 건너뛰고 다음 작업을 본다. 단, starvation_seconds 이상
+    기다린 작업을 건너뛸 때는 그 작업이 쓸 수 있는 capacity를 뒤의 작업에 내주지 않는다.
+    """
+    free_by_capacity = group_free_gpus(free_gpus)
+    placements = []
+    for job in pending_jobs:
+        if not any(free_by_capacity.values()):
+            break
+        gpu_ids = select_gpus(job, free_by_capacity)
+        if gpu_ids is None:
+            if now is not None and waited_seconds(job, now) >= starvation_seconds:
+                _hold_capacities(job, free_by_capacity)
+            continue
+        _take_gpus(free_by_capacity, gpu_ids)
+        placements.append((job, gpu_ids))
+    return placements
+
+def _hold_capacities(job: dict, free_by_capacity: Dict[int, List[int]]):
+    """기다린 작업이 쓸 수 있는 capacity를 이번 배정에서 제외"""
+    memory = required_memory(job)
+    for capacity in [capacity for capacity in free_by_capacity if capacity >= memory]:
+        del free_by_capacity[capacity]
+
+def _take_gpus(free_by_capacity: Dict[int, List[int]], gpu_ids: List[int]):
+    for capacity, ids in free_by_capacity.items():
+        free_by_capacity[capacity] = [gpu_id for gpu_id in ids if gpu_id not in gpu_ids]
+
+def fair_share_order(pending_jobs: List[dict], usage: Dict[str, float]) -> List[dict]:
+    """사용자별 최근 사용량이 적은 순으로, 사용자마다 한 작업씩 번갈아 정렬
+
+    pending_jobs는 요청 시간 순이어야 한다. 각 사용자의 n번째 작업이 (n+1)번째 작업보다 항상 앞에 온다.
+    """
+    ranks: Dict[str, int] = {}
+    keyed = []
+    for index, job in enumerate(pending_jobs):
+        user = job.get("user")
+        rank = ranks.get(user, 0)
+        ranks[user] = rank + 1
+        keyed.append(((rank, usage.get(user, 0.0), index), job))
+    return [job for _, job in sorted(keyed, key=lambda item: item[0])]
+
+def plan_fair_share(pending_jobs: List[dict], free_gpus: List[dict], usage: Dict[str, float],
+                    running_gpus: Dict[str, int], gpu_limits: Dict[str, int], now: Optional[datetime] = None,
+                    starvation_seconds: float = DEFAULT_STARVATION_SECONDS) -> List[Tuple[dict, List[int]]]:
+    """fair-share 정책. 반환값: [(작업, GPU ID 목록)]
+
+    fair_share_order 순서로 plan_placements와 같이 배정하되, 사용자가 이미 사용 중인 GPU 수
+    (running_gpus)와 이번에 배정할 GPU 수의 합이 gpu_limits를 넘는 작업은 건너뛴다.
+    gpu_limits에 없는 사용자는 제한하지 않는다.
+    """
+    free_by_capacity = group_free_gpus(free_gpus)
+    in_use = dict(running_gpus)
+    placements = []
+    for job in fair_share_order(pending_jobs, usage):
+        if not any(free_by_capacity.values()):
+            break
+        user = job.get("user")
+        limit = gpu_limits.get(user)
+        if limit is not None and in_use.get(user, 0) + required_count(job) > limit:
+            continue
+        gpu_ids = select_gpus(job, free_by_capacity)
+        if gpu_ids is None:
+            if now is not None and waited_seconds(job, now) >= starvation_seconds:
+                _hold_capacities(job, free_by_capacity)
+            continue
+        _take_gpus(free_by_capacity, gpu_ids)
+        in_use[user] = in_use.get(user, 0) + len(gpu_ids)
+        placements.append((job, gpu_ids))
+    return placements
+
+def estimated_runtime(job: dict) -> Optional[timedelta]:
+    """작업의 예상 실행 시간 (estimatedRuntime, 분). 없으면 None (끝나는 시각을 알 수 없음)"""
+    minutes = job.get("estimatedRuntime")
+    return timedelta(minutes=minutes) if minutes else None
+
+def _reservation(job: dict, free_by_capacity: Dict[int, List[int]],
+                 busy_gpus: List[dict], now: datetime) -> Tuple[Optional[datetime], Dict[int, int]]:
+    """지금 실행할 수 없는 작업이 시작 가능한 가장 이른 시각(shadow time)과,
+    그 시각에 이 작업이 쓰고도 남는 capacity별 GPU 수(extra)를 계산한다.
+
+    끝나는 시각을 알 수 없는 GPU는 계산에서 제외하며, 시작 시각을 정할 수 없으면 (None, {})
+    """
+    memory = required_memory(job)
+    count = required_count(job)
+    fitting = sorted(capacity for capacity in set(free_by_capacity) | {gpu["capacity"] for gpu in busy_gpus}
+                     if capacity >= memory)
+    releases = sorted(
+        (gpu["endsAt"], gpu["capacity"]) for gpu in busy_gpus
+        if gpu["capacity"] in fitting and gpu.get("endsAt") is not None
+    )
+
+    # sameCapacity 작업은 capacity별로 따로 계산해 가장 이른 시각을 사용
+    groups = [[capacity] for capacity in fitting] if job.get("sameCapacity") else [fitting]
+    best: Tuple[Optional[datetime], Dict[int, int]] = (None, {})
+    for group in groups:
+        available = {capacity: len(free_by_capacity.get(capacity, [])) for capacity in group}
+        shadow_time = now if sum(available.values()) >= count else None
+        for ends_at, capacity in releases:
+            if capacity not in group:
+                continue
+            if shadow_time is not None and max(ends_at, now) > shadow_time:
+                break
+            # 같은 시각에 함께 반환되는 GPU까지 포함해서 센다
+            available[capacity] += 1
+            if shadow_time is None and sum(available.values()) >= count:
+                shadow_time = max(ends_at, now)
+        if shadow_time is None or (best[0] is not None and best[0] <= shadow_time):
+            continue
+
+        # 작은 capacity부터 이 작업에 쓰고 남는 수를 extra로 계산
+        extra = dict(available)
+        remaining = count
+        for capacity in group:
+            used = min(extra[capacity], remaining)
+            extra[capacity] -= used
+            remaining -= used
+        best = (shadow_time, extra)
+    return best
+
+def plan_backfill(pending_jobs: List[dict], free_gpus: List[dict], busy_gpus: List[dict],
+                  now: datetime) -> List[Tuple[dict, List[int]]]:
+    """EASY backfill 정책. 반환값: [(작업, GPU ID 목록)]
+
+    요청 시간 순으로 배정하다가 처음으로 실행할 수 없는 작업(head)을 만나면, 실행 중인 작업의
+    예상 종료 시각(busy_gpus의 endsAt)으로 head의 시작 시각을 예약한다. 이후 작업은 지금 실행할
+    수 있고, 예약 시각 전에 끝나거나 head가 쓰고 남는 GPU만 사용하는 경우에만 먼저 실행한다.
+    예상 실행 시간이 없는 작업은 예약 시각 전에 끝난다고 보지 않는다.
+    """
+    free_by_capacity = group_free_gpus(free_gpus)
+    placements = []
+    shadow_time: Optional[datetime] = None
+    extra: Dict[int, int] = {}
+    reserved = False
+
+    for job in pending_jobs:
+        if not any(free_by_capacity.values()):
+            break
+        gpu_ids = select_gpus(job, free_by_capacity)
+
+        if not reserved:
+            if gpu_ids is None:
+                # 첫 번째로 막힌 작업에 시작 시각을 예약
+                shadow_time, extra = _reservation(job, free_by_capacity, busy_gpus, now)
+                if shadow_time is None:
+                    # 예약할 수 없으면(끝나는 시각을 모르는 GPU뿐) head가 쓸 수 있는 capacity는 남는 GPU가 없는
+                    # 것으로 처리해, 뒤의 작업이 GPU를 가져가 head가 계속 기다리는 일이 없도록 함
+                    memory = required_memory(job)
+                    extra = {capacity: 0 for capacity in free_by_capacity if capacity >= memory}
+                reserved = True
+                continue
+        else:
+            if gpu_ids is None:
+                continue
+            runtime = estimated_runtime(job)
+            ends_before_shadow = shadow_time is not None and runtime is not None and now + runtime <= shadow_time
+            if not ends_before_shadow:
+                capacity_of = {gpu_id: capacity for capacity, ids in free_by_capacity.items() for gpu_id in ids}
+                used: Dict[int, int] = {}
+                for gpu_id in gpu_ids:
+                    used[capacity_of[gpu_id]] = used.get(capacity_of[gpu_id], 0) + 1
+                # head가 쓸 수 있는 capacity의 GPU는 extra 범위 안에서만 사용 가능
+                if any(capacity in extra and count > extra[capacity] for capacity, count in used.items()):
+                    continue
+                for capacity, count in used.items():
+                    if capacity in extra:
+                        extra[capacity] -= count
+
+        _take_gpus(free_by_capacity, gpu_ids)
+        placements.append((job, gpu_ids))
+    return placements
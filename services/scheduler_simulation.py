@@ -0,0 +1,104 @@
+"""스케줄링 정책 시뮬레이션.
+
+실제 GPU 풀(24GB 6개, 8GB 12개)에서 작업 도착/종료를 시간 순으로 재현해 정책(scheduler_policy의
+plan 함수)을 비교한다. DB에 접근하지 않으며 benchmarks/backfill_sim.py와 tests/test_scheduler_policy.py가
+같은 시나리오 함수를 사용한다. 시각은 START부터의 분 단위로 다룬다.
+"""
+import heapq
+import random
+import statistics
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from services.scheduler_policy import plan_placements, required_count
+
+# database_init.create_initial_gpus와 같은 구성
+GPUS = [{"_id": i, "capacity": 24} for i in range(1, 7)] + [{"_id": i, "capacity": 8} for i in range(7, 19)]
+
+START = datetime(2025, 1, 1)
+
+def at(minutes: float) -> datetime:
+    return START + timedelta(minutes=minutes)
+
+def make_job(job_id: int, arrival: float, runtime: float, estimate, memory=None, count=1, same=False) -> dict:
+    return {"_id": job_id, "requested_at": at(arrival).isoformat(), "arrival": arrival, "runtime": runtime,
+            "estimatedRuntime": estimate, "gpuMemory": memory, "gpuCount": count, "sameCapacity": same}
+
+def make_workload(job_count: int, seed: int) -> List[dict]:
+    """1~2 GPU 작업 80%, 4~12 GPU 작업 20%. 예상 실행 시간은 실제의 1~2배 (10%는 미입력)"""
+    rng = random.Random(seed)
+    jobs = []
+    now = 0.0
+    for job_id in range(1, job_count + 1):
+        now += rng.expovariate(1 / 20.0)   # 평균 20분 간격 도착
+        if rng.random() < 0.2:
+            count, memory, runtime = rng.choice([4, 6, 8, 12]), rng.choice([None, 24]), rng.uniform(60, 240)
+        else:
+            count, memory, runtime = rng.choice([1, 1, 2]), rng.choice([None, 8, 24]), rng.uniform(10, 120)
+        if memory == 24:
+            count = min(count, 6)
+        estimate = None if rng.random() < 0.1 else int(runtime * rng.uniform(1.0, 2.0)) + 1
+        jobs.append(make_job(job_id, now, runtime, estimate, memory, count))
+    return jobs
+
+def fifo_plan(pending: List[dict], free: List[dict], busy: List[dict], now: datetime):
+    return plan_placements(pending, free, now=now)
+
+def simulate(jobs: List[dict], plan: Callable) -> Tuple[Dict[str, float], Dict[int, float]]:
+    """반환값: (요약 지표, 작업별 시작 시각(분))"""
+    arrivals = sorted(jobs, key=lambda job: job["arrival"])
+    capacity_of = {gpu["_id"]: gpu["capacity"] for gpu in GPUS}
+    free = set(capacity_of)
+    running: Dict[int, dict] = {}               # GPU ID -> 작업
+    started_at: Dict[int, float] = {}
+    pending: List[dict] = []
+    completions: List[Tuple[float, int]] = []   # (종료 시각, 작업 ID)
+    jobs_by_id = {job["_id"]: job for job in jobs}
+    busy_time = 0.0
+    now = 0.0
+    next_arrival = 0
+
+    while next_arrival < len(arrivals) or pending or completions:
+        candidates = []
+        if next_arrival < len(arrivals):
+            candidates.append(arrivals[next_arrival]["arrival"])
+        if completions:
+            candidates.append(completions[0][0])
+        if not candidates:
+            raise RuntimeError(f"배정할 수 없는 작업이 남았습니다: {[job['_id'] for job in pending]}")
+        now = min(candidates)
+
+        while completions and completions[0][0] <= now:
+            _, job_id = heapq.heappop(completions)
+            for gpu_id in [gpu_id for gpu_id, job in running.items() if job["_id"] == job_id]:
+                del running[gpu_id]
+                free.add(gpu_id)
+        while next_arrival < len(arrivals) and arrivals[next_arrival]["arrival"] <= now:
+            pending.append(arrivals[next_arrival])
+            next_arrival += 1
+
+        free_gpus = [{"_id": gpu_id, "capacity": capacity_of[gpu_id]} for gpu_id in free]
+        busy_gpus = [
+            {"_id": gpu_id, "capacity": capacity_of[gpu_id],
+             "endsAt": at(started_at[job["_id"]] + job["estimatedRuntime"]) if job["estimatedRuntime"] else None}
+            for gpu_id, job in running.items()
+        ]
+        for job, gpu_ids in plan(pending, free_gpus, busy_gpus, at(now)):
+            pending.remove(job)
+            for gpu_id in gpu_ids:
+                free.remove(gpu_id)
+                running[gpu_id] = job
+            started_at[job["_id"]] = now
+            busy_time += job["runtime"] * len(gpu_ids)
+            heapq.heappush(completions, (now + job["runtime"], job["_id"]))
+
+    waits = [started_at[job_id] - jobs_by_id[job_id]["arrival"] for job_id in started_at]
+    gang_waits = [started_at[job["_id"]] - job["arrival"] for job in jobs if required_count(job) >= 4]
+    summary = {
+        "makespan_h": now / 60,
+        "mean_wait_min": statistics.mean(waits),
+        "p95_wait_min": statistics.quantiles(waits, n=20)[-1],
+        "gang_mean_wait_min": statistics.mean(gang_waits) if gang_waits else 0.0,
+        "utilization": busy_time / (now * len(GPUS)),
+    }
+    return summary, started_at
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+from database_init import initialize_database
+from services.archive_service import archive_service
+from services.gpu_sampler import gpu_sampler
+from services.job_service import get_korean_time
+from services.log_index_service import log_index_service
+from services.reconciler import reconciler
+
+# 데이터베이스 초기화에 실패했을 때 다시 시도하는 간격 (초)
+STARTUP_RETRY_SECONDS = float(os.getenv('STARTUP_RETRY_SECONDS', '5'))
+
+class StartupState:
+    """서버 시작 후 백그라운드에서 데이터베이스를 초기화하고 준비 상태를 기록한다.
+
+    초기화가 끝나기 전에도 서버는 요청을 받으며, /health는 그동안 "starting"을 반환한다.
+    초기화가 끝나면 완료된 작업의 GPU 회수(reconciler), 오래된 작업의 보관 이동, GPU 상태 기록,
+    로그 색인을 시작한다.
+    """
+
+    def __init__(self, retry_seconds: float = STARTUP_RETRY_SECONDS):
+        self.retry_seconds = retry_seconds
+        self.state = "starting"
+        self.attempts = 0
+        self.ready_at: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+        self._started = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._started = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            self.attempts += 1
+            if await asyncio.to_thread(initialize_database):
+                break
+            print(f"데이터베이스 초기화 실패, {self.retry_seconds}초 후 다시 시도합니다.")
+            await asyncio.sleep(self.retry_seconds)
+
+        reconciler.start()   # 완료된 작업의 GPU 회수를 백그라운드에서 수행
+        archive_service.start()   # 종료 후 ARCHIVE_AFTER_DAYS가 지난 작업을 jobs_archive로 이동
+        gpu_sampler.start()   # GPU 풀 상태를 GPU_SAMPLE_INTERVAL_SECONDS마다 시계열로 기록
+        log_index_service.start()   # 실행 중인 작업의 로그를 LOG_INGEST_INTERVAL_SECONDS마다 검색용 세그먼트로 색인
+        self.state = "ready"
+        self.ready_at = get_korean_time().isoformat()
+        self.duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        print(f"✅ 서버 준비 완료 ({self.duration_ms}ms)")
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "attempts": self.attempts,
+            "ready_at": self.ready_at,
+            "duration_ms": self.duration_ms,
+        }
+
+startup_state = StartupState()
@@ -0,0 +1,82 @@
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from pymongo.errors import DuplicateKeyError
+
+from database import db
+
+# 사용량이 절반으로 줄어드는 시간. 최근 사용량일수록 fair-share 순서에 크게 반영됨
+USAGE_HALF_LIFE_HOURS = float(os.getenv('USAGE_HALF_LIFE_HOURS', '24'))
+
+# 다른 서버 프로세스와 동시에 갱신할 때 재시도 횟수
+USAGE_UPDATE_RETRIES = 5
+
+def decay(gpu_hours: float, updated_at: str, now: datetime, half_life_hours: float = USAGE_HALF_LIFE_HOURS) -> float:
+    """updated_at 시점의 사용량을 now 시점 값으로 감쇠"""
+    elapsed_hours = max((now - datetime.fromisoformat(updated_at)).total_seconds() / 3600, 0.0)
+    return gpu_hours * 0.5 ** (elapsed_hours / half_life_hours)
+
+def job_gpu_hours(job: dict, ended_at: datetime) -> float:
+    """작업이 started_at부터 ended_at까지 사용한 GPU 시간"""
+    if not job.get("started_at"):
+        return 0.0
+    gpu_count = len(job.get("gpuIds") or ([job["gpuId"]] if job.get("gpuId") else []))
+    elapsed_hours = (ended_at - datetime.fromisoformat(job["started_at"])).total_seconds() / 3600
+    return gpu_count * max(elapsed_hours, 0.0)
+
+class UsageService:
+    """사용자별 최근 GPU 사용량(감쇠된 GPU 시간) 집계.
+
+    작업이 GPU를 반환할 때마다 user_usage 컬렉션의 사용자 문서 하나만 갱신하므로,
+    조회 비용은 작업 이력이 아니라 조회하는 사용자 수에 비례한다.
+    문서 형태: {"_id": user, "gpuHours": 감쇠된 GPU 시간, "updated_at": 마지막 갱신 시각}
+    """
+
+    def add(self, user: str, gpu_hours: float, now: datetime):
+        if gpu_hours <= 0:
+            return
+        usage_collection = db.get_collection('user_usage')
+
+        for _ in range(USAGE_UPDATE_RETRIES):
+            current = usage_collection.find_one({"_id": user})
+            if current is None:
+                try:
+                    usage_collection.insert_one({"_id": user, "gpuHours": gpu_hours, "updated_at": now.isoformat()})
+                    return
+                except DuplicateKeyError:
+                    continue
+
+            # 읽은 값이 그대로일 때만 갱신 (다른 프로세스가 먼저 갱신했으면 다시 읽음)
+            result = usage_collection.update_one(
+                {"_id": user, "gpuHours": current["gpuHours"], "updated_at": current["updated_at"]},
+                {"$set": {"gpuHours": decay(current["gpuHours"], current["updated_at"], now) + gpu_hours,
+                          "updated_at": now.isoformat()}}
+            )
+            if result.modified_count:
+                return
+        print(f"사용자 {user}의 사용량 갱신 실패 (동시 갱신 충돌)")
+
+    def record_jobs(self, jobs: Iterable[dict], ended_at: datetime):
+        """GPU를 반환한 작업들의 사용 시간을 사용자별로 합쳐 반영"""
+        by_user: Dict[str, float] = {}
+        for job in jobs:
+            user = job.get("user") or "anonymous"
+            by_user[user] = by_user.get(user, 0.0) + job_gpu_hours(job, ended_at)
+        for user, gpu_hours in by_user.items():
+            try:
+                self.add(user, gpu_hours, ended_at)
+            except Exception as e:
+                print(f"사용자 {user}의 사용량 기록 실패: {e}")
+
+    def get_usage(self, users: List[str], now: datetime) -> Dict[str, float]:
+        """users의 현재 시점 사용량(GPU 시간). 기록이 없는 사용자는 포함하지 않음"""
+        if not users:
+            return {}
+        usage_collection = db.get_collection('user_usage')
+        return {
+            usage["_id"]: decay(usage["gpuHours"], usage["updated_at"], now)
+            for usage in usage_collection.find({"_id": {"$in": users}})
+        }
+
+usage_service = UsageService()
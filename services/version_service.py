@@ -0,0 +1,94 @@
+import hashlib
+import os
+import time
+from typing import Optional, Tuple
+
+from database import db
+
+# counters 컬렉션에서 작업/GPU 데이터 버전을 관리하는 문서의 _id
+DATA_VERSION_COUNTER = "data_version"
+
+# 서비스를 거치지 않은 변경(작업 실행기가 상태를 직접 기록 등)도 버전에 반영되도록 함께 세는 상태
+ACTIVE_JOB_STATUSES = ["pending", "running"]
+
+# 다른 서버 프로세스나 외부의 변경을 확인하기 위해 버전을 다시 읽는 주기 (초)
+# 같은 프로세스의 변경은 즉시 반영되고, 그 밖의 변경은 최대 이 시간만큼 늦게 반영된다
+DATA_VERSION_TTL_SECONDS = float(os.getenv('DATA_VERSION_TTL_SECONDS', '1'))
+
+def make_etag(version: str, *parts) -> str:
+    """데이터 버전과 요청 조건(쿼리 파라미터 등)으로 weak ETag 생성"""
+    key = "|".join("" if part is None else str(part) for part in parts)
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    # weak 비교: W/ 접두사는 무시
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    return any(candidate == '*' or candidate.removeprefix('W/') == opaque for candidate in candidates)
+
+class DataVersion:
+    """작업/GPU 데이터가 바뀔 때마다 달라지는 버전 문자열.
+
+    서비스를 거친 변경은 counters 컬렉션의 번호를 올려 여러 서버 프로세스가 같은 값을 보게 한다.
+    작업 실행기처럼 DB에 상태를 직접 쓰는 변경은 번호를 올리지 않으므로, 대기/실행 중인 작업 수와
+    사용 가능한 GPU 수를 버전에 함께 넣는다. 외부에서 작업을 끝내거나 GPU를 반환하면 이 값이 바뀐다.
+    조회는 ttl 동안 프로세스 안에 캐시하여 조건부 GET이 DB에 접근하지 않게 한다.
+
+    한계: 다른 프로세스의 bump는 최대 ttl 뒤에 보이고, 서비스를 거치지 않은 쓰기 중 위의 수를 바꾸지 않는
+    것(jobName 직접 수정 등)은 버전에 반영되지 않는다. 서비스의 쓰기 경로는 모두 bump를 호출해야 한다.
+    """
+
+    def __init__(self, ttl: float = DATA_VERSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._seq: Optional[int] = None
+        self._snapshot: Tuple[int, int] = (0, 0)
+        self._checked_at = 0.0
+
+    def _store(self, counter: Optional[dict], active_jobs: int, available_gpus: int):
+        # 다른 프로세스에서 읽은 번호가 더 작더라도 번호는 되돌리지 않음
+        seq = counter["seq"] if counter else 0
+        if self._seq is None or seq > self._seq:
+            self._seq = seq
+        self._snapshot = (active_jobs, available_gpus)
+        self._checked_at = time.monotonic()
+
+    def _is_fresh(self) -> bool:
+        return self._seq is not None and time.monotonic() - self._checked_at < self.ttl
+
+    def _version(self) -> str:
+        return f"{self._seq}.{self._snapshot[0]}.{self._snapshot[1]}"
+
+    def bump(self):
+        """작업/GPU 데이터를 변경한 뒤 호출"""
+        try:
+            db.get_collection('counters').update_one(
+                {"_id": DATA_VERSION_COUNTER},
+                {"$inc": {"seq": 1}},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"데이터 버전 갱신 실패: {e}")
+        # 다음 조회에서 번호와 작업/GPU 수를 다시 읽음
+        self._checked_at = 0.0
+
+    def current(self) -> str:
+        if not self._is_fresh():
+            counter = db.get_collection('counters').find_one({"_id": DATA_VERSION_COUNTER})
+            active_jobs = db.get_collection('jobs').count_documents({"status": {"$in": ACTIVE_JOB_STATUSES}})
+            available_gpus = db.get_collection('gpus').count_documents({"isAvailable": True})
+            self._store(counter, active_jobs, available_gpus)
+        return self._version()
+
+    async def current_async(self) -> str:
+        if not self._is_fresh():
+            counter = await db.get_async_collection('counters').find_one({"_id": DATA_VERSION_COUNTER})
+            active_jobs = await db.get_async_collection('jobs').count_documents(
+                {"status": {"$in": ACTIVE_JOB_STATUSES}})
+            available_gpus = await db.get_async_collection('gpus').count_documents({"isAvailable": True})
+            self._store(counter, active_jobs, available_gpus)
+        return self._version()
+
+data_version = DataVersion()
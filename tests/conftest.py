@@ -0,0 +1,30 @@
+import os
+import uuid
+
+import pytest
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """MONGO_URI 서버에 테스트마다 새 데이터베이스를 만들어 초기화하고, 끝나면 삭제한다.
+
+    MONGO_URI가 없으면 테스트를 건너뛴다.
+    """
+    if not os.getenv('MONGO_URI'):
+        pytest.skip("MONGO_URI가 설정되지 않아 MongoDB가 필요한 테스트를 건너뜁니다.")
+    from database import db
+    from database_init import initialize_database
+    from services.gpu_service import gpu_service
+
+    monkeypatch.setenv('MONGO_DATABASE', f"gpu_dashboard_test_{uuid.uuid4().hex[:12]}")
+    db.close()
+    db._mongo_uri = None   # 다음 사용 시 위 데이터베이스로 다시 접속
+    assert initialize_database(), "MONGO_URI 서버에 접속할 수 없습니다."
+    gpu_service.invalidate()
+    yield db
+    db.client.drop_database(db.db.name)
+    db.close()
+    db._mongo_uri = None
+    # async 클라이언트는 테스트의 이벤트 루프에 묶여 있으므로 다음 테스트가 새로 만들도록 버림
+    db.async_client = None
+    db.async_db = None
+    gpu_service.invalidate()
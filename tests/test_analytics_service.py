@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from urllib.parse import unquote
+
+import pytest
+
+from models import KST
+from services.analytics_service import (WAIT_BUCKETS, AnalyticsService, field_key, histogram_index,
+                                        histogram_percentile, inferred_capacity, split_by_bucket)
+
+CAPACITY_TOTALS = {24: 6, 8: 12}
+
+def test_split_by_bucket_covers_the_interval_exactly():
+    start = datetime(2025, 1, 1, 22, 30, tzinfo=KST)
+    end = datetime(2025, 1, 2, 1, 15, tzinfo=KST)
+    assert split_by_bucket(start, end, "hour") == [
+        (datetime(2025, 1, 1, 22, tzinfo=KST), 0.5),
+        (datetime(2025, 1, 1, 23, tzinfo=KST), 1.0),
+        (datetime(2025, 1, 2, 0, tzinfo=KST), 1.0),
+        (datetime(2025, 1, 2, 1, tzinfo=KST), 0.25),
+    ]
+    assert split_by_bucket(start, end, "day") == [
+        (datetime(2025, 1, 1, tzinfo=KST), 1.5),
+        (datetime(2025, 1, 2, tzinfo=KST), 1.25),
+    ]
+    assert split_by_bucket(start, start, "hour") == []
+
+def test_histogram_percentile_interpolates_within_buckets():
+    counts = [0] * (len(WAIT_BUCKETS) + 1)
+    for seconds in (1, 2, 3, 4, 20, 20, 40, 50, 100, 100000):
+        counts[histogram_index(seconds, WAIT_BUCKETS)] += 1
+    assert counts[0] == 4 and counts[-1] == 1
+    assert histogram_percentile(counts, WAIT_BUCKETS, 0.4) == pytest.approx(5.0)      # 0~5초 구간의 끝
+    assert histogram_percentile(counts, WAIT_BUCKETS, 0.5) == pytest.approx(22.5)     # 15~30초 구간 안 선형 보간
+    assert histogram_percentile(counts, WAIT_BUCKETS, 1.0) == float(WAIT_BUCKETS[-1])  # 마지막 구간은 하한값
+    assert histogram_percentile([0] * len(counts), WAIT_BUCKETS, 0.5) is None
+
+def test_field_key_round_trips_through_unquote():
+    for user in ("alice", "a.b", "$root", "100%", "%2E"):
+        key = field_key(user)
+        assert "." not in key and "$" not in key
+        assert unquote(key) == user
+
+def test_inferred_capacity_only_when_requirements_allow_one_capacity():
+    assert inferred_capacity({"gpuMemory": 24}, CAPACITY_TOTALS) == 24
+    assert inferred_capacity({"gpuMemory": 12}, CAPACITY_TOTALS) == 24
+    assert inferred_capacity({"gpuMemory": 8}, CAPACITY_TOTALS) is None   # best-fit이 24GB에 배정했을 수도 있음
+    assert inferred_capacity({}, CAPACITY_TOTALS) is None
+    # 같은 capacity로 10개는 8GB(12개)에서만 가능
+    assert inferred_capacity({"gpuCount": 10, "sameCapacity": True}, CAPACITY_TOTALS) == 8
+    assert inferred_capacity({"gpuCount": 10}, CAPACITY_TOTALS) is None
+
+def test_summarize_leaves_unknown_hours_out_of_utilization():
+    rollups = [{"gpuHours": {"24": 3.0, "unknown": 2.0}, "userGpuHours": {field_key("a.b"): 5.0}}]
+    summary = AnalyticsService().summarize(rollups, 1.0, CAPACITY_TOTALS)
+    assert summary["gpuHours"] == {"24": 3.0}
+    assert summary["unknownGpuHours"] == 2.0
+    assert summary["utilization"] == {"24": 0.5, "8": 0.0}
+    assert summary["userGpuHours"] == {"a.b": 5.0}
+
+def test_rebuild_maps_released_jobs_to_a_capacity(mongo_db):
+    started = datetime(2025, 1, 1, 9, tzinfo=KST)
+    job = {"status": "completed", "user": "alice", "requested_at": (started - timedelta(minutes=1)).isoformat(),
+           "started_at": started.isoformat(), "completed_at": (started + timedelta(hours=2)).isoformat()}
+    mongo_db.get_collection('jobs').insert_many([
+        {**job, "_id": 1, "gpuMemory": 24, "gpuCount": 2},   # GPU ID가 지워졌지만 24GB만 가능
+        {**job, "_id": 2, "gpuMemory": 8},                    # 8GB/24GB 어느 쪽인지 알 수 없음
+    ])
+
+    service = AnalyticsService()
+    service.rebuild()
+    # 종료는 11시 구간에 집계되므로 11시 구간까지 포함한 3시간을 조회
+    totals = service.get_analytics(started, started + timedelta(hours=3), "hour", CAPACITY_TOTALS)["totals"]
+    assert totals["gpuHours"] == {"24": 4.0}
+    assert totals["unknownGpuHours"] == 2.0
+    assert totals["utilization"]["24"] == round(4.0 / (6 * 3), 4)
+    assert totals["userGpuHours"] == {"alice": 6.0}
+    assert (totals["jobsStarted"], totals["jobsFinished"]) == (2, 2)
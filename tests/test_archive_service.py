@@ -0,0 +1,37 @@
+import services.archive_service as archive_module
+from services.archive_service import ArchiveService
+
+def finished_job(job_id: int) -> dict:
+    return {"_id": job_id, "status": "completed", "jobName": f"job-{job_id}", "projectPath": "/p", "venvPath": "/v",
+            "mainFile": "main.py", "user": "alice", "gpuId": None,
+            "requested_at": "2025-01-01T09:00:00+09:00", "completed_at": "2025-01-01T10:00:00+09:00"}
+
+def test_archive_keeps_only_jobs_this_batch_deleted(mongo_db, monkeypatch):
+    jobs_collection = mongo_db.get_collection('jobs')
+    jobs_collection.insert_many([finished_job(job_id) for job_id in range(1, 6)])
+
+    # 보관본을 쓰는 사이에 사용자가 작업 2를 삭제하고, 작업 3은 다시 실행됨
+    pack_job = archive_module.pack_job
+
+    def pack_during_changes(job, archived_at, compress):
+        if job["_id"] == 1:
+            jobs_collection.delete_one({"_id": 2})
+            jobs_collection.update_one({"_id": 3}, {"$set": {"status": "running", "gpuId": 1}})
+        return pack_job(job, archived_at, compress)
+
+    monkeypatch.setattr(archive_module, "pack_job", pack_during_changes)
+    archived_count = ArchiveService(batch_size=10).archive_batch("2025-02-01T00:00:00+09:00")
+
+    assert archived_count == 3
+    assert sorted(job["_id"] for job in mongo_db.get_collection('jobs_archive').find()) == [1, 4, 5]
+    assert [job["_id"] for job in jobs_collection.find()] == [3]
+
+def test_archived_jobs_round_trip_compressed(mongo_db):
+    mongo_db.get_collection('jobs').insert_many([finished_job(job_id) for job_id in range(1, 4)])
+    service = ArchiveService(batch_size=2, compress=True)
+
+    assert service.archive_batch("2025-02-01T00:00:00+09:00") == 2
+    assert service.archive_batch("2025-02-01T00:00:00+09:00") == 1
+    assert service.archive_batch("2025-02-01T00:00:00+09:00") == 0
+    assert service.get_job(2) == finished_job(2)
+    assert service.delete_job(2) and service.get_job(2) is None
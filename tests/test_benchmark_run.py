@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from benchmarks.run import compare, percentile, run_scenario
+
+def test_percentile_is_nearest_rank():
+    values = [value / 1000 for value in range(1, 101)]
+    assert [percentile(values, fraction) for fraction in (0.5, 0.95, 0.99, 1.0)] == [0.05, 0.095, 0.099, 0.1]
+    assert percentile([0.2], 0.99) == 0.2
+    assert percentile([], 0.95) == 0.0
+
+def test_compare_flags_only_changes_beyond_tolerance():
+    baseline = {"scenarios": {
+        "list_jobs": {"p95_ms": 10.0, "throughput_rps": 1000.0},
+        "get_gpus": {"p95_ms": 5.0, "throughput_rps": 2000.0},
+    }}
+    results = {
+        "list_jobs": {"p95_ms": 12.5, "throughput_rps": 790.0},   # p95 +25%, 처리량 -21%
+        "get_gpus": {"p95_ms": 5.9, "throughput_rps": 1700.0},    # 허용 범위 안
+        "poll": {"p95_ms": 100.0, "throughput_rps": 1.0},         # 기준 결과에 없는 시나리오
+    }
+    assert compare(results, baseline, 0.2) == [
+        "list_jobs: p95 10.00 -> 12.50 ms",
+        "list_jobs: throughput 1000.0 -> 790.0 rps",
+    ]
+    assert compare(results, baseline, 0.3) == []
+
+def test_run_scenario_sends_every_request_once():
+    app = FastAPI()
+    seen = []
+
+    @app.get("/item/{item_id}")
+    async def item(item_id: int):
+        seen.append(item_id)
+        if item_id % 10 == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            return await run_scenario(client, lambda rng: ("GET", f"/item/{rng.randint(1, 100)}", {}), 250, 8)
+
+    result = asyncio.run(run())
+    assert result["requests"] == len(seen) == 250
+    assert result["errors"] == sum(1 for item_id in seen if item_id % 10 == 0)
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
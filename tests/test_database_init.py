@@ -0,0 +1,26 @@
+import pytest
+
+import database_init
+from database_init import get_next_job_id, initialize_database
+
+def test_counter_starts_after_existing_jobs(mongo_db):
+    mongo_db.get_collection('jobs').insert_many([{"_id": 5}, {"_id": 9}])
+    mongo_db.get_collection('counters').delete_many({})
+
+    assert initialize_database()
+    assert [get_next_job_id(), get_next_job_id()] == [10, 11]
+    # 재시작해도 카운터가 뒤로 가지 않음
+    assert initialize_database() and get_next_job_id() == 12
+
+def test_counter_failure_fails_initialization(mongo_db, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("counter update failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(database_init.db, "get_collection", fail)
+        with pytest.raises(RuntimeError):
+            database_init.init_job_id_counter()
+
+    # 카운터를 맞추지 못하면 False를 반환해 startup이 다시 시도함
+    monkeypatch.setattr(database_init, "init_job_id_counter", fail)
+    assert initialize_database() is False
@@ -0,0 +1,82 @@
+import random
+import threading
+from collections import Counter
+
+from database_init import INITIAL_GPUS
+from services.gpu_allocator import gpu_allocator
+from services.job_service import JobService
+
+GPU_COUNT = sum(len(gpu_ids) for gpu_ids, _ in INITIAL_GPUS)
+
+def run_threads(target, count: int):
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def run(index):
+        barrier.wait()
+        try:
+            target(index)
+        except Exception as e:   # 스레드 안의 실패를 테스트 실패로 전달
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+
+def assert_no_double_assignment(db):
+    running = list(db.get_collection('jobs').find({"status": "running"}, {"gpuIds": 1}))
+    held = Counter(gpu_id for job in running for gpu_id in job["gpuIds"])
+    assert all(count == 1 for count in held.values()), held
+    busy = {gpu["_id"]: gpu.get("jobId") for gpu in db.get_collection('gpus').find({"isAvailable": False})}
+    # 실행 중인 작업의 GPU는 모두 사용 중이고 그 작업을 기록하며, 주인 없이 사용 중인 GPU도 없음
+    assert busy == {gpu_id: job["_id"] for job in running for gpu_id in job["gpuIds"]}
+    return running
+
+def test_concurrent_claims_are_exclusive(mongo_db):
+    claimed = {}
+    lock = threading.Lock()
+    gpu_ids = list(range(1, GPU_COUNT + 1))
+
+    def claim(index):
+        rng = random.Random(index)
+        for attempt in range(20):
+            job_id = index * 100 + attempt
+            for gpu_id in gpu_allocator.claim({gpu_id: job_id for gpu_id in rng.sample(gpu_ids, 3)}):
+                with lock:
+                    assert gpu_id not in claimed, f"GPU {gpu_id} 중복 배정"
+                    claimed[gpu_id] = job_id
+
+    run_threads(claim, 16)
+    assert sorted(claimed) == gpu_ids
+    stored = {gpu["_id"]: gpu["jobId"] for gpu in mongo_db.get_collection('gpus').find()}
+    assert stored == claimed
+
+def test_parallel_scheduling_never_double_assigns_gpus(mongo_db):
+    rng = random.Random(0)
+    mongo_db.get_collection('jobs').insert_many([
+        {"_id": job_id, "status": "pending", "jobName": f"job-{job_id}", "projectPath": "/p", "venvPath": "/v",
+         "mainFile": "main.py", "user": f"user{job_id % 5}", "gpuId": None,
+         "gpuMemory": rng.choice([None, 8, 24]), "gpuCount": rng.choice([1, 1, 1, 2]), "sameCapacity": False,
+         "requested_at": f"2025-01-01T09:{job_id // 60:02d}:{job_id % 60:02d}+09:00"}
+        for job_id in range(1, 121)
+    ])
+    # 서버 프로세스마다 JobService가 하나씩 있는 것처럼 인스턴스를 따로 만들어 동시에 스케줄링
+    services = [JobService() for _ in range(8)]
+
+    def schedule_and_finish(index):
+        service = services[index]
+        for _ in range(10):
+            service.schedule_pending_jobs()
+            finished = mongo_db.get_collection('jobs').find_one_and_update(
+                {"status": "running", "user": f"user{index % 5}"}, {"$set": {"status": "completed"}}
+            )
+            if finished:
+                service.release_completed_jobs()
+
+    run_threads(schedule_and_finish, len(services))
+    services[0].release_completed_jobs()
+    running = assert_no_double_assignment(mongo_db)
+    assert running
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from models import KST
+from services.gpu_sampler import (MAX_SERIES_POINTS, SAMPLE_FIELDS, SAMPLE_TIERS, GpuSampler, bucket_update,
+                                  floor_time, select_tier, to_series)
+
+NOW = datetime(2025, 6, 1, 12, 0, tzinfo=KST)
+
+def tier_name(start: datetime, end: datetime) -> str:
+    return select_tier(start, end, NOW)["name"]
+
+def test_select_tier_picks_the_finest_tier_that_fits():
+    assert tier_name(NOW - timedelta(hours=1), NOW) == "10s"
+    # 10초 해상도로 6시간은 2,160점이라 MAX_SERIES_POINTS를 넘음
+    assert MAX_SERIES_POINTS < timedelta(hours=6) / timedelta(seconds=10)
+    assert tier_name(NOW - timedelta(hours=6), NOW) == "1m"
+    # 10초 보관 기간(6시간)보다 오래된 구간은 짧아도 1분 해상도
+    assert tier_name(NOW - timedelta(hours=7), NOW - timedelta(hours=6, minutes=50)) == "1m"
+    assert tier_name(NOW - timedelta(days=30), NOW) == "1h"
+    assert tier_name(NOW - timedelta(days=400), NOW) == SAMPLE_TIERS[-1]["name"]
+
+def test_floor_time_rounds_down_in_utc():
+    moment = datetime(2025, 6, 1, 9, 30, 47, 500000, tzinfo=KST)   # 00:30:47.5 UTC
+    assert floor_time(moment, timedelta(seconds=10)) == datetime(2025, 6, 1, 0, 30, 40)
+    assert floor_time(moment, timedelta(minutes=1)) == datetime(2025, 6, 1, 0, 30)
+    assert floor_time(moment, timedelta(hours=1)) == datetime(2025, 6, 1, 0, 0)
+    assert floor_time(moment, timedelta(hours=1)).tzinfo is None
+
+def test_bucket_documents_become_column_series():
+    first = {"available24": 2, "active24": 4, "available8": 12, "active8": 0, "queue": 3}
+    second = {**first, "available24": 0, "active24": 6, "queue": 5}
+    # bucket_update를 두 번 적용한 구간 문서
+    update = bucket_update(first)
+    assert update["$inc"]["count"] == 1 and update["$min"]["min.queue"] == 3
+    document = {"_id": datetime(2025, 6, 1, 0, 30), "count": 2,
+                "sum": {field: first[field] + second[field] for field in SAMPLE_FIELDS},
+                "min": {field: min(first[field], second[field]) for field in SAMPLE_FIELDS},
+                "max": {field: max(first[field], second[field]) for field in SAMPLE_FIELDS}}
+
+    result = to_series([document])
+    assert result["timestamps"] == [datetime(2025, 6, 1, 9, 30, tzinfo=KST).isoformat()]
+    assert result["series"]["queue"] == {"avg": [4.0], "min": [3], "max": [5]}
+    assert result["series"]["available24"] == {"avg": [1.0], "min": [0], "max": [2]}
+    assert to_series([]) == {"timestamps": [], "series": {field: {"avg": [], "min": [], "max": []}
+                                                          for field in SAMPLE_FIELDS}}
+
+def test_samples_are_merged_into_every_tier(mongo_db):
+    async def sample_and_read():
+        sampler = GpuSampler()
+        await sampler.sample_once()
+        await sampler.sample_once()
+        now = datetime.now(timezone.utc)
+        history = {tier["name"]: await sampler.get_history_async(now - timedelta(minutes=1), now, tier["name"])
+                   for tier in SAMPLE_TIERS}
+        await mongo_db.close_async()
+        return sampler, history
+
+    sampler, history = asyncio.run(sample_and_read())
+    assert sampler.sample_count == 2
+    for tier in SAMPLE_TIERS:
+        # 두 샘플이 서로 다른 10초 구간에 들어갔을 수 있으므로 구간 수가 아니라 샘플 수 합계로 확인
+        documents = list(mongo_db.get_collection(tier["collection"]).find())
+        assert sum(document["count"] for document in documents) == 2, tier["name"]
+        result = history[tier["name"]]
+        assert result["interval_seconds"] == int(tier["step"].total_seconds())
+        assert set(result["series"]["available24"]["min"]) == {6}   # GPU가 모두 비어 있음
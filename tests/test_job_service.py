@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import jobs
+from models import get_korean_time
+from services.job_service import JobService
+from services.version_service import DataVersion
+
+JOB_BODY = {"jobName": "train", "projectPath": "/p", "venvPath": "/v", "mainFile": "main.py"}
+
+def make_client():
+    app = FastAPI()
+    app.include_router(jobs.router)
+    return TestClient(app)
+
+def test_job_owner_is_the_route_user(mongo_db):
+    client = make_client()
+    # 본문의 user와 관계없이 경로의 사용자가 소유자
+    created = client.post("/user/alice/jobs/", json={**JOB_BODY, "user": "mallory"}).json()["data"]
+    assert created["user"] == "alice"
+    assert client.post("/user/bob/jobs/", json=JOB_BODY).json()["data"]["user"] == "bob"
+
+    # 수정 요청의 user로 소유자가 바뀌지 않음
+    updated = client.put("/user/alice/jobs/", params={"job_id": created["_id"]},
+                         json={**JOB_BODY, "jobName": "renamed", "user": "mallory"}).json()["data"]
+    assert (updated["jobName"], updated["user"]) == ("renamed", "alice")
+
+def test_fair_share_reads_a_bounded_slice_per_user(mongo_db):
+    # 빈 GPU(18개)보다 훨씬 많은 작업을 먼저 요청한 사용자가 있어도 다른 사용자의 작업이 계획에 포함됨
+    jobs_collection = mongo_db.get_collection('jobs')
+    jobs_collection.insert_many(
+        [{"_id": i, "status": "pending", "user": "heavy", "requested_at": f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}",
+          **JOB_BODY} for i in range(1, 101)]
+        + [{"_id": 1000 + i, "status": "pending", "user": "light", "requested_at": f"2025-01-01T02:00:0{i}",
+            **JOB_BODY} for i in range(2)]
+    )
+    free_gpus = list(mongo_db.get_collection('gpus').find({"isAvailable": True}, {"capacity": 1}))
+
+    plan = JobService()._plan_fair_share(free_gpus, get_korean_time())
+    placed = [job["_id"] for job, _ in plan]
+    assert {1000, 1001} <= set(placed)
+    assert len(placed) == len(free_gpus)
+    assert len({gpu_id for _, gpu_ids in plan for gpu_id in gpu_ids}) == len(free_gpus)
+
+def test_data_version_changes_on_outside_status_writes(mongo_db):
+    version = DataVersion(ttl=0)
+    client = make_client()
+    created = client.post("/user/alice/jobs/", json=JOB_BODY).json()["data"]
+    before = version.current()
+
+    # 작업 실행기가 서비스를 거치지 않고 상태와 GPU를 직접 기록
+    mongo_db.get_collection('jobs').update_one({"_id": created["_id"]}, {"$set": {"status": "completed"}})
+    assert version.current() != before
+    after_status = version.current()
+    mongo_db.get_collection('gpus').update_many({"_id": {"$in": created["gpuIds"]}},
+                                                {"$set": {"isAvailable": True}})
+    assert version.current() != after_status
+
+def test_data_version_covers_service_writes_that_keep_the_counts(mongo_db):
+    version = DataVersion(ttl=0)
+    cached = DataVersion(ttl=60)   # 다른 서버 프로세스의 캐시
+    client = make_client()
+    created = client.post("/user/alice/jobs/", json=JOB_BODY).json()["data"]
+    before = version.current()
+    cached_before = cached.current()
+
+    # 이름만 바꾸는 수정은 작업/GPU 수를 바꾸지 않지만 서비스가 번호를 올림
+    renamed = client.put(f"/user/alice/jobs/?job_id={created['_id']}", json={**JOB_BODY, "jobName": "renamed"})
+    assert renamed.status_code == 200
+    assert version.current() != before
+    # 다른 프로세스는 ttl이 지날 때까지 이전 버전을 보고, 지나면 따라잡음
+    assert cached.current() == cached_before
+    cached._checked_at = 0.0
+    assert cached.current() == version.current()
+
+    # 서비스를 거치지 않은 이름 변경은 문서화한 대로 버전에 반영되지 않음
+    after_rename = version.current()
+    mongo_db.get_collection('jobs').update_one({"_id": created["_id"]}, {"$set": {"jobName": "outside"}})
+    assert version.current() == after_rename
+
+def running_job_read_by_two_releasers(mongo_db, client):
+    """GPU를 보유한 작업을 1시간 전에 시작한 것으로 바꾸고, 두 해제 경로가 각각 읽은 작업 문서를 반환"""
+    created = client.post("/user/alice/jobs/", json={**JOB_BODY, "gpuCount": 2}).json()["data"]
+    jobs_collection = mongo_db.get_collection('jobs')
+    started_at = (get_korean_time() - timedelta(hours=1)).isoformat()
+    jobs_collection.update_one({"_id": created["_id"]}, {"$set": {"status": "completed", "started_at": started_at}})
+    job = jobs_collection.find_one({"_id": created["_id"]})
+    return job, dict(job)
+
+def test_overlapping_releases_record_usage_once(mongo_db):
+    service = JobService()
+    released_events = []
+    service.add_listener(lambda event, job_id, **data: released_events.append(job_id) if event == "released" else None)
+    job, stale_copy = running_job_read_by_two_releasers(mongo_db, make_client())
+
+    assert sorted(service._release_jobs([job])) == sorted(job["gpuIds"])
+    assert service._release_jobs([stale_copy]) == []   # 이미 해제된 작업을 늦게 읽은 reconciler 등
+
+    usage = mongo_db.get_collection('user_usage').find_one({"_id": "alice"})
+    assert usage["gpuHours"] == pytest.approx(2.0, rel=0.01)
+    assert released_events == [job["_id"]]
+    assert mongo_db.get_collection('gpus').count_documents({"isAvailable": False}) == 0
+
+def test_overlapping_releases_roll_up_once(mongo_db):
+    service = JobService()
+    client = make_client()
+    first, _ = running_job_read_by_two_releasers(mongo_db, client)
+    second, stale_second = running_job_read_by_two_releasers(mongo_db, client)
+    service._release_jobs([second])
+    # 한 번의 해제 호출에 아직 해제되지 않은 작업과 이미 해제된 작업이 섞여 있음
+    service._release_jobs([first, stale_second])
+
+    rollups = list(mongo_db.get_collection('job_rollups').find({"granularity": "day"}))
+    assert sum(rollup.get("jobsFinished", 0) for rollup in rollups) == 2
+    gpu_hours = sum(value for rollup in rollups for value in rollup.get("gpuHours", {}).values())
+    assert gpu_hours == pytest.approx(4.0, rel=0.01)
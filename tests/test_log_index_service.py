@@ -0,0 +1,59 @@
+import random
+
+from services.log_index_service import LineMatcher, LogIndexService, build_segment, parse_entries
+
+START_OFFSET = 1000
+
+def make_segment(lines):
+    raw = "".join(line + "\n" for line in lines).encode()
+    return build_segment(1, 0, START_OFFSET, 0, parse_entries(raw, None, None), raw), raw
+
+def search_segment(segment, level=None, start=None, end=None, after=0, limit=10_000):
+    matcher = LineMatcher(level, start, end, after, limit)
+    LogIndexService()._search_segment(segment, matcher)
+    return matcher.lines
+
+def full_scan(raw, level=None, start=None, end=None, after=0, limit=10_000):
+    """색인 없이 모든 줄을 차례로 확인한 결과"""
+    matcher = LineMatcher(level, start, end, after, limit)
+    for line_number, (position, text, ts, line_level) in enumerate(parse_entries(raw, None, None)):
+        if matcher.add(START_OFFSET + position, line_number, text, ts, line_level):
+            break
+    return matcher.lines
+
+def test_lines_sharing_the_start_second_across_index_points():
+    # 색인 지점(64줄마다) 여러 개가 start와 같은 시각이어도 그 시각의 줄을 모두 찾아야 함
+    lines = [f"2025-01-01 00:00:00 [INFO] before {i}" for i in range(10)]
+    lines += [f"2025-01-01 00:00:05 [INFO] at start {i}" for i in range(190)]
+    segment, raw = make_segment(lines)
+
+    found = search_segment(segment, start="2025-01-01 00:00:05")
+    assert len(found) == 190
+    assert found == full_scan(raw, start="2025-01-01 00:00:05")
+
+def test_segment_search_matches_full_scan():
+    rng = random.Random(7)
+    for _ in range(30):
+        lines = []
+        second = 0
+        for i in range(rng.randint(1, 600)):
+            second += rng.choice((0, 0, 0, 1, 2))
+            if rng.random() < 0.1:
+                lines.append(f"    traceback line {i}")   # 형식이 다른 줄은 앞 줄의 시각/레벨을 따름
+            else:
+                level = rng.choice(("INFO", "INFO", "WARNING", "ERROR"))
+                lines.append(f"2025-01-01 00:{second // 60:02d}:{second % 60:02d} [{level}] message {i}")
+        segment, raw = make_segment(lines)
+
+        for _ in range(10):
+            low, high = sorted(rng.randint(0, second + 1) for _ in range(2))
+            conditions = {
+                "level": rng.choice((None, "INFO", "ERROR")),
+                "start": rng.choice((None, f"2025-01-01 00:{low // 60:02d}:{low % 60:02d}")),
+                "end": rng.choice((None, f"2025-01-01 00:{high // 60:02d}:{high % 60:02d}")),
+                "after": rng.choice((0, START_OFFSET + rng.randint(0, len(raw)))),
+                "limit": rng.choice((5, 10_000)),
+            }
+            if conditions["level"] and conditions["level"] not in segment["levels"]:
+                continue   # search()는 해당 레벨이 없는 세그먼트를 조회하지 않음
+            assert search_segment(segment, **conditions) == full_scan(raw, **conditions), conditions
@@ -0,0 +1,30 @@
+from pymongo import monitoring
+
+import services.job_service as job_module
+from benchmarks.query_plans import CommandRecorder, exercise, explain_commands, seed
+
+JOB_COUNT = 5000
+
+def test_service_queries_use_indexes(mongo_db, monkeypatch):
+    # exercise가 정책을 바꿔 가며 스케줄링하므로 테스트 후 원래 정책으로 되돌림
+    monkeypatch.setattr(job_module, "SCHEDULER_POLICY", job_module.SCHEDULER_POLICY)
+    recorder = CommandRecorder(mongo_db.db.name)
+    monitoring.register(recorder)
+    try:
+        mongo_db.close()
+        mongo_db._mongo_uri = None   # listener는 등록 이후 만든 클라이언트에만 적용되므로 다시 접속
+
+        seed(JOB_COUNT)
+        recorder.enabled = True
+        try:
+            exercise()
+        finally:
+            recorder.enabled = False
+    finally:
+        # pymongo에는 등록 해제 API가 없으므로 직접 제거해 다음 테스트의 클라이언트에 listener가 쌓이지 않게 함
+        monitoring._LISTENERS.command_listeners.remove(recorder)
+
+    assert recorder.commands, "수집한 명령이 없습니다."
+    failures = [f"{result['source']} {result['name']} {result['collection']}: {' > '.join(result['stages'])}"
+                for result in explain_commands(mongo_db.db, recorder.commands) if result["bad"]]
+    assert not failures, "\n".join(failures)
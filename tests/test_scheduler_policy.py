@@ -0,0 +1,83 @@
+from services.scheduler_policy import _reservation, group_free_gpus, plan_backfill
+from services.scheduler_simulation import at, fifo_plan, make_job, make_workload, simulate
+
+# 24GB 6개 중 2개만 비어 있고 4개는 60분 뒤 끝나는 작업에 사용 중, 8GB 12개는 모두 사용 중 (끝나는 시각 미상)
+FREE = [{"_id": i, "capacity": 24} for i in (5, 6)]
+BUSY = ([{"_id": i, "capacity": 24, "endsAt": at(60)} for i in (1, 2, 3, 4)]
+        + [{"_id": i, "capacity": 8, "endsAt": None} for i in range(7, 19)])
+
+def placed_ids(pending_jobs, free=FREE, busy=BUSY, now=at(0)):
+    return [job["_id"] for job, _ in plan_backfill(pending_jobs, free, busy, now)]
+
+def test_only_jobs_finishing_before_reservation_jump_ahead():
+    head = make_job(1, 0, 100, 100, memory=24, count=6)
+    short = make_job(2, 1, 30, 30, memory=24)
+    long = make_job(3, 2, 300, 300, memory=24)
+    unknown = make_job(4, 3, 30, None, memory=24)
+    assert placed_ids([head, long, unknown, short]) == [2]
+
+def test_long_job_runs_on_gpus_the_head_leaves_over():
+    head = make_job(1, 0, 100, 100, memory=24, count=5)
+    long = make_job(3, 2, 300, 300, memory=24)
+    unknown = make_job(4, 3, 30, None, memory=24)
+    assert placed_ids([head, long, unknown]) == [3]
+
+def test_jobs_in_order_run_without_reservation():
+    first = make_job(1, 0, 100, 100, memory=24)
+    second = make_job(2, 1, 300, None, memory=24)
+    assert placed_ids([first, second]) == [1, 2]
+
+def test_reservation_waits_for_enough_releases():
+    job = make_job(1, 0, 100, 100, memory=24, count=6)
+    assert _reservation(job, group_free_gpus(FREE), BUSY, at(0)) == (at(60), {24: 0})
+
+def test_reservation_counts_gpus_released_at_the_same_time():
+    job = make_job(1, 0, 100, 100, memory=24, count=5)
+    assert _reservation(job, group_free_gpus(FREE), BUSY, at(0)) == (at(60), {24: 1})
+
+def test_reservation_ignores_gpus_with_unknown_end():
+    job = make_job(1, 0, 100, 100, memory=8, count=13)
+    busy = [{"_id": i, "capacity": 8, "endsAt": None} for i in range(7, 19)]
+    assert _reservation(job, {}, busy, at(0)) == (None, {})
+
+def test_reservation_past_end_time_starts_now():
+    # 예상 종료 시각이 지났지만 아직 끝나지 않은 작업의 GPU는 지금 반환되는 것으로 계산
+    job = make_job(1, 0, 100, 100, memory=24, count=3)
+    assert _reservation(job, group_free_gpus(FREE), BUSY, at(90)) == (at(90), {24: 3})
+
+def test_same_capacity_reservation_uses_earliest_single_capacity():
+    job = make_job(1, 0, 100, 100, count=2, same=True)
+    free = [{"_id": 1, "capacity": 24}, {"_id": 7, "capacity": 8}]
+    busy = [{"_id": 2, "capacity": 24, "endsAt": at(30)}, {"_id": 8, "capacity": 8, "endsAt": at(10)}]
+    assert _reservation(job, group_free_gpus(free), busy, at(0)) == (at(10), {8: 0})
+
+def test_reserved_head_is_not_delayed_by_backfill():
+    # 예상 실행 시간이 정확하면 head는 예약 시각에 시작한다
+    free = [{"_id": 1, "capacity": 24}]
+    busy = [{"_id": 2, "capacity": 24, "endsAt": at(60)}]
+    head = make_job(1, 0, 100, 100, memory=24, count=2)
+    fits = make_job(2, 1, 50, 50, memory=24)
+    too_long = make_job(3, 2, 70, 70, memory=24)
+    assert placed_ids([head, too_long, fits], free, busy) == [2]
+
+def test_unreservable_head_keeps_its_capacities():
+    # head는 같은 capacity의 GPU 2개가 필요하지만 사용 중인 GPU는 끝나는 시각을 알 수 없어 예약할 수 없음
+    free = [{"_id": 1, "capacity": 24}, {"_id": 7, "capacity": 8}]
+    busy = [{"_id": i, "capacity": 8, "endsAt": None} for i in range(8, 19)]
+    head = make_job(1, 0, 100, 100, memory=8, count=2, same=True)
+    unknown = make_job(2, 1, 30, None, memory=8)
+    short = make_job(3, 2, 10, 10)
+    assert placed_ids([head, unknown, short], free, busy) == []
+    # head가 쓸 수 없는 capacity는 그대로 사용 가능
+    assert placed_ids([make_job(1, 0, 100, 100, memory=12, count=2), unknown, short],
+                      free, busy) == [2]
+
+def test_every_job_runs_under_both_policies():
+    jobs = make_workload(300, seed=1)
+    _, fifo_started = simulate(jobs, fifo_plan)
+    _, backfill_started = simulate(jobs, plan_backfill)
+    assert len(fifo_started) == len(backfill_started) == len(jobs)
+
+def test_backfill_simulation_is_deterministic():
+    jobs = make_workload(200, seed=3)
+    assert simulate(jobs, plan_backfill) == simulate(make_workload(200, seed=3), plan_backfill)